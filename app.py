@@ -1,18 +1,23 @@
-from flask import Flask, render_template, request, send_file, redirect, url_for, flash, jsonify
+from flask import Flask, render_template, request, send_file, redirect, url_for, flash, jsonify, Response, stream_with_context
 import os
 import uuid
 import threading
 import json
-import queue
+import socket
 import requests
 import io
 import time
 import logging
 from datetime import datetime, timedelta
-import pandas as pd
 import x_scraper
-from x_scraper import run_process, CONFIG_FILE, request_stop
-from db import init_db, get_db_connection
+from x_scraper import CONFIG_FILE
+from db import (init_db, get_db_connection, fetch_tweet_page, find_tweet_day, find_tweet_key, decode_tweet_cursor,
+                get_target_stats, delete_tweets, delete_target_tweets)
+import job_store
+import target_scheduler
+import tweet_import
+import tweet_export
+import tweet_archive
 from werkzeug.security import check_password_hash, generate_password_hash
 
 # Werkzeug loglarını filtrele (Sadece hataları göster, GET/POST isteklerini gizle)
@@ -38,6 +43,16 @@ def load_debug_config():
         except:
             pass
 
+def load_render_worker_count():
+    """Number of worker threads for screenshot / Word jobs (config.json "render_worker_count", default 2)."""
+    if os.path.exists(CONFIG_FILE):
+        try:
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                return max(1, int(json.load(f).get("render_worker_count", 2) or 2))
+        except:
+            pass
+    return 2
+
 def log_debug(message):
     """Prints message only if DEBUG_MODE is True."""
     if DEBUG_MODE:
@@ -51,43 +66,75 @@ init_db()
 
 # Scheduler Setup
 from apscheduler.schedulers.background import BackgroundScheduler
-from tasks import run_incremental_scraping, run_daily_verification
+from tasks import run_incremental_scraping, run_daily_verification, load_auth_credentials
 import atexit
 
-# Global storage
-JOBS = {}
-TEMP_FILES = {}
-
 # Job Queue System
-JOB_QUEUE = queue.Queue()
-IS_WORKER_BUSY = False
+# İşler veritabanında tutulur; yeniden başlatmada kaybolmaz ve birden fazla süreç aynı kuyruğu paylaşabilir
+JOB_STORE = job_store.get_job_store()
+try:
+    JOB_STORE.init()
+except Exception as e:
+    print(f"İş deposu başlatılamadı: {e}", flush=True)
+
+# Boş kuyrukta diğer süreçlerin eklediği işler için yoklama aralığı (saniye)
+JOB_POLL_SECONDS = 2
+# Tamamlanan / başarısız işlerin saklanma süresi
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+# Aynı tarama isteği bu süre içinde tekrar gönderilirse tamamlanmış işin sonucu hemen döndürülür (saniye)
+SCRAPE_RESULT_TTL_SECONDS = 300
+
+# Bu süreçte çalışan işlerin iptal belirteçleri (job_id -> threading.Event)
+CANCEL_EVENTS = {}
+CANCEL_EVENTS_LOCK = threading.Lock()
+# Sürücü havuzundaki her Chrome için bir işçi iş parçacığı (config.json "driver_pool_size")
+WORKER_COUNT = x_scraper.get_driver_pool_size()
+# Ekran görüntüsü / Word işleri için ayrı işçi havuzu; tarama işçileriyle paralel çalışır
+RENDER_WORKER_COUNT = load_render_worker_count()
+# Hedef bazlı zamanlayıcı (yalnızca zamanlayıcıyı çalıştıran süreçte tanımlıdır)
+TARGET_SCHEDULER = None
 
 # Yalnızca ana süreçte (main thread) çalışmasını sağlamak için basit bir kontrol
 if os.environ.get('WERKZEUG_RUN_MAIN') == 'true' or not app.debug:
     scheduler = BackgroundScheduler(daemon=True)
 
     def is_admin_scrape_in_queue(task_name):
-        # Basitçe kuyrukta aynı görev tipinden var mı diye bakar (Kuyruk boyutunu bozmadan, approximate)
-        with JOB_QUEUE.mutex:
-            for item in JOB_QUEUE.queue:
-                job_kwargs = item[1]
-                if job_kwargs.get('job_type') == 'admin_scrape' and job_kwargs.get('task_name') == task_name:
-                    return True
-        return False
-
-    def queue_scheduled_scrape():
-        if not is_admin_scrape_in_queue('incremental'):
-            log_debug("Zamanlanmış artımlı tarama görevi kuyruğa ekleniyor.")
-            JOB_QUEUE.put((str(uuid.uuid4()), {'job_type': 'admin_scrape', 'task_name': 'incremental'}))
-        else:
-            log_debug("Zamanlanmış artımlı tarama görevi zaten kuyrukta.")
+        # Kuyrukta (henüz başlamamış) aynı görevden var mı
+        try:
+            return JOB_STORE.has_pending(task_name)
+        except Exception as e:
+            print(f"İş deposu hatası: {e}", flush=True)
+            return True
+
+    def queue_target_scrape(target_id):
+        # TargetScheduler tarafından, hedefin next_scrape_at zamanı geldiğinde çağrılır
+        task_name = f'scheduled_target_{target_id}'
+        if JOB_STORE.has_active(task_name):
+            log_debug(f"Hedef {target_id} için zamanlanmış tarama zaten kuyrukta veya çalışıyor.")
+            return
+        log_debug(f"Hedef {target_id} için zamanlanmış tarama kuyruğa ekleniyor.")
+        JOB_STORE.enqueue('admin_scrape', {'task_name': task_name, 'target_id': target_id}, job_key=task_name,
+                          priority=job_store.PRIORITY_BACKGROUND)
 
     def queue_daily_verification():
-        if not is_admin_scrape_in_queue('daily_verification'):
-            log_debug("Günlük doğrulama görevi kuyruğa ekleniyor.")
-            JOB_QUEUE.put((str(uuid.uuid4()), {'job_type': 'admin_scrape', 'task_name': 'daily_verification'}))
-        else:
-            log_debug("Günlük doğrulama görevi zaten kuyrukta.")
+        # Her hedef ayrı bir iş olarak arka plan şeridine eklenir; kullanıcı işleri araya girebilir
+        day = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        queued = 0
+        for target_id in get_target_ids():
+            task_name = f'daily_verification_{target_id}'
+            if is_admin_scrape_in_queue(task_name):
+                continue
+            JOB_STORE.enqueue('admin_scrape', {'task_name': 'daily_verification', 'target_id': target_id, 'day': day},
+                              job_key=task_name, priority=job_store.PRIORITY_BACKGROUND)
+            queued += 1
+        log_debug(f"Günlük doğrulama: {queued} hedef için iş kuyruğa eklendi ({day}).")
+
+    def purge_old_jobs():
+        try:
+            removed = JOB_STORE.purge(JOB_RETENTION_SECONDS)
+            log_debug(f"{removed} eski iş kaydı silindi.")
+        except Exception as e:
+            print(f"Eski işler silinemedi: {e}", flush=True)
 
     def generate_cron_hours(start_hour, interval_hours):
         hours = []
@@ -101,32 +148,52 @@ if os.environ.get('WERKZEUG_RUN_MAIN') == 'true' or not app.debug:
         return ','.join(map(str, sorted(hours)))
 
     def apply_scheduler_settings():
-        # Her hedefin kendi interval_minutes değerine göre tam vaktinde çalışması için
-        # her 1 dakikada bir kontrol eden genel bir görev ekliyoruz. (cron minute='*')
+        # Hedef taramaları dakikalık yoklama yerine TargetScheduler ile tam vaktinde kuyruğa eklenir
 
         # Remove existing jobs if any
-        if scheduler.get_job('incremental_scrape_job'):
-            scheduler.remove_job('incremental_scrape_job')
         if scheduler.get_job('daily_verification_job'):
             scheduler.remove_job('daily_verification_job')
-
-        # Add polling job (every minute)
-        scheduler.add_job(queue_scheduled_scrape, 'cron', minute='*', id='incremental_scrape_job')
+        if scheduler.get_job('purge_jobs_job'):
+            scheduler.remove_job('purge_jobs_job')
 
         # Add daily verification job (every day at 00:05)
         scheduler.add_job(queue_daily_verification, 'cron', hour=0, minute=5, id='daily_verification_job')
 
-        print(f"Scheduler updated: Polling for due targets every minute. Daily verification set to 00:05.", flush=True)
+        # Remove finished jobs and their files (every day at 00:15)
+        scheduler.add_job(purge_old_jobs, 'cron', hour=0, minute=15, id='purge_jobs_job')
+
+        print(f"Scheduler updated: Due targets are queued at their exact next_scrape_at. Daily verification set to 00:05.", flush=True)
 
     # Initial apply
     apply_scheduler_settings()
     scheduler.start()
 
+    TARGET_SCHEDULER = target_scheduler.TargetScheduler(queue_target_scrape)
+    TARGET_SCHEDULER.start()
+
     # Store globally to allow updating from routes
     app.apply_scheduler_settings = apply_scheduler_settings
 
     # Uygulama kapandığında scheduler'ı durdur
     atexit.register(lambda: scheduler.shutdown(wait=False))
+    atexit.register(TARGET_SCHEDULER.stop)
+
+def refresh_target_schedule(target_id, after_run=False):
+    """Tells the target scheduler (if it runs in this process) that a target's next_scrape_at may have changed."""
+    if TARGET_SCHEDULER is not None:
+        TARGET_SCHEDULER.refresh(target_id, after_run=after_run)
+
+def get_target_ids():
+    """Ids of all targets (used to fan out background work into one job per target)."""
+    conn = get_db_connection()
+    if not conn:
+        return []
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT id FROM targets ORDER BY id")
+            return [row['id'] for row in cursor.fetchall()]
+    finally:
+        conn.close()
 
 def format_duration(seconds):
     """Saniyeyi okunabilir süre formatına çevirir (X dakika Y saniye)."""
@@ -141,23 +208,49 @@ def format_duration(seconds):
     else:
         return f"{secs} saniye"
 
-def worker_loop():
-    global IS_WORKER_BUSY
-    log_debug("İşçi iş parçacığı başlatıldı...")
+def keep_job_lease(job_id, worker_id, cancel_event, done_event):
+    """Renews the job lease while it runs; sets cancel_event if the job was cancelled from any process."""
+    while not done_event.wait(job_store.LEASE_RENEW_SECONDS):
+        try:
+            if not JOB_STORE.renew(job_id, worker_id):
+                cancel_event.set()
+                return
+        except Exception as e:
+            print(f"İş {job_id} süresi uzatılamadı: {e}", flush=True)
+
+def worker_loop(worker_id, render_lane=False):
+    """
+    Claims and runs jobs. Scrape-lane workers (one per pooled Chrome) take every job type except
+    RENDER_JOB_TYPES; render-lane workers take only those, so long Word reports never hold a driver worker.
+    """
+    log_debug(f"İşçi iş parçacığı başlatıldı ({'rapor' if render_lane else 'tarama'} şeridi)...")
+    if render_lane:
+        lane = job_store.LANE_RENDER
+        lane_filter = {'job_types': job_store.RENDER_JOB_TYPES}
+    else:
+        lane = job_store.LANE_SCRAPE
+        lane_filter = {'exclude_types': job_store.RENDER_JOB_TYPES}
     while True:
         try:
-            # Blocking wait for next job
-            job_id, kwargs = JOB_QUEUE.get()
-            IS_WORKER_BUSY = True
-            
+            # Wait for next job (claimed atomically, so every job runs on exactly one worker)
+            job = JOB_STORE.claim(worker_id, **lane_filter)
+            if not job:
+                JOB_STORE.wait_for_job(JOB_POLL_SECONDS, lane)
+                continue
+
+            job_id = job['job_id']
+            job_type = job['job_type']
+            kwargs = job['kwargs']
+
             log_debug(f"İş işleniyor {job_id}...")
-            
-            if job_id in JOBS:
-                JOBS[job_id]['status'] = 'running'
-                
+
+            cancel_event = threading.Event()
+            done_event = threading.Event()
+            with CANCEL_EVENTS_LOCK:
+                CANCEL_EVENTS[job_id] = cancel_event
+            threading.Thread(target=keep_job_lease, args=(job_id, worker_id, cancel_event, done_event), daemon=True).start()
+
             try:
-                job_type = kwargs.pop('job_type', 'scrape')
-                
                 if job_type == 'screenshot':
                     # Direct screenshot mode
                     links = kwargs.get('links', [])
@@ -183,8 +276,7 @@ def worker_loop():
                                 "word_file": file_stream,
                                 "job_type": 'screenshot'
                             }
-                            JOBS[job_id]['status'] = 'completed'
-                            JOBS[job_id]['result'] = stats
+                            JOB_STORE.finish(job_id, worker_id, 'completed', result=job_store.save_job_files(job_id, stats))
                             log_debug(f"İş {job_id} tamamlandı (ekran görüntüleri).")
                         else:
                             raise Exception(f"Node.js servisi hatası: {response.status_code} - {response.text}")
@@ -193,58 +285,111 @@ def worker_loop():
                         print(f"İş {job_id} ekran görüntüsü hatası: {node_err}")
                         raise node_err
                 
+                elif job_type == 'import':
+                    # Arşiv (Excel / CSV / JSONL) içe aktarma
+                    import_path = kwargs['path']
+                    log_debug(f"İş {job_id}: {kwargs['target_name']} için arşiv içe aktarılıyor ({import_path})...")
+                    start_time_perf = time.time()
+                    total_rows = tweet_import.count_rows(import_path)
+
+                    def report_progress(rows_read, rows_inserted):
+                        JOB_STORE.set_progress(job_id, worker_id, {
+                            'current': rows_read,
+                            'total': max(total_rows or 0, rows_read),
+                            'inserted': rows_inserted
+                        })
+
+                    conn = get_db_connection()
+                    if not conn:
+                        raise Exception("Veritabanı bağlantı hatası.")
+                    try:
+                        new_tweets_added = tweet_import.import_tweet_chunks(
+                            conn, kwargs['target_id'], kwargs['target_name'],
+                            tweet_import.iter_file_chunks(import_path),
+                            progress=report_progress,
+                            cancel_event=cancel_event
+                        )
+                    finally:
+                        conn.close()
+                        if os.path.exists(import_path):
+                            os.remove(import_path)
+
+                    JOB_STORE.finish(job_id, worker_id, 'completed', result={
+                        "count": new_tweets_added,
+                        "time": format_duration(time.time() - start_time_perf),
+                        "target_id": kwargs['target_id'],
+                        "job_type": "import"
+                    })
+                    log_debug(f"İş {job_id} tamamlandı (içe aktarma: {new_tweets_added} yeni kayıt).")
+
                 elif job_type == 'admin_scrape':
                     # Zamanlanmış veya panelden manuel tetiklenmiş artımlı admin taraması
                     task_name = kwargs.get('task_name')
                     log_debug(f"İş {job_id}: Yönetici paneli tarama görevi başlatılıyor ({task_name})...")
                     if task_name == 'daily_verification':
-                        run_daily_verification()
+                        run_daily_verification(specific_target_id=kwargs.get('target_id'), day=kwargs.get('day'), cancel_event=cancel_event)
                     else:
                         specific_target_id = kwargs.get('target_id')
                         force_scrape = kwargs.get('force_scrape', False)
-                        run_incremental_scraping(specific_target_id=specific_target_id, force_scrape=force_scrape)
-
-                    if job_id in JOBS:
-                        JOBS[job_id]['status'] = 'completed'
-                        JOBS[job_id]['result'] = {"job_type": "admin_scrape"}
-                    log_debug(f"İş {job_id} tamamlandı (admin_scrape).")
+                        try:
+                            run_incremental_scraping(specific_target_id=specific_target_id, force_scrape=force_scrape, cancel_event=cancel_event)
+                        finally:
+                            if specific_target_id:
+                                # Tarama next_scrape_at'i ilerletti; zamanlayıcı yeni zamanı öğrensin
+                                refresh_target_schedule(specific_target_id, after_run=True)
+
+                    if cancel_event.is_set():
+                        # Durum /cancel tarafından zaten 'failed' olarak işaretlendi
+                        log_debug(f"İş {job_id} iptal edildi (admin_scrape).")
+                    else:
+                        JOB_STORE.finish(job_id, worker_id, 'completed', result={"job_type": "admin_scrape"})
+                        log_debug(f"İş {job_id} tamamlandı (admin_scrape).")
 
                 else:
                     # Normal scrape mode (Ana sayfa üzerinden tetiklenenler)
                     # This now uses the persistent driver in x_scraper
-                    stats = run_process(**kwargs)
-                    
-                    if stats:
+                    # Giriş bilgileri iş kaydında tutulmaz, çalışma anında config.json'dan okunur
+                    auth_user, auth_pass = load_auth_credentials()
+                    # Takip edilen hedeflerin kapsanan aralıkları arşivden okunur, yalnızca boşluklar canlı taranır
+                    stats = tweet_archive.run_process_with_archive(username=auth_user, password=auth_pass, cancel_event=cancel_event, **kwargs)
+
+                    if cancel_event.is_set():
+                        # Durum /cancel tarafından zaten 'failed' olarak işaretlendi
+                        log_debug(f"İş {job_id} iptal edildi.")
+                    elif stats:
                         # x_scraper returns time as float in seconds, format it here
                         if 'time' in stats:
                             stats['time'] = format_duration(stats['time'])
 
                         stats['job_type'] = 'scrape'
-                        if job_id in JOBS:
-                            JOBS[job_id]['status'] = 'completed'
-                            JOBS[job_id]['result'] = stats
+                        # Ham veri yalnızca arka plan görevleri içindir; iş kaydına yazılmaz
+                        stats.pop('raw_data', None)
+                        stats.pop('incomplete_targets', None)
+                        JOB_STORE.finish(job_id, worker_id, 'completed', result=job_store.save_job_files(job_id, stats))
                         log_debug(f"İş {job_id} tamamlandı.")
                     else:
-                        if job_id in JOBS:
-                            JOBS[job_id]['status'] = 'failed'
-                            JOBS[job_id]['error'] = "İşlem başarısız oldu (Giriş hatası veya veri yok)."
+                        JOB_STORE.finish(job_id, worker_id, 'failed', error="İşlem başarısız oldu (Giriş hatası veya veri yok).")
                         log_debug(f"İş {job_id} başarısız oldu (istatistik yok).")
             except Exception as e:
-                if job_id in JOBS:
-                    JOBS[job_id]['status'] = 'failed'
-                    JOBS[job_id]['error'] = str(e)
+                JOB_STORE.finish(job_id, worker_id, 'failed', error=str(e))
                 print(f"İş {job_id} hatası: {e}", flush=True)
             finally:
-                IS_WORKER_BUSY = False
-                JOB_QUEUE.task_done()
+                done_event.set()
+                with CANCEL_EVENTS_LOCK:
+                    CANCEL_EVENTS.pop(job_id, None)
                 
         except Exception as e:
             print(f"İşçi döngüsü kritik hata: {e}", flush=True)
-            IS_WORKER_BUSY = False
+            time.sleep(JOB_POLL_SECONDS)
 
-# Start worker thread
-t = threading.Thread(target=worker_loop, daemon=True)
-t.start()
+# Start worker threads
+for worker_index in range(WORKER_COUNT):
+    t = threading.Thread(target=worker_loop, args=(f"{socket.gethostname()}:{os.getpid()}:{worker_index}",), daemon=True)
+    t.start()
+
+for worker_index in range(RENDER_WORKER_COUNT):
+    t = threading.Thread(target=worker_loop, args=(f"{socket.gethostname()}:{os.getpid()}:render{worker_index}", True), daemon=True)
+    t.start()
 
 from functools import wraps
 from flask import session
@@ -295,12 +440,16 @@ def admin_logout():
 @app.route('/admin/trigger_scrape', methods=['POST'])
 @admin_required
 def admin_trigger_scrape():
-    job_id = str(uuid.uuid4())
-    JOB_QUEUE.put((job_id, {
-        'job_type': 'admin_scrape',
-        'task_name': 'incremental_all',
-        'force_scrape': True
-    }))
+    # Tüm hedefler tek bir uzun iş yerine hedef başına ayrı işler olarak arka plan şeridine eklenir
+    for target_id in get_target_ids():
+        task_name = f'incremental_target_{target_id}'
+        if JOB_STORE.has_pending(task_name):
+            continue
+        JOB_STORE.enqueue('admin_scrape', {
+            'task_name': task_name,
+            'target_id': target_id,
+            'force_scrape': True
+        }, job_key=task_name, priority=job_store.PRIORITY_BACKGROUND)
 
     flash('Arka planda tüm hedefler için tarama görevi kuyruğa eklendi. Sistem uygun olduğunda başlayacaktır.', 'success')
     return redirect(url_for('admin_dashboard'))
@@ -308,13 +457,11 @@ def admin_trigger_scrape():
 @app.route('/admin/trigger_scrape/<int:target_id>', methods=['POST'])
 @admin_required
 def admin_trigger_scrape_target(target_id):
-    job_id = str(uuid.uuid4())
-    JOB_QUEUE.put((job_id, {
-        'job_type': 'admin_scrape',
+    JOB_STORE.enqueue('admin_scrape', {
         'task_name': f'incremental_target_{target_id}',
         'target_id': target_id,
         'force_scrape': True
-    }))
+    }, job_key=f'incremental_target_{target_id}')
 
     flash('Bu hedef için tarama görevi kuyruğa eklendi. Sistem uygun olduğunda başlayacaktır.', 'success')
 
@@ -389,12 +536,13 @@ def admin_dashboard():
                 if db_settings:
                     settings = db_settings
 
-                # Get targets and their tweet counts
+                # Get targets and their precomputed stats (target_stats is maintained on insert/delete)
                 cursor.execute("""
-                    SELECT t.id, t.target_name, t.target_type, t.scrape_interval_minutes, t.last_scraped_at, t.next_scrape_at, COUNT(tw.id) as tweet_count
+                    SELECT t.id, t.target_name, t.target_type, t.scrape_interval_minutes, t.last_scraped_at, t.next_scrape_at,
+                           COALESCE(s.tweet_count, 0) as tweet_count, s.newest_tweet_at, s.last_run_new_tweets, s.last_run_seconds
                     FROM targets t
-                    LEFT JOIN tweets tw ON t.id = tw.target_id
-                    GROUP BY t.id
+                    LEFT JOIN target_stats s ON s.target_id = t.id
+                    ORDER BY t.id
                 """)
                 targets = cursor.fetchall()
         finally:
@@ -438,7 +586,9 @@ def admin_add_target():
                         "INSERT INTO targets (target_name, target_type, scrape_interval_minutes, next_scrape_at) VALUES (%s, %s, %s, %s)",
                         (target_name, target_type, scrape_interval_minutes, next_scrape_at)
                     )
+                    new_target_id = cursor.lastrowid
                 conn.commit()
+                refresh_target_schedule(new_target_id)
                 flash('Hedef başarıyla eklendi.', 'success')
             except Exception as e:
                 flash(f'Hata oluştu: {e}', 'danger')
@@ -457,6 +607,7 @@ def admin_edit_target_interval(target_id):
     excel_file = request.files.get('excel_file')
 
     next_scrape_at = parse_next_scrape_time(next_scrape_time_str)
+    import_job_id = None
 
     if scrape_interval_minutes and scrape_interval_minutes > 0:
         conn = get_db_connection()
@@ -477,58 +628,22 @@ def admin_edit_target_interval(target_id):
                             flash('Liste tipi hedefler için Excel yüklemesi desteklenmemektedir.', 'danger')
                             return redirect(url_for('admin_dashboard'))
 
-                        try:
-                            df = pd.read_excel(excel_file)
-                            if not all(col in df.columns for col in ['Date', 'Link', 'Username']):
-                                flash('Yüklenen Excel dosyasında Date, Link ve Username sütunları eksik.', 'danger')
-                                return redirect(url_for('admin_dashboard'))
-
-                            # Kullanıcı adını doğrula (Excel'de hedefin adı en az 1 kere var mı)
-                            df['Username'] = df['Username'].astype(str)
-                            clean_target_name = target_name.replace('@', '').lower().strip()
-                            clean_usernames = df['Username'].str.replace('@', '').str.lower().str.strip()
-
-                            if not (clean_usernames == clean_target_name).any():
-                                flash(f'Yüklenen Excel dosyasında hedef kullanıcı "{target_name}" ile eşleşen bir Username bulunamadı.', 'danger')
-                                return redirect(url_for('admin_dashboard'))
-
-                            new_tweets_added = 0
-                            for index, row in df.iterrows():
-                                tweet_date = row['Date']
-                                link = row['Link']
-                                username = row['Username']
-
-                                if pd.isna(link) or pd.isna(tweet_date):
-                                    continue
-
-                                if isinstance(tweet_date, str):
-                                    try:
-                                        tweet_date = datetime.strptime(tweet_date, "%Y-%m-%d %H:%M:%S")
-                                    except ValueError:
-                                        try:
-                                            # handle other possible formats if necessary, or pass
-                                            tweet_date = pd.to_datetime(tweet_date).to_pydatetime()
-                                        except:
-                                            pass
-
-                                # Sadece datetime olanları veya parse edilebilenleri ekle
-                                if pd.notna(tweet_date):
-                                    try:
-                                        cursor.execute("""
-                                            INSERT IGNORE INTO tweets (target_id, tweet_date, link, username)
-                                            VALUES (%s, %s, %s, %s)
-                                        """, (target_id, tweet_date, str(link), str(username)))
-                                        if cursor.rowcount > 0:
-                                            new_tweets_added += 1
-                                    except Exception as e:
-                                        print(f"Excel import error for link {link}: {e}")
-
-                            conn.commit()
-                            flash(f'Tarama sıklığı güncellendi ve Excel dosyasından {new_tweets_added} yeni kayıt eklendi.', 'success')
-
-                        except Exception as e:
-                            flash(f'Excel işlenirken hata oluştu: {e}', 'danger')
+                        extension = os.path.splitext(excel_file.filename)[1].lower()
+                        if extension not in tweet_import.IMPORT_EXTENSIONS:
+                            flash(f"Desteklenmeyen dosya türü. Desteklenenler: {', '.join(tweet_import.IMPORT_EXTENSIONS)}", 'danger')
                             return redirect(url_for('admin_dashboard'))
+
+                        # Dosya diske alınır ve içe aktarma arka planda iş kuyruğunda çalışır
+                        import_job_id = str(uuid.uuid4())
+                        import_path = job_store.import_file_path(import_job_id, extension)
+                        os.makedirs(job_store.JOB_FILES_DIR, exist_ok=True)
+                        excel_file.save(import_path)
+                        JOB_STORE.enqueue('import', {
+                            'target_id': target_id,
+                            'target_name': target_name,
+                            'path': import_path
+                        }, job_id=import_job_id)
+                        flash('Tarama sıklığı güncellendi. Arşiv dosyası arka planda içe aktarılıyor.', 'success')
                     else:
                         flash('Tarama sıklığı/zamanı başarıyla güncellendi.', 'success')
 
@@ -543,6 +658,7 @@ def admin_edit_target_interval(target_id):
                             (scrape_interval_minutes, target_id)
                         )
                 conn.commit()
+                refresh_target_schedule(target_id)
             except Exception as e:
                 flash(f'Hata oluştu: {e}', 'danger')
             finally:
@@ -550,6 +666,9 @@ def admin_edit_target_interval(target_id):
     else:
         flash('Geçersiz dakika değeri.', 'danger')
 
+    if import_job_id:
+        # İçe aktarmanın ilerlemesi işlem sayfasında izlenir
+        return redirect(url_for('processing', job_id=import_job_id))
     return redirect(url_for('admin_dashboard'))
 
 @app.route('/admin/target/delete/<int:target_id>', methods=['POST'])
@@ -561,6 +680,7 @@ def admin_delete_target(target_id):
             with conn.cursor() as cursor:
                 cursor.execute("DELETE FROM targets WHERE id = %s", (target_id,))
             conn.commit()
+            refresh_target_schedule(target_id)
             flash('Hedef ve ona bağlı tweetler silindi.', 'success')
         except Exception as e:
             flash(f'Hata oluştu: {e}', 'danger')
@@ -573,7 +693,7 @@ def admin_delete_target(target_id):
 @admin_required
 def admin_view_target(target_id):
     target = None
-    tweets = []
+    stats = None
 
     conn = get_db_connection()
     if conn:
@@ -581,10 +701,8 @@ def admin_view_target(target_id):
             with conn.cursor() as cursor:
                 cursor.execute("SELECT * FROM targets WHERE id = %s", (target_id,))
                 target = cursor.fetchone()
-
-                if target:
-                    cursor.execute("SELECT * FROM tweets WHERE target_id = %s ORDER BY tweet_date DESC", (target_id,))
-                    tweets = cursor.fetchall()
+            if target:
+                stats = get_target_stats(conn, target_id)
         finally:
             conn.close()
 
@@ -592,7 +710,117 @@ def admin_view_target(target_id):
         flash('Hedef bulunamadı.', 'danger')
         return redirect(url_for('admin_dashboard'))
 
-    return render_template('admin/target_tweets.html', target=target, tweets=tweets)
+    # Tweetler sayfa açıldıktan sonra admin_target_tweets_api üzerinden parça parça yüklenir
+    return render_template('admin/target_tweets.html', target=target, stats=stats)
+
+TWEET_PAGE_SIZE = 200
+TWEET_PAGE_MAX_SIZE = 1000
+
+@app.route('/admin/target/<int:target_id>/tweets.json')
+@admin_required
+def admin_target_tweets_api(target_id):
+    """
+    Keyset-paginated tweet listing, newest first.
+    Query parameters:
+      day=YYYY-MM-DD        rows of one day (without day/start/end: the newest day with tweets);
+                            the response then also has prev_day / next_day for day navigation
+      start, end            datetime range (YYYY-MM-DDTHH:MM) instead of a day
+      newer_than_link       only rows newer than this stored link
+      cursor                next_cursor of the previous page
+      limit                 page size (default 200, max 1000)
+    """
+    day_str = request.args.get('day')
+    start_str = request.args.get('start')
+    end_str = request.args.get('end')
+    reference_link = request.args.get('newer_than_link')
+    limit = min(max(request.args.get('limit', TWEET_PAGE_SIZE, type=int), 1), TWEET_PAGE_MAX_SIZE)
+
+    try:
+        before = decode_tweet_cursor(request.args['cursor']) if request.args.get('cursor') else None
+        day = datetime.strptime(day_str, '%Y-%m-%d').date() if day_str else None
+        start_datetime = datetime.fromisoformat(start_str) if start_str else None
+        end_datetime = datetime.fromisoformat(end_str) if end_str else None
+    except ValueError:
+        return jsonify({'error': 'Geçersiz parametre.'}), 400
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'error': 'Veritabanı bağlantı hatası.'}), 500
+
+    try:
+        response = {}
+        after = None
+        if reference_link:
+            after = find_tweet_key(conn, target_id, reference_link.strip())
+            if not after:
+                return jsonify({'error': 'Link bulunamadı.', 'tweets': [], 'next_cursor': None}), 404
+
+        day_view = not (start_datetime or end_datetime or reference_link)
+        if day_view:
+            if day is None:
+                day = find_tweet_day(conn, target_id)
+            if day:
+                start_datetime = datetime.combine(day, datetime.min.time())
+                end_datetime = start_datetime + timedelta(days=1, microseconds=-1)
+                response['prev_day'] = find_tweet_day(conn, target_id, before=start_datetime)
+                response['next_day'] = find_tweet_day(conn, target_id, on_or_after=end_datetime + timedelta(microseconds=1))
+            response['day'] = day
+
+        rows, next_cursor = ([], None) if day_view and not day else fetch_tweet_page(
+            conn, target_id, start_datetime, end_datetime, before=before, after=after, limit=limit
+        )
+    finally:
+        conn.close()
+
+    for key in ('day', 'prev_day', 'next_day'):
+        if key in response:
+            response[key] = response[key].strftime('%Y-%m-%d') if response[key] else None
+    response['tweets'] = [{
+        'id': row['id'],
+        'date': row['tweet_date'].strftime('%Y-%m-%d %H:%M:%S'),
+        'display_date': row['tweet_date'].strftime('%d-%m-%Y %H:%M'),
+        'username': row['username'],
+        'link': row['link']
+    } for row in rows]
+    response['next_cursor'] = next_cursor
+    return jsonify(response)
+
+@app.route('/admin/export')
+@admin_required
+def admin_export_tweets():
+    """
+    Streams stored tweets as CSV, JSONL or Parquet.
+    Query parameters: format, target_id (empty = all targets), start_date / end_date (YYYY-MM-DD).
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    target_id = request.args.get('target_id', type=int)
+    back_url = url_for('admin_view_target', target_id=target_id) if target_id else url_for('admin_dashboard')
+
+    if export_format not in tweet_export.EXPORT_FORMATS:
+        flash('Desteklenmeyen dışa aktarma formatı.', 'danger')
+        return redirect(back_url)
+    if export_format == 'parquet' and not tweet_export.parquet_available():
+        flash('Parquet dışa aktarma için pyarrow kütüphanesi gerekli (pip install pyarrow).', 'danger')
+        return redirect(back_url)
+
+    try:
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        start_datetime = datetime.strptime(start_date, '%Y-%m-%d') if start_date else None
+        end_datetime = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1, seconds=-1) if end_date else None
+    except ValueError:
+        flash('Tarih formatı hatalı!', 'danger')
+        return redirect(back_url)
+
+    mimetype, extension = tweet_export.EXPORT_FORMATS[export_format]
+    filename = f"tweets_{target_id or 'tumu'}_{datetime.now().strftime('%Y%m%d_%H%M')}.{extension}"
+    chunks = tweet_export.iter_tweet_chunks(target_id, start_datetime, end_datetime)
+
+    return Response(
+        stream_with_context(tweet_export.stream_export(export_format, chunks)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
 
 @app.route('/admin/target/<int:target_id>/delete_tweets', methods=['POST'])
 @admin_required
@@ -600,8 +828,7 @@ def admin_delete_all_target_tweets(target_id):
     conn = get_db_connection()
     if conn:
         try:
-            with conn.cursor() as cursor:
-                cursor.execute("DELETE FROM tweets WHERE target_id = %s", (target_id,))
+            delete_target_tweets(conn, target_id)
             conn.commit()
             flash('Hedefin tüm tweetleri başarıyla silindi.', 'success')
         except Exception as e:
@@ -635,10 +862,7 @@ def admin_delete_selected_tweets():
     conn = get_db_connection()
     if conn:
         try:
-            with conn.cursor() as cursor:
-                # Use parameter expansion for IN clause
-                format_strings = ','.join(['%s'] * len(tweet_ids))
-                cursor.execute(f"DELETE FROM tweets WHERE id IN ({format_strings})", tuple(tweet_ids))
+            delete_tweets(conn, tweet_ids)
             conn.commit()
             flash(f'{len(tweet_ids)} adet link başarıyla silindi.', 'success')
         except Exception as e:
@@ -658,8 +882,7 @@ def admin_delete_single_tweet(tweet_id):
     conn = get_db_connection()
     if conn:
         try:
-            with conn.cursor() as cursor:
-                cursor.execute("DELETE FROM tweets WHERE id = %s", (tweet_id,))
+            delete_tweets(conn, [tweet_id])
             conn.commit()
             flash('Seçili link başarıyla silindi.', 'success')
         except Exception as e:
@@ -672,6 +895,12 @@ def admin_delete_single_tweet(tweet_id):
     return redirect(url_for('admin_dashboard'))
 
 
+def get_waiter_token():
+    """Per-browser token identifying a requester on coalesced jobs (JobStore.attach / detach)."""
+    if 'waiter_token' not in session:
+        session['waiter_token'] = uuid.uuid4().hex
+    return session['waiter_token']
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
@@ -718,8 +947,8 @@ def index():
                 flash(error_msg, "danger")
                 return redirect(url_for('index'))
 
+            job_type = 'screenshot'
             scrape_kwargs = {
-                'job_type': 'screenshot',
                 'links': direct_links
             }
         
@@ -736,10 +965,8 @@ def index():
                 flash(error_msg, "danger")
                 return redirect(url_for('index'))
 
+            job_type = 'scrape'
             scrape_kwargs = {
-                'job_type': 'scrape',
-                'username': auth_user,
-                'password': auth_pass,
                 'target_username': target_username,
                 'scrape_mode': scrape_mode,
                 'only_replies': only_replies,
@@ -753,11 +980,20 @@ def index():
                 'output_file': None
             }
         
-        # Initial status queued
-        JOBS[job_id] = {'status': 'queued', 'result': None}
-        
-        log_debug(f"İş sıraya alınıyor {job_id}")
-        JOB_QUEUE.put((job_id, scrape_kwargs))
+        job_key = None
+        shared_job_id = None
+        if job_type == 'scrape':
+            # Aynı hedef / mod / filtre / tarih aralığı için kuyruktaki, çalışan veya yeni bitmiş iş paylaşılır
+            job_key = job_store.scrape_job_key(scrape_kwargs)
+            shared_job_id = JOB_STORE.attach(job_key, SCRAPE_RESULT_TTL_SECONDS, get_waiter_token())
+
+        if shared_job_id:
+            log_debug(f"Aynı tarama isteği mevcut işe bağlandı {shared_job_id}")
+            job_id = shared_job_id
+        else:
+            log_debug(f"İş sıraya alınıyor {job_id}")
+            JOB_STORE.enqueue(job_type, scrape_kwargs, job_id=job_id, job_key=job_key,
+                              waiter=get_waiter_token() if job_key else None)
         
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return jsonify({'job_id': job_id})
@@ -768,23 +1004,31 @@ def index():
 
 @app.route('/processing/<job_id>')
 def processing(job_id):
-    if job_id not in JOBS:
+    if not JOB_STORE.get(job_id):
         flash("Geçersiz işlem ID'si.", "danger")
         return redirect(url_for('index'))
     return render_template('processing.html', job_id=job_id)
 
 @app.route('/status/<job_id>')
 def job_status(job_id):
-    if job_id not in JOBS:
+    job = JOB_STORE.get(job_id)
+    if not job:
         return {'status': 'not_found'}
-    
-    job = JOBS[job_id]
+
+    redirect_url = None
+    if job['status'] == 'completed':
+        if job['job_type'] == 'import':
+            redirect_url = url_for('admin_view_target', target_id=job['kwargs']['target_id'])
+        else:
+            redirect_url = url_for('show_result', job_id=job_id)
 
     response = {
         'status': job['status'],
-        'redirect_url': url_for('show_result', job_id=job_id) if job['status'] == 'completed' else None,
-        'message': job.get('error', '')
+        'redirect_url': redirect_url,
+        'message': job.get('error') or ''
     }
+    if job['status'] == 'running' and job.get('progress'):
+        response['progress'] = job['progress']
 
     # Check for external progress file for screenshot jobs
     progress_file = os.path.join(os.getcwd(), 'temp', f'progress_{job_id}.json')
@@ -800,45 +1044,31 @@ def job_status(job_id):
 
 @app.route('/result/<job_id>')
 def show_result(job_id):
-    if job_id not in JOBS or JOBS[job_id]['status'] != 'completed':
+    job = JOB_STORE.get(job_id)
+    if not job or job['status'] != 'completed':
         return redirect(url_for('index'))
-    
-    stats = JOBS[job_id]['result']
-    if stats.get('excel_file'):
-        TEMP_FILES[job_id] = stats['excel_file']
-    
-    if stats.get('word_file'):
-        # For direct screenshot jobs
-        TEMP_FILES[f"{job_id}_word"] = stats['word_file']
-        
+
+    stats = job['result']
     return render_template('result.html', stats=stats, download_id=job_id)
 
 @app.route('/download/<download_id>')
 def download_file(download_id):
-    if download_id in TEMP_FILES:
-        file_obj = TEMP_FILES[download_id]
-        file_obj.seek(0)
-        
-        # Detect if it's Excel or Word based on some logic or metadata? 
-        # But wait, send_file with wrong mimetype might be an issue.
-        # However, the user flow separates them usually.
-        # But wait, `download_id` for Excel is just `job_id`. 
-        # For Word generated later, we might need a different route or ID.
-        
-        # Let's peek at the file content or trust the route logic?
-        # Actually, let's keep it simple. If it was stored as excel_file, it's excel.
+    job = JOB_STORE.get(download_id)
+    result = (job or {}).get('result') or {}
+    excel_path = result.get('excel_path')
+    word_path = result.get('word_path')
+
+    if excel_path and os.path.exists(excel_path):
         return send_file(
-            file_obj, 
+            excel_path,
             as_attachment=True, 
             download_name=f"links_{download_id[:8]}.xlsx",
             mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
-    elif f"{download_id}_word" in TEMP_FILES:
+    elif word_path and os.path.exists(word_path):
         # This handles the case where the primary output is a word file (screenshot mode)
-        file_obj = TEMP_FILES[f"{download_id}_word"]
-        file_obj.seek(0)
         return send_file(
-            file_obj,
+            word_path,
             as_attachment=True,
             download_name=f"report_{download_id[:8]}.docx",
             mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
@@ -851,11 +1081,12 @@ def download_file(download_id):
 def start_word_generation():
     original_job_id = request.form.get('job_id')
     
-    if not original_job_id or original_job_id not in JOBS:
+    original_job = JOB_STORE.get(original_job_id) if original_job_id else None
+    if not original_job or not original_job['result']:
         flash("Geçersiz işlem.", "danger")
         return redirect(url_for('index'))
 
-    result = JOBS[original_job_id]['result']
+    result = original_job['result']
     links = result.get('links', [])
     
     if not links:
@@ -866,35 +1097,37 @@ def start_word_generation():
     new_job_id = str(uuid.uuid4())
 
     scrape_kwargs = {
-        'job_type': 'screenshot',
         'links': links
     }
 
-    JOBS[new_job_id] = {'status': 'queued', 'result': None}
     log_debug(f"Ekran görüntüsü işi sıraya alınıyor {new_job_id}")
-    JOB_QUEUE.put((new_job_id, scrape_kwargs))
+    JOB_STORE.enqueue('screenshot', scrape_kwargs, job_id=new_job_id)
 
     return redirect(url_for('processing', job_id=new_job_id))
 
 @app.route('/cancel/<job_id>', methods=['POST'])
 def cancel_job(job_id):
-    if job_id not in JOBS:
+    job = JOB_STORE.get(job_id)
+    if not job:
         return jsonify({'success': False, 'message': 'İşlem bulunamadı.'}), 404
 
-    job = JOBS[job_id]
-
     if job['status'] == 'completed':
         return jsonify({'success': False, 'message': 'İşlem zaten tamamlanmış.'}), 400
 
-    if job['status'] in ['queued', 'running']:
-        # If it's running, signal the scraper to stop
-        if job['status'] == 'running':
-            request_stop()
-            log_debug(f"İptal sinyali gönderildi (İş: {job_id})")
-
-        # Mark as failed/canceled so the frontend knows it stopped
-        job['status'] = 'failed'
-        job['error'] = 'Kullanıcı tarafından iptal edildi.'
+    # Aynı işi bekleyen başka kullanıcılar varsa iş sürer; yalnızca bu kullanıcı ayrılır
+    if JOB_STORE.detach(job_id, session.get('waiter_token')):
+        log_debug(f"İşi bekleyen bir kullanıcı ayrıldı, iş diğerleri için sürüyor (İş: {job_id})")
+        return jsonify({'success': True, 'message': 'İşlem iptal edildi.'})
+
+    # Mark as failed/canceled so the frontend knows it stopped.
+    # A queued job is never claimed after this; a running one loses its lease
+    # and its worker (in any process) sets the job's cancellation token.
+    if JOB_STORE.cancel(job_id, 'Kullanıcı tarafından iptal edildi.'):
+        with CANCEL_EVENTS_LOCK:
+            cancel_event = CANCEL_EVENTS.get(job_id)
+        if cancel_event is not None:
+            cancel_event.set()
+        log_debug(f"İptal sinyali gönderildi (İş: {job_id})")
         return jsonify({'success': True, 'message': 'İşlem iptal ediliyor.'})
 
     return jsonify({'success': False, 'message': 'Bu işlem iptal edilemez.'}), 400
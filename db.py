@@ -1,152 +1,464 @@
 import pymysql
 import json
 import os
-from werkzeug.security import generate_password_hash
+import threading
+import time
+from datetime import datetime, timedelta
+import x_snowflake
+import migrations
 
 CONFIG_FILE = 'config.json'
 
+_config_cache = None
+_config_mtime = None
+_config_lock = threading.Lock()
+
+def load_db_config():
+    """Returns config.json as a dict, re-reading it only when the file's mtime changes (None if missing)."""
+    global _config_cache, _config_mtime
+    try:
+        mtime = os.path.getmtime(CONFIG_FILE)
+    except OSError:
+        return None
+    if _config_cache is not None and mtime == _config_mtime:
+        return _config_cache
+    with _config_lock:
+        if _config_cache is None or mtime != _config_mtime:
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                _config_cache = json.load(f)
+            _config_mtime = mtime
+    return _config_cache
+
+def connection_params(config):
+    return {
+        'host': config.get('mysql_host', 'localhost'),
+        'port': config.get('mysql_port', 3306),
+        'user': config.get('mysql_user', 'root'),
+        'password': config.get('mysql_password', ''),
+        'database': config.get('mysql_database', 'xscraper_db'),
+    }
+
+class PooledConnection:
+    """
+    Wraps a pooled PyMySQL connection. close() rolls back any open transaction
+    and hands the connection back to the pool instead of closing the socket.
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn)
+
+class ConnectionPool:
+    """
+    Keeps up to max_size open MySQL connections for reuse.
+    Idle connections older than health_check_seconds are pinged (and reconnected) before being handed out.
+    """
+
+    def __init__(self, params, max_size=10, timeout=10, health_check_seconds=30):
+        self.params = params
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_seconds = health_check_seconds
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def connect(self):
+        return pymysql.connect(charset='utf8mb4', cursorclass=pymysql.cursors.DictCursor, **self.params)
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise Exception(f"Veritabanı bağlantı havuzu dolu ({self.max_size} bağlantı).")
+        try:
+            with self._lock:
+                conn, idle_since = self._idle.pop() if self._idle else (None, None)
+            if conn is not None and time.time() - idle_since > self.health_check_seconds:
+                try:
+                    conn.ping(reconnect=True)
+                except Exception:
+                    self.discard(conn)
+                    conn = None
+            return PooledConnection(self, conn or self.connect())
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn):
+        try:
+            # Açık kalan işlem sonraki kullanıcıya eski bir görüntü (snapshot) bırakmasın
+            conn.rollback()
+            with self._lock:
+                if not self._closed:
+                    self._idle.append((conn, time.time()))
+                    conn = None
+            if conn is not None:
+                self.discard(conn)
+        except Exception:
+            self.discard(conn)
+        finally:
+            self._slots.release()
+
+    def discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self.discard(conn)
+
+_pool = None
+_pool_key = None
+_pool_lock = threading.Lock()
+
+def get_connection_pool():
+    """Returns the shared pool, rebuilding it when the MySQL settings in config.json change."""
+    global _pool, _pool_key
+    config = load_db_config()
+    if config is None:
+        return None
+    params = connection_params(config)
+    key = (tuple(sorted(params.items())), config.get('mysql_pool_size', 10))
+    with _pool_lock:
+        if _pool is None or key != _pool_key:
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(params, max_size=int(config.get('mysql_pool_size', 10) or 10))
+            _pool_key = key
+        return _pool
+
 def get_db_connection():
-    if not os.path.exists(CONFIG_FILE):
+    pool = get_connection_pool()
+    if pool is None:
         return None
-    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-        config = json.load(f)
 
     try:
-        conn = pymysql.connect(
-            host=config.get('mysql_host', 'localhost'),
-            port=config.get('mysql_port', 3306),
-            user=config.get('mysql_user', 'root'),
-            password=config.get('mysql_password', ''),
-            database=config.get('mysql_database', 'xscraper_db'),
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
-        return conn
+        return pool.acquire()
     except Exception as e:
         print(f"Database connection error: {e}")
         return None
 
-def init_db():
-    if not os.path.exists(CONFIG_FILE):
+# Linkler yalnızca https://x.com/<username>/status/<tweet_id> biçiminden farklıysa saklanır; okuyucular bu ifadeyi kullanır
+TWEET_LINK_SQL = "COALESCE({t}link, CONCAT('https://x.com/', {t}username, '/status/', {t}tweet_id))"
+
+def tweet_link_sql(alias=''):
+    """SQL expression for a tweets row's full link (alias: table alias, e.g. 'tw')."""
+    return TWEET_LINK_SQL.format(t=f'{alias}.' if alias else '')
+
+def compact_link(link, username, tweet_id):
+    """Returns None when the link can be rebuilt from username and tweet_id, otherwise the link itself."""
+    if username and link == f'https://x.com/{username}/status/{tweet_id}':
         return None
-    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-        config = json.load(f)
+    return link
 
-    # First connect without DB to create it if not exists
-    try:
-        conn_init = pymysql.connect(
-            host=config.get('mysql_host', 'localhost'),
-            port=config.get('mysql_port', 3306),
-            user=config.get('mysql_user', 'root'),
-            password=config.get('mysql_password', ''),
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
+def get_newest_tweet_id(conn, target_id):
+    """Returns the Snowflake ID of the newest stored tweet of a target (None if it has none)."""
+    with conn.cursor() as cursor:
+        # UNIQUE (target_id, tweet_id) indeksinin son kaydı: tek indeks okuması
+        cursor.execute("SELECT MAX(tweet_id) AS tweet_id FROM tweets WHERE target_id = %s", (target_id,))
+        row = cursor.fetchone()
+    return int(row['tweet_id']) if row and row['tweet_id'] else None
+
+TWEET_CURSOR_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def encode_tweet_cursor(row):
+    """Keyset cursor of a tweets row: '<tweet_date>|<id>'."""
+    return f"{row['tweet_date'].strftime(TWEET_CURSOR_FORMAT)}|{row['id']}"
+
+def decode_tweet_cursor(cursor_str):
+    """Returns (tweet_date, id) of a cursor string; raises ValueError if malformed."""
+    date_part, id_part = cursor_str.rsplit('|', 1)
+    return datetime.strptime(date_part, TWEET_CURSOR_FORMAT), int(id_part)
+
+def fetch_tweet_page(conn, target_id, start_datetime=None, end_datetime=None, before=None, after=None, limit=200):
+    """
+    Returns (rows, next_cursor) for a target, newest first, using keyset pagination on (tweet_date, id).
+    before / after are (tweet_date, id) keys: rows strictly older than `before` and strictly newer than `after`.
+    Each page is an index range read, so its cost does not depend on how many tweets the target has.
+    """
+    conditions = ["target_id = %s"]
+    params = [target_id]
+    if start_datetime:
+        conditions.append("tweet_date >= %s")
+        params.append(start_datetime)
+    if end_datetime:
+        conditions.append("tweet_date <= %s")
+        params.append(end_datetime)
+    if before:
+        conditions.append("(tweet_date < %s OR (tweet_date = %s AND id < %s))")
+        params.extend([before[0], before[0], before[1]])
+    if after:
+        conditions.append("(tweet_date > %s OR (tweet_date = %s AND id > %s))")
+        params.extend([after[0], after[0], after[1]])
+
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT id, tweet_id, tweet_date, {tweet_link_sql()} AS link, username FROM tweets
+            WHERE {' AND '.join(conditions)}
+            ORDER BY tweet_date DESC, id DESC
+            LIMIT %s
+        """, params + [limit + 1])
+        rows = cursor.fetchall()
+
+    next_cursor = encode_tweet_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+def find_tweet_day(conn, target_id, before=None, on_or_after=None):
+    """
+    Returns the date of the newest tweet strictly before `before`, or of the oldest tweet
+    on or after `on_or_after` (None if there is none). With neither, the newest tweet's date.
+    """
+    with conn.cursor() as cursor:
+        if on_or_after:
+            cursor.execute("SELECT MIN(tweet_date) AS day FROM tweets WHERE target_id = %s AND tweet_date >= %s", (target_id, on_or_after))
+        elif before:
+            cursor.execute("SELECT MAX(tweet_date) AS day FROM tweets WHERE target_id = %s AND tweet_date < %s", (target_id, before))
+        else:
+            cursor.execute("SELECT MAX(tweet_date) AS day FROM tweets WHERE target_id = %s", (target_id,))
+        row = cursor.fetchone()
+    return row['day'].date() if row and row['day'] else None
+
+def find_tweet_key(conn, target_id, link):
+    """Returns the (tweet_date, id) key of a stored link of a target, or None."""
+    tweet_id = x_snowflake.id_from_link(link)
+    with conn.cursor() as cursor:
+        if tweet_id:
+            cursor.execute("SELECT id, tweet_date FROM tweets WHERE target_id = %s AND tweet_id = %s", (target_id, tweet_id))
+        else:
+            cursor.execute("SELECT id, tweet_date FROM tweets WHERE target_id = %s AND link = %s", (target_id, link))
+        row = cursor.fetchone()
+    return (row['tweet_date'], row['id']) if row else None
+
+INSERT_CHUNK_SIZE = 500
+
+def insert_tweets(conn, target_id, rows, chunk_size=INSERT_CHUNK_SIZE):
+    """
+    Inserts (tweet_date, link, username) rows for a target with multi-row INSERT IGNORE
+    statements and returns how many were new. Does not commit.
+    Rows are keyed by the Snowflake id in the link; links without one are skipped.
+    A chunk that fails is retried row by row so one bad row only skips itself.
+    """
+    prepared = []
+    skipped = 0
+    for tweet_date, link, username in rows:
+        tweet_id = x_snowflake.id_from_link(link)
+        if not tweet_id:
+            skipped += 1
+            continue
+        prepared.append((target_id, tweet_id, tweet_date, compact_link(link, username, tweet_id), username))
+    if skipped:
+        print(f"    Skipped {skipped} rows without a /status/<id> link")
+
+    inserted = 0
+    # Yeni eklenen satırların tarih aralığı; target_stats aynı işlem içinde güncellenir
+    inserted_dates = []
+    with conn.cursor() as cursor:
+        for start in range(0, len(prepared), chunk_size):
+            chunk = prepared[start:start + chunk_size]
+            placeholders = ', '.join(['(%s, %s, %s, %s, %s)'] * len(chunk))
+            params = [value for row in chunk for value in row]
+            try:
+                # INSERT IGNORE: UNIQUE (target_id, tweet_id) ile çakışan satırlar etkilenen satır sayısına girmez
+                cursor.execute(f"INSERT IGNORE INTO tweets (target_id, tweet_id, tweet_date, link, username) VALUES {placeholders}", params)
+                if cursor.rowcount:
+                    inserted += cursor.rowcount
+                    # Çakışan satırlar zaten kayıtlı aralıktadır, bu yüzden parçanın tamamının min/max'ı kullanılabilir
+                    inserted_dates.extend(row[2] for row in chunk if isinstance(row[2], datetime))
+            except Exception as e:
+                print(f"    Bulk insert failed ({e}), retrying {len(chunk)} rows one by one")
+                for row in chunk:
+                    try:
+                        cursor.execute("INSERT IGNORE INTO tweets (target_id, tweet_id, tweet_date, link, username) VALUES (%s, %s, %s, %s, %s)", row)
+                        if cursor.rowcount:
+                            inserted += cursor.rowcount
+                            if isinstance(row[2], datetime):
+                                inserted_dates.append(row[2])
+                    except Exception as row_e:
+                        print(f"    Error inserting tweet {row[1]}: {row_e}")
+    if inserted:
+        record_tweets_added(conn, target_id, inserted, min(inserted_dates, default=None), max(inserted_dates, default=None))
+    return inserted
+
+def record_tweets_added(conn, target_id, count, oldest, newest):
+    """Adds newly inserted tweets to the target's target_stats row (created if missing). Does not commit."""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO target_stats (target_id, tweet_count, oldest_tweet_at, newest_tweet_at)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                tweet_count = tweet_count + VALUES(tweet_count),
+                oldest_tweet_at = LEAST(COALESCE(oldest_tweet_at, VALUES(oldest_tweet_at)), COALESCE(VALUES(oldest_tweet_at), oldest_tweet_at)),
+                newest_tweet_at = GREATEST(COALESCE(newest_tweet_at, VALUES(newest_tweet_at)), COALESCE(VALUES(newest_tweet_at), newest_tweet_at))
+        """, (target_id, count, oldest, newest))
+
+def record_tweets_deleted(conn, target_id, count):
+    """
+    Subtracts deleted tweets from the target's stats and re-reads its oldest/newest dates
+    (MIN/MAX on the target's rows). Call after the DELETE, in the same transaction. Does not commit.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            UPDATE target_stats
+            SET tweet_count = GREATEST(CAST(tweet_count AS SIGNED) - %s, 0),
+                oldest_tweet_at = (SELECT MIN(tweet_date) FROM tweets WHERE target_id = %s),
+                newest_tweet_at = (SELECT MAX(tweet_date) FROM tweets WHERE target_id = %s)
+            WHERE target_id = %s
+        """, (count, target_id, target_id, target_id))
+
+def delete_tweets(conn, tweet_ids):
+    """
+    Deletes tweets by id, keeping target_stats in step. Coverage ranges that contained a deleted
+    tweet are dropped, so the archive no longer answers those ranges without a live scrape.
+    Returns the number of deleted rows. Does not commit.
+    """
+    if not tweet_ids:
+        return 0
+    placeholders = ','.join(['%s'] * len(tweet_ids))
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT target_id, tweet_date FROM tweets WHERE id IN ({placeholders})", tuple(tweet_ids))
+        rows = cursor.fetchall()
+        cursor.execute(f"DELETE FROM tweets WHERE id IN ({placeholders})", tuple(tweet_ids))
+        deleted = cursor.rowcount
+        if rows:
+            cursor.executemany(
+                "DELETE FROM target_coverage WHERE target_id = %s AND covered_from <= %s AND covered_to >= %s",
+                [(row['target_id'], row['tweet_date'], row['tweet_date']) for row in rows]
+            )
+    per_target = {}
+    for row in rows:
+        per_target[row['target_id']] = per_target.get(row['target_id'], 0) + 1
+    for target_id, count in per_target.items():
+        record_tweets_deleted(conn, target_id, count)
+    return deleted
+
+def delete_target_tweets(conn, target_id):
+    """Deletes every tweet of a target and resets its stats and coverage. Returns the number of deleted rows. Does not commit."""
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM tweets WHERE target_id = %s", (target_id,))
+        deleted = cursor.rowcount
+        cursor.execute("UPDATE target_stats SET tweet_count = 0, oldest_tweet_at = NULL, newest_tweet_at = NULL WHERE target_id = %s", (target_id,))
+        cursor.execute("DELETE FROM target_coverage WHERE target_id = %s", (target_id,))
+    return deleted
+
+# Bu kadar yakın (saniye) aralıklar tek aralık sayılır; tarama pencereleri dakika/saniye hassasiyetindedir
+COVERAGE_JOIN_SECONDS = 60
+
+def record_coverage(conn, target_id, covered_from, covered_to):
+    """
+    Marks [covered_from, covered_to] as completely collected for a target, merging it with
+    overlapping or adjacent ranges so the table holds disjoint ranges. Does not commit.
+    """
+    join = timedelta(seconds=COVERAGE_JOIN_SECONDS)
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT id, covered_from, covered_to FROM target_coverage
+            WHERE target_id = %s AND covered_to >= %s AND covered_from <= %s
+            FOR UPDATE
+        """, (target_id, covered_from - join, covered_to + join))
+        overlapping = cursor.fetchall()
+        if overlapping:
+            covered_from = min([covered_from] + [row['covered_from'] for row in overlapping])
+            covered_to = max([covered_to] + [row['covered_to'] for row in overlapping])
+            placeholders = ','.join(['%s'] * len(overlapping))
+            cursor.execute(f"DELETE FROM target_coverage WHERE id IN ({placeholders})", tuple(row['id'] for row in overlapping))
+        cursor.execute(
+            "INSERT INTO target_coverage (target_id, covered_from, covered_to) VALUES (%s, %s, %s)",
+            (target_id, covered_from, covered_to)
         )
+
+def get_coverage(conn, target_id, start_datetime, end_datetime):
+    """Returns the target's covered (from, to) ranges that overlap [start_datetime, end_datetime], oldest first."""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT covered_from, covered_to FROM target_coverage
+            WHERE target_id = %s AND covered_to >= %s AND covered_from <= %s
+            ORDER BY covered_from
+        """, (target_id, start_datetime, end_datetime))
+        return [(row['covered_from'], row['covered_to']) for row in cursor.fetchall()]
+
+def record_target_run(conn, target_id, new_tweets, duration_seconds, run_at):
+    """Stores the outcome of the last scrape run of a target in target_stats. Does not commit."""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO target_stats (target_id, last_run_at, last_run_new_tweets, last_run_seconds)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                last_run_at = VALUES(last_run_at),
+                last_run_new_tweets = VALUES(last_run_new_tweets),
+                last_run_seconds = VALUES(last_run_seconds)
+        """, (target_id, run_at, new_tweets, duration_seconds))
+
+def get_target_stats(conn, target_id):
+    """Returns the target_stats row of a target as a dict (zero counts if it has none yet)."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT * FROM target_stats WHERE target_id = %s", (target_id,))
+        row = cursor.fetchone()
+    return row or {'target_id': target_id, 'tweet_count': 0, 'oldest_tweet_at': None, 'newest_tweet_at': None,
+                   'last_run_at': None, 'last_run_new_tweets': None, 'last_run_seconds': None}
+
+ER_BAD_DB_ERROR = 1049
+
+def create_database(config):
+    """Creates the configured database (first start only)."""
+    conn_init = pymysql.connect(
+        host=config.get('mysql_host', 'localhost'),
+        port=config.get('mysql_port', 3306),
+        user=config.get('mysql_user', 'root'),
+        password=config.get('mysql_password', ''),
+        charset='utf8mb4',
+        cursorclass=pymysql.cursors.DictCursor
+    )
+    try:
         with conn_init.cursor() as cursor:
             cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{config.get('mysql_database', 'xscraper_db')}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
         conn_init.commit()
+    finally:
         conn_init.close()
-    except Exception as e:
-        print(f"Failed to create database during init_db: {e}")
-        return
 
-    conn = get_db_connection()
-    if not conn:
-        print("Skipping DB initialization (cannot connect).")
-        return
+def init_db():
+    """
+    Brings the schema up to date with the versioned migrations in migrations.py.
+    On a current schema this costs one pooled connection and one SELECT; the database
+    itself is only created when the server reports that it does not exist.
+    """
+    config = load_db_config()
+    if config is None:
+        return None
 
+    pool = get_connection_pool()
     try:
-        with conn.cursor() as cursor:
-            # Table: settings
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS settings (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    start_hour INT NOT NULL DEFAULT 0,
-                    interval_hours INT NOT NULL DEFAULT 6
-                )
-            """)
-
-            # Table: admin_users
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS admin_users (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    username VARCHAR(50) NOT NULL UNIQUE,
-                    password_hash VARCHAR(255) NOT NULL
-                )
-            """)
-
-            # Table: targets
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS targets (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    target_name VARCHAR(255) NOT NULL,
-                    target_type ENUM('user', 'list') NOT NULL,
-                    scrape_interval_minutes INT NOT NULL DEFAULT 60,
-                    last_scraped_at DATETIME NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # Try to alter targets table in case it was created before the column was added
-            try:
-                cursor.execute("ALTER TABLE targets ADD COLUMN last_scraped_at DATETIME NULL")
-            except Exception as alt_e:
-                # Ignore if column already exists
-                pass
-
-            try:
-                cursor.execute("ALTER TABLE targets ADD COLUMN scrape_interval_minutes INT NOT NULL DEFAULT 60")
-            except Exception as alt_e:
-                pass
-
-            try:
-                cursor.execute("ALTER TABLE targets ADD COLUMN next_scrape_at DATETIME NULL")
-            except Exception as alt_e:
-                pass
+        conn = pool.acquire()
+    except pymysql.err.OperationalError as e:
+        if e.args[0] != ER_BAD_DB_ERROR:
+            print(f"Skipping DB initialization (cannot connect): {e}")
+            return
+        try:
+            create_database(config)
+            conn = pool.acquire()
+        except Exception as create_e:
+            print(f"Failed to create database during init_db: {create_e}")
+            return
+    except Exception as e:
+        print(f"Skipping DB initialization (cannot connect): {e}")
+        return
 
-            # Populate next_scrape_at for existing targets if NULL
-            try:
-                cursor.execute("""
-                    UPDATE targets
-                    SET next_scrape_at = DATE_ADD(COALESCE(last_scraped_at, NOW()), INTERVAL COALESCE(scrape_interval_minutes, 60) MINUTE)
-                    WHERE next_scrape_at IS NULL
-                """)
-            except Exception as alt_e:
-                pass
-
-            # Table: tweets
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS tweets (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    target_id INT NOT NULL,
-                    tweet_date DATETIME NOT NULL,
-                    link VARCHAR(500) NOT NULL,
-                    username VARCHAR(100),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (target_id) REFERENCES targets(id) ON DELETE CASCADE,
-                    UNIQUE KEY target_link (target_id, link)
-                )
-            """)
-
-            # Insert default admin if table is empty
-            cursor.execute("SELECT COUNT(*) as count FROM admin_users")
-            result = cursor.fetchone()
-            if result['count'] == 0:
-                default_username = 'admin'
-                default_password = 'admin'
-                password_hash = generate_password_hash(default_password)
-                cursor.execute("INSERT INTO admin_users (username, password_hash) VALUES (%s, %s)", (default_username, password_hash))
-                print("Default admin user created (admin/admin).")
-
-            # Insert default settings if table is empty
-            cursor.execute("SELECT COUNT(*) as count FROM settings")
-            result = cursor.fetchone()
-            if result['count'] == 0:
-                cursor.execute("INSERT INTO settings (start_hour, interval_hours) VALUES (0, 6)")
-                print("Default settings initialized.")
-
-        conn.commit()
-        print("Database initialized successfully.")
+    try:
+        applied = migrations.run_migrations(conn)
+        if applied:
+            print(f"Database initialized successfully ({applied} migration(s) applied, schema version {migrations.LATEST_VERSION}).")
     except Exception as e:
         print(f"Database initialization error: {e}")
     finally:
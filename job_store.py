@@ -0,0 +1,358 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from db import get_db_connection, CONFIG_FILE
+
+# Bir işçinin aldığı işi sahiplenme süresi (saniye); süresi dolan iş başka bir işçiye geçer
+LEASE_SECONDS = 60
+# Çalışan işin sahipliği bu aralıkla yenilenir; iptal edilen iş de bu sırada fark edilir
+LEASE_RENEW_SECONDS = 10
+
+# Öncelik şeritleri: işçiler her zaman önce en düşük değerli şeritteki en eski işi alır.
+# Kullanıcının beklediği işler (ana sayfa taraması, ekran görüntüsü, içe aktarma, tek hedef manuel tarama)
+# zamanlanmış hedef taramalarının önüne geçer; en fazla bir hedef taramasının süresi kadar bekler.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# Ekran görüntüsü / Word raporu işleri Selenium sürücüsünü kullanmaz (Node.js servisine gider);
+# kendi işçi havuzunda çalışır, tarama işçilerini bekletmez
+RENDER_JOB_TYPES = ('screenshot',)
+LANE_SCRAPE = 'scrape'
+LANE_RENDER = 'render'
+
+def job_lane(job_type):
+    """Worker pool that runs a job type: LANE_RENDER for RENDER_JOB_TYPES, LANE_SCRAPE for the rest."""
+    return LANE_RENDER if job_type in RENDER_JOB_TYPES else LANE_SCRAPE
+
+# İş çıktıları (Excel / Word) işlemler arası paylaşılabilmesi için diskte tutulur
+JOB_FILES_DIR = os.path.join(os.getcwd(), 'temp')
+
+class JobStore:
+    """
+    Durable job queue shared by every web and worker process.
+    Jobs are claimed with a compare-and-set UPDATE, so two workers can never run the same job.
+    A claimed job holds a lease that its worker renews; if the worker dies the job is queued again.
+    Subclasses provide connect() and the schema (see init()).
+    """
+    placeholder = '%s'
+    insert_ignore = 'INSERT IGNORE'
+    create_statements = ()
+    index_statements = ()
+
+    def __init__(self):
+        # Şerit başına ayrı uyandırma; bir şeridin işçisi diğer şeride gelen bildirimi tüketmez
+        self._wakeups = {LANE_SCRAPE: threading.Event(), LANE_RENDER: threading.Event()}
+
+    def connect(self):
+        raise NotImplementedError
+
+    def fetch_rows(self, cursor):
+        return list(cursor.fetchall())
+
+    def execute(self, sql, params=(), fetch=False):
+        """Runs one statement in its own connection. Returns rows if fetch, else the affected row count."""
+        conn = self.connect()
+        if not conn:
+            raise Exception("İş deposuna bağlanılamadı.")
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql.replace('%s', self.placeholder), params)
+                result = self.fetch_rows(cursor) if fetch else cursor.rowcount
+            finally:
+                cursor.close()
+            conn.commit()
+            return result
+        finally:
+            conn.close()
+
+    def init(self):
+        """Creates the jobs table if needed and adds columns missing from tables of older versions."""
+        for statement in self.create_statements:
+            self.execute(statement)
+        self.add_missing_columns()
+        for statement in self.index_statements:
+            self.execute(statement)
+
+    def add_missing_columns(self):
+        pass
+
+    def enqueue(self, job_type, kwargs, job_id=None, job_key=None, priority=PRIORITY_INTERACTIVE, waiter=None):
+        """
+        Adds a queued job in the given priority lane and wakes local workers. Returns the job id.
+        waiter: token of the requester, registered as the job's first waiter (see attach / detach).
+        """
+        job_id = job_id or str(uuid.uuid4())
+        now = time.time()
+        self.execute(
+            "INSERT INTO jobs (job_id, job_type, job_key, status, kwargs, priority, created_at, updated_at) VALUES (%s, %s, %s, 'queued', %s, %s, %s, %s)",
+            (job_id, job_type, job_key, json.dumps(kwargs), priority, now, now)
+        )
+        if waiter:
+            self.add_waiter(job_id, waiter)
+        self._wakeups[job_lane(job_type)].set()
+        return job_id
+
+    def wait_for_job(self, timeout, lane=LANE_SCRAPE):
+        """Sleeps until a job of this lane is enqueued in this process or the timeout passes (other processes are picked up by polling)."""
+        wakeup = self._wakeups[lane]
+        if wakeup.wait(timeout):
+            wakeup.clear()
+
+    def get(self, job_id):
+        """Returns the job as a dict (kwargs and result decoded), or None."""
+        rows = self.execute("SELECT * FROM jobs WHERE job_id = %s", (job_id,), fetch=True)
+        if not rows:
+            return None
+        job = dict(rows[0])
+        job['kwargs'] = json.loads(job['kwargs']) if job.get('kwargs') else {}
+        job['result'] = json.loads(job['result']) if job.get('result') else None
+        job['progress'] = json.loads(job['progress']) if job.get('progress') else None
+        return job
+
+    def has_pending(self, job_key):
+        rows = self.execute("SELECT job_id FROM jobs WHERE job_key = %s AND status = 'queued' LIMIT 1", (job_key,), fetch=True)
+        return bool(rows)
+
+    def add_waiter(self, job_id, waiter):
+        # Aynı belirteç ikinci kez eklenmez; aynı kullanıcının tekrar gönderdiği istek tek bekleyen sayılır
+        self.execute(f"{self.insert_ignore} INTO job_waiters (job_id, waiter) VALUES (%s, %s)", (job_id, waiter))
+
+    def attach(self, job_key, result_ttl, waiter):
+        """
+        Joins an identical job instead of starting a new one: a queued or running job with this key
+        (waiter is registered on it), or one completed within result_ttl seconds.
+        Returns its job id, or None if there is nothing to share.
+        """
+        rows = self.execute("""
+            SELECT job_id, status FROM jobs
+            WHERE job_key = %s AND (status IN ('queued', 'running') OR (status = 'completed' AND updated_at >= %s))
+            ORDER BY created_at DESC
+            LIMIT 1
+        """, (job_key, time.time() - result_ttl), fetch=True)
+        if not rows:
+            return None
+        job_id = rows[0]['job_id']
+        if rows[0]['status'] == 'completed':
+            return job_id
+        self.add_waiter(job_id, waiter)
+        # İş bu arada bitmiş olabilir: başarıyla bittiyse sonucu paylaşılır, iptal edildiyse yeni iş açılır
+        job = self.get(job_id)
+        if job and job['status'] in ('queued', 'running', 'completed'):
+            return job_id
+        return None
+
+    def detach(self, job_id, waiter):
+        """
+        Removes waiter from a shared job; repeating it with the same token changes nothing.
+        Returns True if other requesters are still waiting (the job keeps running),
+        False if nobody is left and the caller may cancel it.
+        """
+        if waiter:
+            self.execute("DELETE FROM job_waiters WHERE job_id = %s AND waiter = %s", (job_id, waiter))
+        rows = self.execute("SELECT COUNT(*) AS cnt FROM job_waiters WHERE job_id = %s", (job_id,), fetch=True)
+        return rows[0]['cnt'] > 0
+
+    def has_active(self, job_key):
+        """True if a job with this key is queued or running."""
+        rows = self.execute("SELECT job_id FROM jobs WHERE job_key = %s AND status IN ('queued', 'running') LIMIT 1", (job_key,), fetch=True)
+        return bool(rows)
+
+    def claim(self, worker_id, job_types=None, exclude_types=None):
+        """
+        Leases the oldest runnable job (queued, or running with an expired lease) of the most
+        urgent priority lane to worker_id. job_types / exclude_types restrict which job types
+        this worker takes. Returns the job dict, or None if the queue is empty.
+        """
+        type_filter = ''
+        type_params = ()
+        if job_types:
+            type_filter = f"AND job_type IN ({', '.join(['%s'] * len(job_types))})"
+            type_params = tuple(job_types)
+        elif exclude_types:
+            type_filter = f"AND job_type NOT IN ({', '.join(['%s'] * len(exclude_types))})"
+            type_params = tuple(exclude_types)
+
+        while True:
+            now = time.time()
+            rows = self.execute(f"""
+                SELECT job_id FROM jobs
+                WHERE (status = 'queued' OR (status = 'running' AND lease_until < %s)) {type_filter}
+                ORDER BY priority, created_at
+                LIMIT 1
+            """, (now,) + type_params, fetch=True)
+            if not rows:
+                return None
+            job_id = rows[0]['job_id']
+            claimed = self.execute("""
+                UPDATE jobs SET status = 'running', worker_id = %s, lease_until = %s, updated_at = %s
+                WHERE job_id = %s AND (status = 'queued' OR (status = 'running' AND lease_until < %s))
+            """, (worker_id, now + LEASE_SECONDS, now, job_id, now))
+            if claimed:
+                return self.get(job_id)
+            # Başka bir işçi aynı işi önce aldı; sıradakini dene
+
+    def renew(self, job_id, worker_id):
+        """Extends the lease. Returns False if the job was cancelled or taken over by another worker."""
+        now = time.time()
+        return bool(self.execute(
+            "UPDATE jobs SET lease_until = %s, updated_at = %s WHERE job_id = %s AND worker_id = %s AND status = 'running'",
+            (now + LEASE_SECONDS, now, job_id, worker_id)
+        ))
+
+    def set_progress(self, job_id, worker_id, progress):
+        """Stores a progress dict ({'current': .., 'total': ..}) shown by /status while the job runs."""
+        return bool(self.execute(
+            "UPDATE jobs SET progress = %s, updated_at = %s WHERE job_id = %s AND worker_id = %s AND status = 'running'",
+            (json.dumps(progress), time.time(), job_id, worker_id)
+        ))
+
+    def finish(self, job_id, worker_id, status, result=None, error=None):
+        """Stores the outcome of a leased job. A job cancelled meanwhile keeps its cancelled state."""
+        return bool(self.execute(
+            "UPDATE jobs SET status = %s, result = %s, error = %s, lease_until = NULL, updated_at = %s WHERE job_id = %s AND worker_id = %s AND status = 'running'",
+            (status, json.dumps(result, default=str) if result is not None else None, error, time.time(), job_id, worker_id)
+        ))
+
+    def cancel(self, job_id, error):
+        """Marks a queued or running job as failed. Returns False if it had already finished."""
+        return bool(self.execute(
+            "UPDATE jobs SET status = 'failed', error = %s, lease_until = NULL, updated_at = %s WHERE job_id = %s AND status IN ('queued', 'running')",
+            (error, time.time(), job_id)
+        ))
+
+    def purge(self, max_age_seconds):
+        """Deletes finished jobs (and their output files) older than max_age_seconds."""
+        cutoff = time.time() - max_age_seconds
+        rows = self.execute("SELECT job_id FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < %s", (cutoff,), fetch=True)
+        for row in rows:
+            for path in job_file_paths(row['job_id']) + tuple(glob.glob(import_file_path(row['job_id'], '.*'))):
+                if os.path.exists(path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+        self.execute("""
+            DELETE FROM job_waiters WHERE job_id IN (
+                SELECT job_id FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < %s
+            )
+        """, (cutoff,))
+        self.execute("DELETE FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < %s", (cutoff,))
+        return len(rows)
+
+class MySQLJobStore(JobStore):
+    # jobs tablosu migrations.py'deki sürümlü migration'larla oluşturulur ve güncellenir (db.init_db)
+    create_statements = ()
+
+    def connect(self):
+        return get_db_connection()
+
+class SQLiteJobStore(JobStore):
+    placeholder = '?'
+    insert_ignore = 'INSERT OR IGNORE'
+    create_statements = (
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            job_type TEXT NOT NULL,
+            job_key TEXT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            kwargs TEXT NULL,
+            result TEXT NULL,
+            error TEXT NULL,
+            progress TEXT NULL,
+            priority INTEGER NOT NULL DEFAULT 0,
+            worker_id TEXT NULL,
+            lease_until REAL NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS job_waiters (
+            job_id TEXT NOT NULL,
+            waiter TEXT NOT NULL,
+            PRIMARY KEY (job_id, waiter)
+        )
+        """,
+    )
+    index_statements = (
+        "CREATE INDEX IF NOT EXISTS status_priority_created ON jobs (status, priority, created_at)",
+        "CREATE INDEX IF NOT EXISTS job_key_status ON jobs (job_key, status)",
+    )
+    # Eski jobs.db dosyalarında bulunmayabilecek sütunlar: (sütun, tanım); yalnızca eksikse eklenir
+    added_columns = (
+        ('progress', 'TEXT NULL'),
+        ('priority', 'INTEGER NOT NULL DEFAULT 0'),
+    )
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def fetch_rows(self, cursor):
+        return [dict(row) for row in cursor.fetchall()]
+
+    def add_missing_columns(self):
+        existing = {row['name'] for row in self.execute("PRAGMA table_info(jobs)", fetch=True)}
+        for column, definition in self.added_columns:
+            if column not in existing:
+                self.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+
+def get_job_store():
+    """Returns the store selected by config.json ("job_store": "mysql" or "sqlite", "job_store_path")."""
+    config = {}
+    if os.path.exists(CONFIG_FILE):
+        try:
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except Exception:
+            pass
+    if config.get('job_store', 'mysql') == 'sqlite':
+        return SQLiteJobStore(config.get('job_store_path', 'jobs.db'))
+    return MySQLJobStore()
+
+def scrape_job_key(kwargs):
+    """
+    Canonical key of a scrape request: identical target, mode, filters and date range give the same key,
+    so concurrent / repeated submissions can share one run (see JobStore.attach).
+    """
+    canonical = dict(kwargs)
+    if canonical.get('target_username'):
+        canonical['target_username'] = canonical['target_username'].strip().lstrip('@').lower()
+    if canonical.get('search_keyword'):
+        canonical['search_keyword'] = canonical['search_keyword'].strip()
+    digest = hashlib.sha256(json.dumps(canonical, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    return f'scrape:{digest}'
+
+def job_file_paths(job_id):
+    return (os.path.join(JOB_FILES_DIR, f'{job_id}.xlsx'), os.path.join(JOB_FILES_DIR, f'{job_id}.docx'))
+
+def import_file_path(job_id, extension):
+    """Where an uploaded archive is spooled until its import job runs."""
+    return os.path.join(JOB_FILES_DIR, f'import_{job_id}{extension}')
+
+def save_job_files(job_id, stats):
+    """Writes the in-memory Excel/Word outputs of a job to disk and replaces them with their paths."""
+    excel_path, word_path = job_file_paths(job_id)
+    for key, path_key, path in (('excel_file', 'excel_path', excel_path), ('word_file', 'word_path', word_path)):
+        file_obj = stats.pop(key, None)
+        if file_obj:
+            os.makedirs(JOB_FILES_DIR, exist_ok=True)
+            file_obj.seek(0)
+            with open(path, 'wb') as f:
+                shutil.copyfileobj(file_obj, f)
+            file_obj.close()
+            stats[path_key] = path
+    return stats
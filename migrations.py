@@ -0,0 +1,315 @@
+import pymysql
+from datetime import datetime
+from werkzeug.security import generate_password_hash
+
+# Aynı anda başlayan birden fazla sürecin migration'ları iki kez çalıştırmasını engelleyen MySQL kilidi
+MIGRATION_LOCK_NAME = 'xscraper_schema_migrations'
+MIGRATION_LOCK_TIMEOUT = 60
+
+# MySQL hata kodları
+ER_NO_SUCH_TABLE = 1146
+
+def column_exists(cursor, table, column):
+    cursor.execute("""
+        SELECT COUNT(*) AS cnt FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    return cursor.fetchone()['cnt'] > 0
+
+def index_exists(cursor, table, index):
+    cursor.execute("""
+        SELECT COUNT(*) AS cnt FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, (table, index))
+    return cursor.fetchone()['cnt'] > 0
+
+def migrate_initial_schema(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS settings (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            start_hour INT NOT NULL DEFAULT 0,
+            interval_hours INT NOT NULL DEFAULT 6
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS admin_users (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            username VARCHAR(50) NOT NULL UNIQUE,
+            password_hash VARCHAR(255) NOT NULL
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS targets (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            target_name VARCHAR(255) NOT NULL,
+            target_type ENUM('user', 'list') NOT NULL,
+            scrape_interval_minutes INT NOT NULL DEFAULT 60,
+            last_scraped_at DATETIME NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tweets (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            target_id INT NOT NULL,
+            tweet_date DATETIME NOT NULL,
+            link VARCHAR(500) NOT NULL,
+            username VARCHAR(100),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (target_id) REFERENCES targets(id) ON DELETE CASCADE,
+            UNIQUE KEY target_link (target_id, link)
+        )
+    """)
+
+    # Insert default admin if table is empty
+    cursor.execute("SELECT COUNT(*) as count FROM admin_users")
+    if cursor.fetchone()['count'] == 0:
+        cursor.execute("INSERT INTO admin_users (username, password_hash) VALUES (%s, %s)", ('admin', generate_password_hash('admin')))
+        print("Default admin user created (admin/admin).")
+
+    # Insert default settings if table is empty
+    cursor.execute("SELECT COUNT(*) as count FROM settings")
+    if cursor.fetchone()['count'] == 0:
+        cursor.execute("INSERT INTO settings (start_hour, interval_hours) VALUES (0, 6)")
+        print("Default settings initialized.")
+
+def migrate_target_schedule_columns(cursor):
+    # Eski sürümlerde oluşturulmuş targets tablolarında eksik olabilecek sütunlar
+    if not column_exists(cursor, 'targets', 'last_scraped_at'):
+        cursor.execute("ALTER TABLE targets ADD COLUMN last_scraped_at DATETIME NULL")
+    if not column_exists(cursor, 'targets', 'scrape_interval_minutes'):
+        cursor.execute("ALTER TABLE targets ADD COLUMN scrape_interval_minutes INT NOT NULL DEFAULT 60")
+    if not column_exists(cursor, 'targets', 'next_scrape_at'):
+        cursor.execute("ALTER TABLE targets ADD COLUMN next_scrape_at DATETIME NULL")
+
+    # Populate next_scrape_at for existing targets if NULL
+    cursor.execute("""
+        UPDATE targets
+        SET next_scrape_at = DATE_ADD(COALESCE(last_scraped_at, NOW()), INTERVAL COALESCE(scrape_interval_minutes, 60) MINUTE)
+        WHERE next_scrape_at IS NULL
+    """)
+
+def migrate_target_stats(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS target_stats (
+            target_id INT PRIMARY KEY,
+            tweet_count INT UNSIGNED NOT NULL DEFAULT 0,
+            oldest_tweet_at DATETIME NULL,
+            newest_tweet_at DATETIME NULL,
+            last_run_at DATETIME NULL,
+            last_run_new_tweets INT NULL,
+            last_run_seconds DOUBLE NULL,
+            FOREIGN KEY (target_id) REFERENCES targets(id) ON DELETE CASCADE
+        )
+    """)
+
+    # Backfill stats for targets that have none yet
+    cursor.execute("""
+        INSERT INTO target_stats (target_id, tweet_count, oldest_tweet_at, newest_tweet_at)
+        SELECT t.id, COUNT(tw.id), MIN(tw.tweet_date), MAX(tw.tweet_date)
+        FROM targets t
+        LEFT JOIN tweets tw ON tw.target_id = t.id
+        WHERE NOT EXISTS (SELECT 1 FROM target_stats s WHERE s.target_id = t.id)
+        GROUP BY t.id
+    """)
+
+def migrate_tweet_date_index(cursor):
+    # Hedef bazlı tarih aralığı / MAX(tweet_date) / sayfalama sorguları için: (target_id, tweet_date) aralık okuması.
+    # InnoDB ikincil indekslere birincil anahtarı (id) eklediği için (tweet_date, id) sıralaması da indeksten gelir.
+    if not index_exists(cursor, 'tweets', 'target_date'):
+        cursor.execute("ALTER TABLE tweets ADD INDEX target_date (target_id, tweet_date)")
+
+def migrate_target_schedule_index(cursor):
+    # Zamanlayıcının "zamanı gelmiş hedefler" sorgusu için
+    if not index_exists(cursor, 'targets', 'next_scrape'):
+        cursor.execute("ALTER TABLE targets ADD INDEX next_scrape (next_scrape_at)")
+
+# Bir seferde dönüştürülen tweets satırı sayısı (id aralığı); uzun süren tek bir işlem yerine parça parça commit edilir
+BACKFILL_BATCH_SIZE = 50000
+
+# /status/<id> linkinden sayısal tweet id'si (sorgu dizesi ve sondaki yol parçaları atılır)
+STATUS_ID_SQL = "SUBSTRING_INDEX(SUBSTRING_INDEX(SUBSTRING_INDEX(link, '/status/', -1), '?', 1), '/', 1)"
+
+def run_in_id_batches(cursor, sql, params=()):
+    """Runs an UPDATE/DELETE with an `id BETWEEN %s AND %s` range appended to params, batch by batch."""
+    cursor.execute("SELECT MIN(id) AS min_id, MAX(id) AS max_id FROM tweets")
+    bounds = cursor.fetchone()
+    if not bounds or bounds['min_id'] is None:
+        return
+    for start in range(bounds['min_id'], bounds['max_id'] + 1, BACKFILL_BATCH_SIZE):
+        cursor.execute(sql, tuple(params) + (start, start + BACKFILL_BATCH_SIZE - 1))
+        cursor.connection.commit()
+
+def migrate_tweet_snowflake_key(cursor):
+    """
+    Makes the numeric Snowflake id the natural key of tweets: UNIQUE (target_id, tweet_id)
+    replaces UNIQUE (target_id, link), and link is only stored when it differs from
+    https://x.com/<username>/status/<tweet_id> (readers use db.TWEET_LINK_SQL).
+    """
+    if not column_exists(cursor, 'tweets', 'tweet_id'):
+        cursor.execute("ALTER TABLE tweets ADD COLUMN tweet_id BIGINT UNSIGNED NULL AFTER target_id, MODIFY link VARCHAR(500) NULL")
+
+    print("  Backfilling tweet_id from links...")
+    run_in_id_batches(cursor, f"""
+        UPDATE tweets SET tweet_id = CAST({STATUS_ID_SQL} AS UNSIGNED)
+        WHERE tweet_id IS NULL AND link LIKE '%%/status/%%' AND {STATUS_ID_SQL} REGEXP '^[0-9]+$'
+        AND id BETWEEN %s AND %s
+    """)
+
+    # Aynı tweetin farklı link biçimleri (twitter.com / x.com, ?s=20 vb.) ile kaydedilmiş kopyaları: en eskisi kalır
+    cursor.execute("""
+        DELETE tw FROM tweets tw
+        JOIN (
+            SELECT target_id, tweet_id, MIN(id) AS keep_id FROM tweets
+            WHERE tweet_id IS NOT NULL
+            GROUP BY target_id, tweet_id
+            HAVING COUNT(*) > 1
+        ) dup ON tw.target_id = dup.target_id AND tw.tweet_id = dup.tweet_id AND tw.id <> dup.keep_id
+    """)
+    if cursor.rowcount:
+        print(f"  Removed {cursor.rowcount} duplicate tweet rows.")
+        cursor.execute("""
+            UPDATE target_stats s
+            SET tweet_count = (SELECT COUNT(*) FROM tweets tw WHERE tw.target_id = s.target_id)
+        """)
+    cursor.connection.commit()
+
+    print("  Dropping links that can be derived from username and tweet_id...")
+    run_in_id_batches(cursor, """
+        UPDATE tweets SET link = NULL
+        WHERE tweet_id IS NOT NULL AND link = BINARY CONCAT('https://x.com/', username, '/status/', tweet_id)
+        AND id BETWEEN %s AND %s
+    """)
+
+    if not index_exists(cursor, 'tweets', 'target_tweet'):
+        cursor.execute("ALTER TABLE tweets ADD UNIQUE KEY target_tweet (target_id, tweet_id)")
+    if index_exists(cursor, 'tweets', 'target_link'):
+        cursor.execute("ALTER TABLE tweets DROP INDEX target_link")
+
+def migrate_target_coverage(cursor):
+    # Arşivin bir hedef için eksiksiz taradığı zaman aralıkları (birleşik, çakışmayan aralıklar)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS target_coverage (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            target_id INT NOT NULL,
+            covered_from DATETIME NOT NULL,
+            covered_to DATETIME NOT NULL,
+            FOREIGN KEY (target_id) REFERENCES targets(id) ON DELETE CASCADE,
+            INDEX target_covered (target_id, covered_to)
+        )
+    """)
+
+def migrate_jobs_table(cursor):
+    # İş kuyruğu (job_store.MySQLJobStore); önceden her açılışta CREATE/ALTER ile oluşturuluyordu
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id VARCHAR(36) PRIMARY KEY,
+            job_type VARCHAR(30) NOT NULL,
+            job_key VARCHAR(100) NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'queued',
+            kwargs LONGTEXT NULL,
+            result LONGTEXT NULL,
+            error TEXT NULL,
+            progress TEXT NULL,
+            worker_id VARCHAR(100) NULL,
+            lease_until DOUBLE NULL,
+            created_at DOUBLE NOT NULL,
+            updated_at DOUBLE NOT NULL,
+            INDEX status_created (status, created_at),
+            INDEX job_key_status (job_key, status)
+        )
+    """)
+    if not column_exists(cursor, 'jobs', 'progress'):
+        cursor.execute("ALTER TABLE jobs ADD COLUMN progress TEXT NULL AFTER error")
+
+def migrate_jobs_priority(cursor):
+    # Öncelik şeritleri: işçiler (status, priority, created_at) sırasıyla iş alır
+    if not column_exists(cursor, 'jobs', 'priority'):
+        cursor.execute("ALTER TABLE jobs ADD COLUMN priority INT NOT NULL DEFAULT 0 AFTER progress")
+    if not index_exists(cursor, 'jobs', 'status_priority_created'):
+        cursor.execute("ALTER TABLE jobs ADD INDEX status_priority_created (status, priority, created_at)")
+    if index_exists(cursor, 'jobs', 'status_created'):
+        cursor.execute("ALTER TABLE jobs DROP INDEX status_created")
+
+def migrate_job_waiters(cursor):
+    # Birleştirilmiş bir işi bekleyen istekçiler (oturum belirteci başına bir satır); iş son bekleyen ayrılınca iptal edilir
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_waiters (
+            job_id VARCHAR(36) NOT NULL,
+            waiter VARCHAR(64) NOT NULL,
+            PRIMARY KEY (job_id, waiter),
+            FOREIGN KEY (job_id) REFERENCES jobs(job_id) ON DELETE CASCADE
+        )
+    """)
+    # Önceki sürümün her açılışta eklediği sayaç sütunu artık kullanılmıyor
+    if column_exists(cursor, 'jobs', 'waiters'):
+        cursor.execute("ALTER TABLE jobs DROP COLUMN waiters")
+
+# (version, description, function) — yalnızca sona eklenir, mevcut adımlar değiştirilmez
+MIGRATIONS = (
+    (1, 'initial schema', migrate_initial_schema),
+    (2, 'targets schedule columns', migrate_target_schedule_columns),
+    (3, 'target_stats table', migrate_target_stats),
+    (4, 'tweets (target_id, tweet_date) index', migrate_tweet_date_index),
+    (5, 'targets next_scrape_at index', migrate_target_schedule_index),
+    (6, 'tweets keyed by snowflake id', migrate_tweet_snowflake_key),
+    (7, 'target_coverage table', migrate_target_coverage),
+    (8, 'jobs table', migrate_jobs_table),
+    (9, 'jobs priority lanes', migrate_jobs_priority),
+    (10, 'job_waiters table', migrate_job_waiters),
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(cursor):
+    """Returns the applied schema version (0 if the schema_version table does not exist yet)."""
+    try:
+        cursor.execute("SELECT MAX(version) AS version FROM schema_version")
+    except pymysql.err.ProgrammingError as e:
+        if e.args[0] == ER_NO_SUCH_TABLE:
+            return 0
+        raise
+    row = cursor.fetchone()
+    return row['version'] or 0
+
+def run_migrations(conn):
+    """
+    Applies pending migrations in order and records each in schema_version.
+    When the schema is current this is a single SELECT; otherwise the work is serialized
+    across processes with a MySQL named lock. Returns the number of applied migrations.
+    """
+    with conn.cursor() as cursor:
+        if get_schema_version(cursor) >= LATEST_VERSION:
+            return 0
+
+        cursor.execute("SELECT GET_LOCK(%s, %s) AS locked", (MIGRATION_LOCK_NAME, MIGRATION_LOCK_TIMEOUT))
+        if not cursor.fetchone()['locked']:
+            raise Exception("Şema migration kilidi alınamadı (başka bir süreç migration çalıştırıyor olabilir).")
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INT PRIMARY KEY,
+                    description VARCHAR(255) NOT NULL,
+                    applied_at DATETIME NOT NULL
+                )
+            """)
+            # Kilidi beklerken başka bir süreç migration'ları uygulamış olabilir
+            current = get_schema_version(cursor)
+            applied = 0
+            for version, description, migrate in MIGRATIONS:
+                if version <= current:
+                    continue
+                print(f"Applying schema migration {version}: {description}")
+                migrate(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, description, applied_at) VALUES (%s, %s, %s)",
+                    (version, description, datetime.now())
+                )
+                conn.commit()
+                applied += 1
+            return applied
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK_NAME,))
@@ -0,0 +1,138 @@
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from db import get_db_connection
+
+# Diğer süreçlerde (veya doğrudan veritabanında) yapılan değişiklikleri yakalamak için tam yeniden yükleme aralığı (saniye)
+RESYNC_SECONDS = 600
+# Taraması next_scrape_at'i ilerletmeden biten (ör. giriş bilgisi yok, hata) hedef en erken bu kadar sonra yeniden denenir
+RETRY_SECONDS = 60
+
+class TargetScheduler:
+    """
+    In-process scheduler for per-target scrapes.
+    Every target's next_scrape_at is kept in a min-heap; the scheduler thread sleeps until the
+    earliest one is due and hands that target to enqueue(target_id). A target is then left out
+    of the heap until refresh(target_id) reports its new next_scrape_at (after its scrape job
+    or an admin edit). A periodic full reload picks up changes made by other processes.
+    """
+
+    def __init__(self, enqueue, resync_seconds=RESYNC_SECONDS):
+        self.enqueue = enqueue
+        self.resync_seconds = resync_seconds
+        self._heap = []
+        # target_id -> due time; heap entries that no longer match are stale and skipped
+        self._due = {}
+        self._cond = threading.Condition()
+        self._next_resync = 0
+        self._stopped = False
+        self._thread = None
+
+    def load_due_times(self, target_id=None):
+        """Reads {target_id: next_scrape_at} from the database (targets without a time are due now)."""
+        conn = get_db_connection()
+        if not conn:
+            raise Exception("Veritabanı bağlantı hatası.")
+        try:
+            with conn.cursor() as cursor:
+                if target_id is None:
+                    cursor.execute("SELECT id, next_scrape_at FROM targets")
+                else:
+                    cursor.execute("SELECT id, next_scrape_at FROM targets WHERE id = %s", (target_id,))
+                rows = cursor.fetchall()
+        finally:
+            conn.close()
+        return {row['id']: row['next_scrape_at'] or datetime.min for row in rows}
+
+    def reload(self):
+        """Rebuilds the heap from every target's next_scrape_at."""
+        due = self.load_due_times()
+        with self._cond:
+            self._due = due
+            self._heap = [(due_at, target_id) for target_id, due_at in due.items()]
+            heapq.heapify(self._heap)
+            self._next_resync = time.monotonic() + self.resync_seconds
+            self._cond.notify()
+
+    def refresh(self, target_id, after_run=False):
+        """
+        Re-reads one target after it was added, edited, deleted or scraped and wakes the scheduler.
+        after_run: the target was just scraped; if its time did not move forward it is retried after RETRY_SECONDS.
+        """
+        try:
+            due = self.load_due_times(target_id)
+        except Exception as e:
+            print(f"Zamanlayıcı hedef {target_id} için güncellenemedi: {e}", flush=True)
+            return
+        if after_run and target_id in due:
+            due[target_id] = max(due[target_id], datetime.now() + timedelta(seconds=RETRY_SECONDS))
+        with self._cond:
+            if target_id in due:
+                self._due[target_id] = due[target_id]
+                heapq.heappush(self._heap, (due[target_id], target_id))
+            else:
+                self._due.pop(target_id, None)
+            self._cond.notify()
+
+    def next_due_at(self):
+        """Earliest scheduled scrape time (None if no target is waiting)."""
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_stale(self):
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _wait_for_due(self):
+        """Blocks until targets are due (returns their ids) or a full reload is due (returns None)."""
+        with self._cond:
+            while not self._stopped:
+                self._drop_stale()
+                resync_in = self._next_resync - time.monotonic()
+                if resync_in <= 0:
+                    return None
+
+                now = datetime.now()
+                if self._heap and self._heap[0][0] <= now:
+                    due_ids = []
+                    while self._heap and self._heap[0][0] <= now:
+                        due_at, target_id = heapq.heappop(self._heap)
+                        if self._due.get(target_id) == due_at:
+                            del self._due[target_id]
+                            due_ids.append(target_id)
+                    return due_ids
+
+                timeout = resync_in
+                if self._heap:
+                    timeout = min(timeout, (self._heap[0][0] - now).total_seconds())
+                self._cond.wait(timeout)
+            return []
+
+    def _run(self):
+        while not self._stopped:
+            due_ids = self._wait_for_due()
+            if due_ids is None:
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"Zamanlayıcı hedefleri yükleyemedi: {e}", flush=True)
+                    with self._cond:
+                        self._next_resync = time.monotonic() + 60
+                continue
+            for target_id in due_ids:
+                try:
+                    self.enqueue(target_id)
+                except Exception as e:
+                    print(f"Hedef {target_id} kuyruğa eklenemedi: {e}", flush=True)
+                    # Bir sonraki tam yeniden yüklemede tekrar denenir
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
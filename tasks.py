@@ -1,9 +1,11 @@
 import json
 import os
 from datetime import datetime, timedelta
-from db import get_db_connection
-from x_scraper import run_process, CONFIG_FILE
+from db import get_db_connection, get_newest_tweet_id, insert_tweets, record_target_run, record_coverage
+from x_scraper import run_process, is_cancelled, CONFIG_FILE
+import x_snowflake
 import threading
+import time
 
 _cached_credentials = None
 _last_config_mtime = 0
@@ -32,7 +34,13 @@ def load_auth_credentials():
             pass
     return "", ""
 
-def run_incremental_scraping(specific_target_id=None, force_scrape=False):
+def run_incremental_scraping(specific_target_id=None, force_scrape=False, cancel_event=None):
+    """
+    Scrapes every due target (or only specific_target_id) from its newest stored tweet up to now.
+    Database connections are taken per step and never held during a scrape, so long runs do not
+    starve the pool (job lease renewals need one every few seconds).
+    cancel_event: the job's cancellation token; a cancelled run stops without saving the current target.
+    """
     auth_user, auth_pass = load_auth_credentials()
 
     if not auth_user or not auth_pass:
@@ -63,17 +71,21 @@ def run_incremental_scraping(specific_target_id=None, force_scrape=False):
             targets = cursor.fetchall()
     except Exception as e:
         print(f"Failed to fetch targets: {e}")
-        conn.close()
         return
+    finally:
+        conn.close()
 
     if not targets:
         # Eğer tarancak hedef yoksa log kalabalığı yapmamak için sessizce çıkıyoruz.
-        conn.close()
         return
 
     print(f"[{datetime.now()}] Starting incremental scraping job... (Targets: {len(targets)}, Force: {force_scrape})")
 
     for target in targets:
+        if is_cancelled(cancel_event):
+            print("Incremental scraping cancelled.")
+            break
+
         target_id = target['id']
         target_name = target['target_name']
         target_type = target['target_type']
@@ -82,15 +94,26 @@ def run_incremental_scraping(specific_target_id=None, force_scrape=False):
 
         # Determine start date based on last collected tweet
         last_tweet_date = None
+        newest_tweet_id = None
+        conn = get_db_connection()
+        if not conn:
+            print(f"Failed to get last tweet date for {target_name}: no database connection")
+            continue
         try:
             with conn.cursor() as cursor:
                 cursor.execute("SELECT MAX(tweet_date) as last_date FROM tweets WHERE target_id = %s", (target_id,))
                 result = cursor.fetchone()
                 if result and result['last_date']:
                     last_tweet_date = result['last_date']
+
+            # En yeni kayıtlı tweetin Snowflake ID'si: tarayıcı bu ID'ye ulaşınca durur
+            if last_tweet_date:
+                newest_tweet_id = get_newest_tweet_id(conn, target_id)
         except Exception as e:
             print(f"Failed to get last tweet date for {target_name}: {e}")
             continue
+        finally:
+            conn.close()
 
         if last_tweet_date:
             # Add 1 second so we don't re-fetch the exact same second if possible,
@@ -108,6 +131,7 @@ def run_incremental_scraping(specific_target_id=None, force_scrape=False):
         # Run scraper
         try:
             print(f"  Scraping from {start_datetime} to {end_datetime}...")
+            run_started = time.monotonic()
             stats = run_process(
                 username=auth_user,
                 password=auth_pass,
@@ -120,41 +144,50 @@ def run_incremental_scraping(specific_target_id=None, force_scrape=False):
                 only_replies=False,
                 include_retweets=False, # We don't include RTs based on user request (only normal tweets)
                 only_retweets=False,
-                skip_excel=True # We don't need Excel for background task
+                skip_excel=True, # We don't need Excel for background task
+                stop_at_id=newest_tweet_id, # Stop as soon as already stored content is reached
+                cancel_event=cancel_event
             )
 
-            if stats and stats.get('raw_data'):
-                raw_data = stats['raw_data']
-                new_tweets_count = 0
-
-                with conn.cursor() as cursor:
-                    for item in raw_data:
-                        tweet_date = item['Date']
-                        link = item['Link']
-                        username = item.get('Username', '')
-
-                        # Handle potential string dates from scraper
-                        if isinstance(tweet_date, str):
-                            try:
-                                tweet_date = datetime.strptime(tweet_date, "%Y-%m-%d %H:%M:%S")
-                            except ValueError:
-                                # Fallback if parsing fails
-                                pass
-
-                        # Ensure it's STRICTLY newer than last_tweet_date if we had one
-                        if last_tweet_date and isinstance(tweet_date, datetime) and tweet_date <= last_tweet_date:
-                            continue
-
-                        # Insert ignoring duplicates (thanks to UNIQUE constraint on target_id, link)
-                        try:
-                            cursor.execute("""
-                                INSERT IGNORE INTO tweets (target_id, tweet_date, link, username)
-                                VALUES (%s, %s, %s, %s)
-                            """, (target_id, tweet_date, link, username))
-                            if cursor.rowcount > 0:
-                                new_tweets_count += 1
-                        except Exception as e:
-                            print(f"    Error inserting tweet {link}: {e}")
+            if is_cancelled(cancel_event):
+                # Yarım kalan tarama kaydedilmez; hedef bir sonraki çalışmada baştan taranır
+                print(f"  Cancelled while scraping {target_name}.")
+                break
+
+            rows = []
+            for item in (stats or {}).get('raw_data') or []:
+                tweet_date = item['Date']
+                link = item['Link']
+                username = item.get('Username', '')
+
+                # Handle potential string dates from scraper
+                if isinstance(tweet_date, str):
+                    try:
+                        tweet_date = datetime.strptime(tweet_date, "%Y-%m-%d %H:%M:%S")
+                    except ValueError:
+                        # Fallback if parsing fails
+                        pass
+
+                # Ensure it's STRICTLY newer than what we already have (integer Snowflake comparison when possible)
+                tweet_id = x_snowflake.id_from_link(link)
+                if newest_tweet_id and tweet_id:
+                    if tweet_id <= newest_tweet_id:
+                        continue
+                elif last_tweet_date and isinstance(tweet_date, datetime) and tweet_date <= last_tweet_date:
+                    continue
+
+                rows.append((tweet_date, link, username))
+
+            conn = get_db_connection()
+            if not conn:
+                raise Exception("Veritabanı bağlantı hatası.")
+            try:
+                # Insert ignoring duplicates (thanks to UNIQUE constraint on target_id, tweet_id)
+                new_tweets_count = insert_tweets(conn, target_id, rows) if rows else 0
+                record_target_run(conn, target_id, new_tweets_count, time.monotonic() - run_started, current_time)
+                if stats and not stats.get('incomplete_targets'):
+                    # Bu pencere artık arşivde eksiksiz; ana sayfa istekleri buradan karşılanabilir
+                    record_coverage(conn, target_id, start_datetime, end_datetime)
 
                 with conn.cursor() as cursor:
                     if force_scrape and target.get('next_scrape_at'):
@@ -164,7 +197,7 @@ def run_incremental_scraping(specific_target_id=None, force_scrape=False):
                             SET last_scraped_at = %s
                             WHERE id = %s
                         """, (current_time, target_id))
-                        print(f"  Completed {target_name}: {new_tweets_count} new tweets saved. (Manual scrape, schedule unchanged)")
+                        schedule_note = "(Manual scrape, schedule unchanged)"
                     else:
                         # Otomatik taramaysa veya next_scrape_at boşsa, yeni tarama zamanını hesapla.
                         interval_minutes = target.get('scrape_interval_minutes', 60) or 60
@@ -185,53 +218,30 @@ def run_incremental_scraping(specific_target_id=None, force_scrape=False):
                                 next_scrape_at = %s
                             WHERE id = %s
                         """, (current_time, next_scrape_time, target_id))
-                        print(f"  Completed {target_name}: {new_tweets_count} new tweets saved. Next scrape at {next_scrape_time}")
-                conn.commit()
-            else:
-                with conn.cursor() as cursor:
-                    if force_scrape and target.get('next_scrape_at'):
-                        cursor.execute("""
-                            UPDATE targets
-                            SET last_scraped_at = %s
-                            WHERE id = %s
-                        """, (current_time, target_id))
-                        print(f"  Completed {target_name}: 0 new tweets. (Manual scrape, schedule unchanged)")
-                    else:
-                        interval_minutes = target.get('scrape_interval_minutes', 60) or 60
-                        old_next_scrape = target.get('next_scrape_at')
-
-                        if old_next_scrape:
-                            next_scrape_time = old_next_scrape
-                            while next_scrape_time <= current_time:
-                                next_scrape_time += timedelta(minutes=interval_minutes)
-                        else:
-                            next_scrape_time = current_time + timedelta(minutes=interval_minutes)
-
-                        cursor.execute("""
-                            UPDATE targets
-                            SET last_scraped_at = %s,
-                                next_scrape_at = %s
-                            WHERE id = %s
-                        """, (current_time, next_scrape_time, target_id))
-                        print(f"  Completed {target_name}: 0 new tweets. Next scrape at {next_scrape_time}")
+                        schedule_note = f"Next scrape at {next_scrape_time}"
                 conn.commit()
+            finally:
+                conn.close()
+            print(f"  Completed {target_name}: {new_tweets_count} new tweets saved. {schedule_note}")
 
         except Exception as e:
             print(f"Error processing target {target_name}: {e}")
 
-    conn.close()
     print(f"[{datetime.now()}] Incremental scraping job finished.")
 
 if __name__ == '__main__':
     # Can run this manually to test
     run_incremental_scraping()
 
-def run_daily_verification():
+def run_daily_verification(specific_target_id=None, day=None, cancel_event=None):
     """
     Her gece 00:05'te çalışacak doğrulama görevi.
     Sadece dünkü 24 saatlik zaman dilimini kapsayan tweetleri çeker,
     INSERT IGNORE mantığıyla sadece eksik olanları ekler.
     Bu işlem target_schedule zamanlamasını bozmaz.
+    specific_target_id: yalnızca bu hedefi doğrula (hedef başına iş).
+    day: doğrulanacak gün ('YYYY-MM-DD'); verilmezse dün. Kuyrukta bekleyen iş gece yarısını geçse de aynı günü doğrular.
+    cancel_event: işin iptal belirteci. Veritabanı bağlantısı tarama sırasında tutulmaz.
     """
     auth_user, auth_pass = load_auth_credentials()
 
@@ -245,25 +255,35 @@ def run_daily_verification():
     targets = []
     try:
         with conn.cursor() as cursor:
-            cursor.execute("SELECT * FROM targets")
+            if specific_target_id:
+                cursor.execute("SELECT * FROM targets WHERE id = %s", (specific_target_id,))
+            else:
+                cursor.execute("SELECT * FROM targets")
             targets = cursor.fetchall()
     except Exception as e:
         print(f"Failed to fetch targets for daily verification: {e}")
-        conn.close()
         return
+    finally:
+        conn.close()
 
     if not targets:
-        conn.close()
         return
 
     # Dünün tarihi
-    now = datetime.now()
-    yesterday_start = datetime(now.year, now.month, now.day) - timedelta(days=1)
-    yesterday_end = datetime(now.year, now.month, now.day) - timedelta(seconds=1)
+    if day:
+        yesterday_start = datetime.strptime(day, '%Y-%m-%d')
+    else:
+        now = datetime.now()
+        yesterday_start = datetime(now.year, now.month, now.day) - timedelta(days=1)
+    yesterday_end = yesterday_start + timedelta(days=1, seconds=-1)
 
     print(f"[{datetime.now()}] Starting daily verification job... Fetching data between {yesterday_start} and {yesterday_end} (Targets: {len(targets)})")
 
     for target in targets:
+        if is_cancelled(cancel_event):
+            print("Daily verification cancelled.")
+            break
+
         target_id = target['id']
         target_name = target['target_name']
         target_type = target['target_type']
@@ -285,41 +305,45 @@ def run_daily_verification():
                 only_replies=False,
                 include_retweets=False,
                 only_retweets=False,
-                skip_excel=True
+                skip_excel=True,
+                cancel_event=cancel_event
             )
 
-            if stats and stats.get('raw_data'):
-                raw_data = stats['raw_data']
-                new_tweets_count = 0
+            if is_cancelled(cancel_event):
+                print(f"  Cancelled while verifying {target_name}.")
+                break
 
-                with conn.cursor() as cursor:
-                    for item in raw_data:
-                        tweet_date = item['Date']
-                        link = item['Link']
-                        username = item.get('Username', '')
-
-                        if isinstance(tweet_date, str):
-                            try:
-                                tweet_date = datetime.strptime(tweet_date, "%Y-%m-%d %H:%M:%S")
-                            except ValueError:
-                                pass
-
-                        try:
-                            cursor.execute("""
-                                INSERT IGNORE INTO tweets (target_id, tweet_date, link, username)
-                                VALUES (%s, %s, %s, %s)
-                            """, (target_id, tweet_date, link, username))
-                            if cursor.rowcount > 0:
-                                new_tweets_count += 1
-                        except Exception as e:
-                            print(f"    Error inserting missing tweet {link}: {e}")
-                conn.commit()
-                print(f"  Verification completed for {target_name}: {new_tweets_count} missing tweets recovered.")
-            else:
+            rows = []
+            for item in (stats or {}).get('raw_data') or []:
+                tweet_date = item['Date']
+                link = item['Link']
+                username = item.get('Username', '')
+
+                if isinstance(tweet_date, str):
+                    try:
+                        tweet_date = datetime.strptime(tweet_date, "%Y-%m-%d %H:%M:%S")
+                    except ValueError:
+                        pass
+
+                rows.append((tweet_date, link, username))
+
+            if not stats:
                 print(f"  Verification completed for {target_name}: 0 missing tweets found.")
+                continue
+
+            conn = get_db_connection()
+            if not conn:
+                raise Exception("Veritabanı bağlantı hatası.")
+            try:
+                new_tweets_count = insert_tweets(conn, target_id, rows) if rows else 0
+                if not stats.get('incomplete_targets'):
+                    record_coverage(conn, target_id, yesterday_start, yesterday_end)
+                conn.commit()
+            finally:
+                conn.close()
+            print(f"  Verification completed for {target_name}: {new_tweets_count} missing tweets recovered.")
 
         except Exception as e:
             print(f"Error verifying target {target_name}: {e}")
 
-    conn.close()
     print(f"[{datetime.now()}] Daily verification job finished.")
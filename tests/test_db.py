@@ -0,0 +1,78 @@
+from datetime import datetime
+
+import db
+
+
+class FakeCursor:
+    """Minimal INSERT IGNORE emulation: rows are unique on (target_id, tweet_id); usernames 'BAD' make a statement fail."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=()):
+        self.conn.statements.append(sql)
+        self.rowcount = 0
+        if not sql.startswith("INSERT IGNORE INTO tweets"):
+            return
+        rows = [tuple(params[i:i + 5]) for i in range(0, len(params), 5)]
+        if any(row[4] == 'BAD' for row in rows):
+            raise Exception("Data too long for column 'username'")
+        for row in rows:
+            key = (row[0], row[1])
+            if key not in self.conn.tweets:
+                self.conn.tweets[key] = row
+                self.rowcount += 1
+
+
+class FakeConnection:
+    def __init__(self):
+        self.tweets = {}
+        self.statements = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+def link(tweet_id, username='user'):
+    return f'https://x.com/{username}/status/{tweet_id}'
+
+
+def test_insert_tweets_counts_only_new_rows_and_compacts_links():
+    conn = FakeConnection()
+    conn.tweets[(1, 100)] = (1, 100, datetime(2026, 1, 1), None, 'user')
+    rows = [
+        (datetime(2026, 1, 1), link(100), 'user'),
+        (datetime(2026, 1, 2), link(101), 'user'),
+        (datetime(2026, 1, 3), 'https://twitter.com/user/status/102?s=20', 'user'),
+        (datetime(2026, 1, 4), 'https://x.com/user', 'user'),
+    ]
+    assert db.insert_tweets(conn, 1, rows, chunk_size=2) == 2
+    assert conn.tweets[(1, 101)][3] is None
+    assert conn.tweets[(1, 102)][3] == 'https://twitter.com/user/status/102?s=20'
+    bulk = [sql for sql in conn.statements if sql.startswith("INSERT IGNORE INTO tweets")]
+    assert len(bulk) == 2
+    assert any('INSERT INTO target_stats' in sql for sql in conn.statements)
+
+
+def test_insert_tweets_falls_back_to_single_rows():
+    conn = FakeConnection()
+    rows = [
+        (datetime(2026, 1, 1), link(200), 'user'),
+        (datetime(2026, 1, 2), link(201), 'BAD'),
+        (datetime(2026, 1, 3), link(202), 'user'),
+    ]
+    assert db.insert_tweets(conn, 1, rows) == 2
+    assert set(conn.tweets) == {(1, 200), (1, 202)}
+
+
+def test_insert_tweets_nothing_new_skips_stats():
+    conn = FakeConnection()
+    assert db.insert_tweets(conn, 1, []) == 0
+    assert not any('target_stats' in sql for sql in conn.statements)
@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+import job_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = job_store.SQLiteJobStore(str(tmp_path / 'jobs.db'))
+    store.init()
+    return store
+
+
+def test_init_is_repeatable_and_upgrades_old_tables(tmp_path):
+    store = job_store.SQLiteJobStore(str(tmp_path / 'old.db'))
+    store.execute("""
+        CREATE TABLE jobs (job_id TEXT PRIMARY KEY, job_type TEXT NOT NULL, job_key TEXT NULL,
+            status TEXT NOT NULL DEFAULT 'queued', kwargs TEXT NULL, result TEXT NULL, error TEXT NULL,
+            worker_id TEXT NULL, lease_until REAL NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL)
+    """)
+    store.init()
+    store.init()
+    columns = {row['name'] for row in store.execute("PRAGMA table_info(jobs)", fetch=True)}
+    assert {'progress', 'priority'} <= columns
+
+
+def test_claim_takes_most_urgent_lane_first(store):
+    background = store.enqueue('admin_scrape', {}, priority=job_store.PRIORITY_BACKGROUND)
+    interactive = store.enqueue('scrape', {'n': 1})
+    assert store.claim('w1')['job_id'] == interactive
+    assert store.claim('w2')['job_id'] == background
+    assert store.claim('w3') is None
+
+
+def test_claim_respects_lane_filters(store):
+    render = store.enqueue('screenshot', {})
+    scrape = store.enqueue('scrape', {})
+    assert store.claim('w1', exclude_types=job_store.RENDER_JOB_TYPES)['job_id'] == scrape
+    assert store.claim('w2', exclude_types=job_store.RENDER_JOB_TYPES) is None
+    assert store.claim('r1', job_types=job_store.RENDER_JOB_TYPES)['job_id'] == render
+
+
+def test_expired_lease_is_claimed_again(store):
+    job_id = store.enqueue('scrape', {})
+    store.claim('w1')
+    assert store.claim('w2') is None
+    store.execute("UPDATE jobs SET lease_until = %s WHERE job_id = %s", (time.time() - 1, job_id))
+    assert store.claim('w2')['job_id'] == job_id
+    # Eski işçi sahipliğini kaybetti; sonucu yazamaz
+    assert store.renew(job_id, 'w1') is False
+    assert store.finish(job_id, 'w1', 'completed') is False
+    assert store.finish(job_id, 'w2', 'completed', result={'count': 3}) is True
+    assert store.get(job_id)['result'] == {'count': 3}
+
+
+def test_cancelled_job_is_not_claimed(store):
+    job_id = store.enqueue('scrape', {})
+    assert store.cancel(job_id, 'iptal') is True
+    assert store.claim('w1') is None
+    assert store.cancel(job_id, 'iptal') is False
+
+
+def test_attach_shares_running_and_recent_jobs(store):
+    job_id = store.enqueue('scrape', {}, job_key='k', waiter='a')
+    assert store.attach('k', 300, 'b') == job_id
+    store.claim('w1')
+    store.finish(job_id, 'w1', 'completed', result={})
+    assert store.attach('k', 300, 'c') == job_id
+    assert store.attach('k', 0, 'c') is None
+    assert store.attach('other', 300, 'c') is None
+
+
+def test_detach_is_idempotent_per_waiter(store):
+    job_id = store.enqueue('scrape', {}, job_key='k', waiter='a')
+    store.attach('k', 300, 'b')
+    # Aynı kullanıcı tekrar tekrar iptal etse de diğer bekleyen için iş sürer
+    assert store.detach(job_id, 'a') is True
+    assert store.detach(job_id, 'a') is True
+    assert store.detach(job_id, None) is True
+    assert store.detach(job_id, 'b') is False
+
+
+def test_purge_removes_old_finished_jobs_and_waiters(store):
+    job_id = store.enqueue('scrape', {}, job_key='k', waiter='a')
+    store.cancel(job_id, 'iptal')
+    assert store.purge(60) == 0
+    store.execute("UPDATE jobs SET updated_at = 0")
+    assert store.purge(60) == 1
+    assert store.get(job_id) is None
+    assert store.execute("SELECT COUNT(*) AS cnt FROM job_waiters", fetch=True)[0]['cnt'] == 0
+
+
+def test_scrape_job_key_normalizes_target_and_keyword():
+    base = {'target_username': 'User', 'search_keyword': 'x', 'start_date_str': '01-01-2026'}
+    same = {'target_username': ' @user ', 'search_keyword': 'x ', 'start_date_str': '01-01-2026'}
+    other = dict(base, start_date_str='02-01-2026')
+    assert job_store.scrape_job_key(base) == job_store.scrape_job_key(same)
+    assert job_store.scrape_job_key(base) != job_store.scrape_job_key(other)
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import tweet_archive
+
+
+START = datetime(2026, 1, 1)
+END = datetime(2026, 1, 10)
+
+
+def test_find_gaps():
+    coverage = [
+        (datetime(2025, 12, 1), datetime(2026, 1, 3)),
+        (datetime(2026, 1, 5), datetime(2026, 1, 6)),
+        (datetime(2026, 1, 9), datetime(2026, 2, 1)),
+    ]
+    assert tweet_archive.find_gaps(coverage, START, END) == [
+        (datetime(2026, 1, 3), datetime(2026, 1, 5)),
+        (datetime(2026, 1, 6), datetime(2026, 1, 9)),
+    ]
+    assert tweet_archive.find_gaps([], START, END) == [(START, END)]
+    assert tweet_archive.find_gaps([(datetime(2025, 1, 1), datetime(2027, 1, 1))], START, END) == []
+
+
+def test_merge_rows_dedupes_by_snowflake_id():
+    rows = [
+        {'Date': datetime(2026, 1, 3), 'Link': 'https://x.com/a/status/200'},
+        {'Date': datetime(2026, 1, 2), 'Link': 'https://x.com/a/status/100'},
+        {'Date': datetime(2026, 1, 3), 'Link': 'https://twitter.com/A/status/200?s=20'},
+    ]
+    merged = tweet_archive.merge_rows(rows)
+    assert [row['Link'] for row in merged] == ['https://x.com/a/status/100', 'https://x.com/a/status/200']
+
+
+def test_is_archive_eligible():
+    assert tweet_archive.is_archive_eligible({'scrape_mode': 'profile'})
+    assert not tweet_archive.is_archive_eligible({'scrape_mode': 'list'})
+    assert not tweet_archive.is_archive_eligible({'scrape_mode': 'profile', 'only_replies': True})
+    assert not tweet_archive.is_archive_eligible({'scrape_mode': 'profile', 'search_keyword': 'x'})
+
+
+def test_plan_reads_only_covered_ranges(monkeypatch):
+    coverage = {7: [(datetime(2025, 12, 1), datetime(2026, 1, 3)), (datetime(2026, 1, 5), datetime(2026, 1, 6))]}
+    fetched = {}
+    monkeypatch.setattr(tweet_archive, 'find_tracked_targets', lambda conn, handles: {'tracked': 7})
+    monkeypatch.setattr(tweet_archive, 'get_coverage', lambda conn, target_id, start, end: coverage.get(target_id, []))
+
+    def fake_fetch(conn, target_id, ranges):
+        fetched[target_id] = ranges
+        return [{'Date': range_start, 'Link': f'https://x.com/tracked/status/{n}'} for n, (range_start, _) in enumerate(ranges)]
+    monkeypatch.setattr(tweet_archive, 'fetch_archive_rows', fake_fetch)
+
+    archive_rows, live_pieces = tweet_archive.plan_archive_request(None, ['@Tracked', 'other'], START, END)
+    assert fetched[7] == [(START, datetime(2026, 1, 3)), (datetime(2026, 1, 5), datetime(2026, 1, 6))]
+    assert len(archive_rows) == 2
+    assert live_pieces == [
+        ('@Tracked', datetime(2026, 1, 3), datetime(2026, 1, 5)),
+        ('@Tracked', datetime(2026, 1, 6), END),
+        ('other', START, END),
+    ]
+
+
+def test_plan_without_tracked_targets_returns_none(monkeypatch):
+    monkeypatch.setattr(tweet_archive, 'find_tracked_targets', lambda conn, handles: {})
+    assert tweet_archive.plan_archive_request(None, ['someone'], START, END) is None
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import tweet_import
+import x_scraper
+
+
+ROWS = [{'Date': datetime(2026, 1, day), 'Link': f'https://x.com/user/status/{day}', 'Username': 'user'} for day in range(1, 6)]
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_count_rows_of_exported_workbook_matches_rows_read(tmp_path, compact):
+    path = str(tmp_path / 'export.xlsx')
+    x_scraper.save_to_excel(ROWS, path, compact=compact)
+    # İlerleme toplamı, okuyucunun döndürdüğü satır sayısıyla (boş ayraç satırları dahil) aynı olmalı
+    rows_read = sum(len(chunk) for chunk in tweet_import.iter_file_chunks(path, chunk_size=2))
+    assert tweet_import.count_rows(path) == rows_read == (5 if compact else 10)
+
+
+def test_count_rows_of_csv(tmp_path):
+    path = tmp_path / 'export.csv'
+    path.write_text('Date,Link,Username\n' + ''.join(f"{row['Date']},{row['Link']},user\n" for row in ROWS), encoding='utf-8')
+    assert tweet_import.count_rows(str(path)) == 5
+
+
+def test_xls_is_read_whole_and_sliced(tmp_path, monkeypatch):
+    path = str(tmp_path / 'legacy.xls')
+    monkeypatch.setattr(tweet_import.pd, 'read_excel', lambda source, dtype=None: pd.DataFrame(ROWS))
+    chunks = list(tweet_import.iter_file_chunks(path, chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert tweet_import.count_rows(path) is None
+
+
+def test_xls_without_reader_gives_clear_error(tmp_path, monkeypatch):
+    def missing_xlrd(source, dtype=None):
+        raise ImportError("Missing optional dependency 'xlrd'.")
+    monkeypatch.setattr(tweet_import.pd, 'read_excel', missing_xlrd)
+    with pytest.raises(ValueError, match='xlrd'):
+        list(tweet_import.iter_file_chunks(str(tmp_path / 'legacy.xls')))
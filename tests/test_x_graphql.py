@@ -0,0 +1,129 @@
+import base64
+import json
+import os
+
+import x_graphql
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def records_by_id(payload):
+    return {record['timeline_id']: record for record in x_graphql.parse_timeline_response(payload)}
+
+
+def test_is_timeline_url():
+    assert x_graphql.is_timeline_url('https://x.com/i/api/graphql/E3opETHurmVJflFsUBVuUQ/UserTweets?variables=%7B%7D')
+    assert x_graphql.is_timeline_url('https://x.com/i/api/graphql/abc/SearchTimeline')
+    assert not x_graphql.is_timeline_url('https://x.com/i/api/graphql/abc/UserByScreenName?variables=%7B%7D')
+    assert not x_graphql.is_timeline_url('https://x.com/ornek/status/1')
+    assert not x_graphql.is_timeline_url(None)
+
+
+def test_parse_normal_tweet():
+    record = records_by_id(load_fixture('user_tweets_page1.json'))['2008841035576246272']
+    assert record == {
+        'id': '2008841035576246272',
+        'timeline_id': '2008841035576246272',
+        'created_at': 'Wed Jan 07 10:00:00 +0000 2026',
+        'author': 'ornek',
+        'is_rt': False,
+        'is_self_rt': False,
+        'is_reply': False,
+        'reply_to': None,
+        'pinned': False,
+        'link': 'https://x.com/ornek/status/2008841035576246272',
+        'text': 'Normal tweet',
+    }
+    assert str(x_graphql.parse_created_at(record['created_at'])) == '2026-01-07 13:00:00'
+
+
+def test_parse_retweet_points_at_original():
+    record = records_by_id(load_fixture('user_tweets_page1.json'))['2008599443665846272']
+    assert record['is_rt'] is True
+    assert record['is_self_rt'] is False
+    assert record['id'] == '2008086060856246272'
+    assert record['author'] == 'baska'
+    assert record['link'] == 'https://x.com/baska/status/2008086060856246272'
+    assert record['text'] == 'Retweetlenen tweet'
+    # Zaman çizelgesindeki tarih retweet'in tarihidir
+    assert record['created_at'] == 'Tue Jan 06 18:00:00 +0000 2026'
+
+
+def test_parse_conversation_module_and_visibility_wrapper():
+    records = records_by_id(load_fixture('user_tweets_page1.json'))
+    root = records['2008463548216246272']
+    reply = records['2008478647710646272']
+    assert root['author'] == 'baska' and not root['is_reply']
+    assert reply['author'] == 'ornek'
+    assert reply['is_reply'] is True
+    assert reply['reply_to'] == 'Baska'
+
+
+def test_parse_pinned_entry():
+    records = x_graphql.parse_timeline_response(load_fixture('user_tweets_page1.json'))
+    pinned = [record for record in records if record['pinned']]
+    assert [record['id'] for record in pinned] == ['1929145904133046272']
+    # İmleç girdileri kayıt üretmez; sıralama zaman çizelgesindeki gibidir
+    assert [record['timeline_id'] for record in records] == [
+        '2008841035576246272', '2008599443665846272', '2008463548216246272', '2008478647710646272', '1929145904133046272',
+    ]
+
+
+def test_parse_accepts_raw_json_and_skips_unknown_results():
+    raw = json.dumps(load_fixture('user_tweets_page1.json')).encode('utf-8')
+    assert len(x_graphql.parse_timeline_response(raw)) == 5
+    assert x_graphql.tweet_result_to_record({'__typename': 'TweetTombstone'}) is None
+    assert x_graphql.parse_timeline_response({'data': {}}) == []
+
+
+class FakeDriver:
+    def __init__(self, log_entries, bodies):
+        self.log_entries = log_entries
+        self.bodies = bodies
+
+    def get_log(self, name):
+        entries, self.log_entries = self.log_entries, []
+        return entries
+
+    def execute_cdp_cmd(self, command, params):
+        body = self.bodies.get(params['requestId'])
+        if body is None:
+            raise Exception('No resource with given identifier found')
+        return body
+
+
+def network_event(request_id, url):
+    message = {'message': {'method': 'Network.responseReceived', 'params': {'requestId': request_id, 'response': {'url': url}}}}
+    return {'message': json.dumps(message)}
+
+
+def test_drain_timeline_responses_waits_for_pending_bodies():
+    raw = json.dumps(load_fixture('user_tweets_page1.json')).encode('utf-8')
+    driver = FakeDriver(
+        [network_event('1', 'https://x.com/i/api/graphql/q/UserTweets?variables=%7B%7D'),
+         network_event('2', 'https://x.com/i/api/graphql/q/UserByScreenName')],
+        {},
+    )
+    pending = {}
+    assert x_graphql.drain_timeline_responses(driver, pending) == []
+    assert list(pending) == ['1']
+
+    driver.bodies['1'] = {'body': base64.b64encode(raw).decode('ascii'), 'base64Encoded': True}
+    records = x_graphql.drain_timeline_responses(driver, pending)
+    assert len(records) == 5
+    assert pending == {}
+
+
+def test_find_bottom_cursor():
+    assert x_graphql.find_bottom_cursor(load_fixture('user_tweets_page1.json')) == 'DAABCgABGk1-bottom'
+    assert x_graphql.find_bottom_cursor(json.dumps(load_fixture('user_tweets_page3.json'))) == 'DAABCgABGk3-bottom'
+    # Bazı sayfalarda imleç TimelineReplaceEntry talimatının 'entry' alanında gelir
+    replaced = {'instructions': [{'type': 'TimelineReplaceEntry', 'entry': {'content': {'cursorType': 'Bottom', 'value': 'next'}}}]}
+    assert x_graphql.find_bottom_cursor(replaced) == 'next'
+    assert x_graphql.find_bottom_cursor({'data': {}}) is None
@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import x_http
+import x_scraper
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Kaydedilmiş sayfalar, istekteki imlece göre sırayla sunulur
+PAGES_BY_CURSOR = {
+    None: 'user_tweets_page1.json',
+    'DAABCgABGk1-bottom': 'user_tweets_page2.json',
+    'DAABCgABGk2-bottom': 'user_tweets_page3.json',
+}
+
+
+class RecordedTimelineHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        operation = url.path.rstrip('/').split('/')[-1]
+        variables = json.loads(parse_qs(url.query)['variables'][0])
+        self.server.requests.append({'operation': operation, 'variables': variables, 'headers': dict(self.headers)})
+
+        if operation == 'UserByScreenName':
+            found = variables.get('screen_name') == 'ornek'
+            payload = {'data': {'user': {'result': {'__typename': 'User', 'rest_id': '42'}}}} if found else {'data': {}}
+        elif operation == 'UserTweets' and variables.get('cursor') in PAGES_BY_CURSOR:
+            with open(os.path.join(FIXTURES, PAGES_BY_CURSOR[variables.get('cursor')]), 'rb') as f:
+                payload = json.load(f)
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), RecordedTimelineHandler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def base_url(httpd):
+    return f'http://127.0.0.1:{httpd.server_address[1]}/i/api/graphql'
+
+
+def write_cookies(path, cookies):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(cookies, f)
+    return str(path)
+
+
+@pytest.fixture
+def cookie_file(tmp_path):
+    return write_cookies(tmp_path / 'cookies.json', [
+        {'name': 'auth_token', 'value': 'auth-secret', 'domain': '127.0.0.1', 'path': '/'},
+        {'name': 'ct0', 'value': 'csrf-token', 'domain': '127.0.0.1', 'path': '/'},
+        {'name': 'guest_id', 'value': None, 'domain': '127.0.0.1'},
+    ])
+
+
+def test_open_requires_session_cookies(tmp_path):
+    assert x_http.XHttpClient(str(tmp_path / 'missing.json')).open() is False
+    broken = tmp_path / 'broken.json'
+    broken.write_text('{', encoding='utf-8')
+    assert x_http.XHttpClient(str(broken)).open() is False
+    # ct0 tek başına yetmez; oturum için auth_token da gerekir
+    only_csrf = write_cookies(tmp_path / 'csrf.json', [{'name': 'ct0', 'value': 'csrf-token'}])
+    assert x_http.XHttpClient(only_csrf).open() is False
+
+
+def test_client_loads_cookies_and_follows_bottom_cursor(server, cookie_file):
+    client = x_http.XHttpClient(cookie_file, base_url=base_url(server), query_ids={'UserTweets': 'fixtureQuery'})
+    assert client.open() is True
+    try:
+        assert client.get_user_id('ornek') == '42'
+        assert client.get_user_id('yok') is None
+        pages = list(client.iter_user_tweets('42'))
+    finally:
+        client.close()
+
+    assert [len(records) for records in pages] == [5, 1, 0]
+    timeline_requests = [request for request in server.requests if request['operation'] == 'UserTweets']
+    assert [request['variables'].get('cursor') for request in timeline_requests] == [None, 'DAABCgABGk1-bottom', 'DAABCgABGk2-bottom']
+    assert all(request['variables']['userId'] == '42' for request in timeline_requests)
+
+    headers = timeline_requests[0]['headers']
+    assert headers['x-csrf-token'] == 'csrf-token'
+    assert 'auth_token=auth-secret' in headers['Cookie']
+    assert headers['authorization'] == f'Bearer {x_http.DEFAULT_BEARER_TOKEN}'
+
+
+def test_http_backend_scrapes_recorded_timeline(server, cookie_file):
+    backend = x_scraper.HttpBackend(base_url=base_url(server), cookie_file=cookie_file, page_delay=None)
+    stats = x_scraper.run_process(
+        'user', 'pass', '@Ornek', None, None,
+        start_datetime_obj=datetime(2026, 1, 1), end_datetime_obj=datetime(2026, 1, 31),
+        skip_excel=True, backend=backend
+    )
+    # Retweet, yanıt ve aralık dışındaki sabitlenmiş tweet elenir; iki sayfadaki tweet'ler tarih sırasıyla döner
+    assert stats['links'] == [
+        'https://x.com/ornek/status/2007383934366646272',
+        'https://x.com/ornek/status/2008841035576246272',
+    ]
+    assert [request['operation'] for request in server.requests] == ['UserByScreenName', 'UserTweets', 'UserTweets', 'UserTweets']
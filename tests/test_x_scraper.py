@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+import x_scraper
+import x_snowflake
+
+
+def test_split_date_windows_short_range_is_one_window():
+    start, end = datetime(2026, 1, 1), datetime(2026, 1, 3)
+    assert x_scraper.split_date_windows(start, end) == [(start, end)]
+
+
+def test_split_date_windows_covers_range_newest_first():
+    start, end = datetime(2025, 1, 1), datetime(2025, 3, 1)
+    windows = x_scraper.split_date_windows(start, end, max_window=timedelta(days=7))
+    assert windows[0][1] == end
+    assert windows[-1][0] == start
+    for (newer_start, _), (_, older_end) in zip(windows, windows[1:]):
+        assert older_end == newer_start
+    assert all(window_end - window_start <= timedelta(days=7) for window_start, window_end in windows)
+
+
+def make_record(dt, offset=0, **extra):
+    tweet_id = str(x_snowflake.datetime_to_id(dt) + offset)
+    record = {'id': tweet_id, 'timeline_id': tweet_id, 'link': f'https://x.com/user/status/{tweet_id}',
+              'date': x_snowflake.id_to_datetime(tweet_id), 'author': 'user'}
+    record.update(extra)
+    return record
+
+
+def test_process_records_stops_after_known_streak():
+    stop_at_id = x_snowflake.datetime_to_id(datetime(2026, 1, 5))
+    records = [
+        make_record(datetime(2026, 1, 4)),  # eski kök tweet, altında yeni yanıtlar
+        make_record(datetime(2026, 1, 6)),
+        make_record(datetime(2026, 1, 7)),
+        make_record(datetime(2026, 1, 3)),
+        make_record(datetime(2026, 1, 2)),
+        make_record(datetime(2026, 1, 1)),
+        make_record(datetime(2026, 1, 6, 12)),
+    ]
+    state = x_scraper.new_scrape_state()
+    keep_going = x_scraper.process_records(records, state, datetime(2025, 12, 1), datetime(2026, 2, 1), 'user', stop_at_id=stop_at_id)
+    assert keep_going is False
+    assert state['reached_bound'] is True
+    collected = {item['Date'] for item in state['collected_data']}
+    assert records[1]['date'] in collected and records[2]['date'] in collected
+    assert records[6]['date'] not in collected
+
+
+def test_process_records_without_bound_is_incomplete():
+    state = x_scraper.new_scrape_state()
+    records = [make_record(datetime(2026, 1, 2))]
+    assert x_scraper.process_records(records, state, datetime(2026, 1, 1), datetime(2026, 1, 3), 'user') is True
+    rows, complete = x_scraper.finish_scrape_state(state)
+    assert len(rows) == 1 and complete is False
+
+
+class FakeBackend(x_scraper.ScrapeBackend):
+    def __init__(self, complete_targets):
+        self.complete_targets = complete_targets
+
+    def open(self, username, password, block=True):
+        return True
+
+    def close(self):
+        pass
+
+    def scrape(self, target, start_datetime, end_datetime, *args, **kwargs):
+        rows = [{'Date': start_datetime, 'Link': f'https://x.com/{target}/status/1', 'Username': target}]
+        return rows, target in self.complete_targets
+
+
+def test_run_process_reports_incomplete_targets():
+    stats = x_scraper.run_process(
+        'user', 'pass', 'a,b', None, None,
+        start_datetime_obj=datetime(2026, 1, 1), end_datetime_obj=datetime(2026, 1, 2),
+        skip_excel=True, backend=FakeBackend({'a'})
+    )
+    assert stats['count'] == 2
+    assert stats['incomplete_targets'] == ['b']
+
+
+def test_build_article_record_skips_seen_articles(monkeypatch):
+    calls = []
+    monkeypatch.setattr(x_scraper, 'get_tweet_link', lambda article: article['link'])
+    monkeypatch.setattr(x_scraper, 'is_retweet', lambda article: article['is_rt'])
+    for helper in ('get_reply_info', 'get_tweet_author_username', 'get_tweet_date', 'is_pinned_tweet', 'is_self_retweet'):
+        monkeypatch.setattr(x_scraper, helper, lambda article, helper=helper: calls.append(helper) or ((False, None) if helper == 'get_reply_info' else None))
+
+    class FakeArticle(dict):
+        text = 'tweet'
+
+    for is_rt in (False, True):
+        article = FakeArticle(link='https://x.com/user/status/1800000000000000000', is_rt=is_rt)
+        seen_keys = set()
+        record = x_scraper.build_article_record(article, seen_keys)
+        seen_keys.add(x_scraper.record_cache_key(record))
+        calls.clear()
+        stub = x_scraper.build_article_record(article, seen_keys)
+        assert calls == []
+        assert x_scraper.record_cache_key(stub) == x_scraper.record_cache_key(record)
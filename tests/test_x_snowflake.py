@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+
+import x_snowflake
+
+
+def test_datetime_id_round_trip():
+    dt = datetime(2025, 3, 14, 15, 9, 26)
+    assert x_snowflake.id_to_datetime(x_snowflake.datetime_to_id(dt)) == dt
+
+
+def test_epoch_is_turkey_time():
+    # Snowflake epoch 2010-11-04 01:42:54.657 UTC, uygulamada UTC+3 olarak tutulur
+    assert x_snowflake.id_to_datetime(0) == datetime(2010, 11, 4, 4, 42, 54, 657000)
+    assert x_snowflake.datetime_to_unix(datetime(2010, 11, 4, 4, 42, 54)) == 1288834974
+
+
+def test_id_bounds_match_datetime_range():
+    start = datetime(2026, 1, 1)
+    end = datetime(2026, 1, 1, 23, 59, 59)
+    min_id, max_id = x_snowflake.id_bounds(start, end)
+    assert x_snowflake.id_to_datetime(min_id) == start
+    assert x_snowflake.id_to_datetime(min_id - 1) < start
+    assert x_snowflake.id_to_datetime(max_id) < end + timedelta(milliseconds=1)
+    assert x_snowflake.id_to_datetime(max_id + 1) > end
+
+
+def test_id_from_link():
+    assert x_snowflake.id_from_link('https://x.com/user/status/1800000000000000000') == 1800000000000000000
+    assert x_snowflake.id_from_link('https://twitter.com/user/status/123?s=20') == 123
+    assert x_snowflake.id_from_link('https://x.com/user/status/123/photo/1') == 123
+    assert x_snowflake.id_from_link('https://x.com/user') is None
+    assert x_snowflake.id_from_link(None) is None
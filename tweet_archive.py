@@ -0,0 +1,189 @@
+import time
+from db import get_db_connection, get_coverage, tweet_link_sql
+from x_scraper import run_process, parse_datetime, save_to_excel, log_debug, is_cancelled, OUTPUT_FILE
+import x_snowflake
+
+def is_archive_eligible(kwargs):
+    """
+    The archive only holds what the scheduled scrapes collect: a user's own tweets in profile
+    mode, without replies / retweets filters or a keyword. Other requests always go live.
+    """
+    return (
+        kwargs.get('scrape_mode', 'profile') == 'profile'
+        and not kwargs.get('only_replies')
+        and not kwargs.get('include_retweets')
+        and not kwargs.get('only_retweets')
+        and not (kwargs.get('search_keyword') or '').strip()
+    )
+
+def normalize_handle(name):
+    return name.strip().lstrip('@').lower()
+
+def find_tracked_targets(conn, handles):
+    """Returns {handle: target_id} for the requested handles that are tracked as user targets."""
+    wanted = {normalize_handle(handle) for handle in handles}
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT id, target_name FROM targets WHERE target_type = 'user'")
+        rows = cursor.fetchall()
+    tracked = {}
+    for row in rows:
+        handle = normalize_handle(row['target_name'])
+        if handle in wanted:
+            tracked.setdefault(handle, row['id'])
+    return tracked
+
+def find_gaps(coverage, start_datetime, end_datetime):
+    """Parts of [start_datetime, end_datetime] not inside any of the sorted (from, to) coverage ranges."""
+    gaps = []
+    position = start_datetime
+    for covered_from, covered_to in coverage:
+        if covered_from > position:
+            gaps.append((position, min(covered_from, end_datetime)))
+        position = max(position, covered_to)
+        if position >= end_datetime:
+            break
+    if position < end_datetime:
+        gaps.append((position, end_datetime))
+    return [(gap_start, gap_end) for gap_start, gap_end in gaps if gap_start < gap_end]
+
+def clip_ranges(coverage, start_datetime, end_datetime):
+    """The coverage ranges cut to [start_datetime, end_datetime] (empty ones dropped)."""
+    clipped = []
+    for covered_from, covered_to in coverage:
+        range_start = max(covered_from, start_datetime)
+        range_end = min(covered_to, end_datetime)
+        if range_start <= range_end:
+            clipped.append((range_start, range_end))
+    return clipped
+
+def fetch_archive_rows(conn, target_id, ranges):
+    """
+    Stored tweets of a target inside the given (from, to) ranges, in the same shape as scraper rows
+    (Date, Link, Username). Only covered ranges are read, so the rows never overlap the live-scraped gaps.
+    """
+    if not ranges:
+        return []
+    conditions = ' OR '.join(['(tweet_date >= %s AND tweet_date <= %s)'] * len(ranges))
+    params = [target_id]
+    for range_start, range_end in ranges:
+        params.extend((range_start, range_end))
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT tweet_date AS Date, {tweet_link_sql()} AS Link, username AS Username
+            FROM tweets
+            WHERE target_id = %s AND ({conditions})
+            ORDER BY tweet_date
+        """, params)
+        return list(cursor.fetchall())
+
+def merge_rows(rows):
+    """Drops duplicate tweets (same Snowflake id, or same link) and sorts chronologically."""
+    seen = set()
+    merged = []
+    for item in rows:
+        key = x_snowflake.id_from_link(item['Link']) or item['Link']
+        if key in seen:
+            continue
+        seen.add(key)
+        merged.append(item)
+    merged.sort(key=lambda item: item['Date'])
+    return merged
+
+def plan_archive_request(conn, handles, start_datetime, end_datetime):
+    """
+    Returns (archive_rows, live_pieces) for a request, where live_pieces are the
+    (targets, start, end) windows that still need a live scrape, or None if no handle is tracked.
+    """
+    tracked = find_tracked_targets(conn, handles)
+    if not tracked:
+        return None
+
+    archive_rows = []
+    live_pieces = []
+    untracked = []
+    for handle in handles:
+        target_id = tracked.get(normalize_handle(handle))
+        if target_id is None:
+            untracked.append(handle)
+            continue
+        coverage = get_coverage(conn, target_id, start_datetime, end_datetime)
+        archive_rows.extend(fetch_archive_rows(conn, target_id, clip_ranges(coverage, start_datetime, end_datetime)))
+        for gap_start, gap_end in find_gaps(coverage, start_datetime, end_datetime):
+            live_pieces.append((handle, gap_start, gap_end))
+    if untracked:
+        # Takip edilmeyen hedefler tek çağrıda taranır (boştaki sürücülerle paralel)
+        live_pieces.append((','.join(untracked), start_datetime, end_datetime))
+    return archive_rows, live_pieces
+
+def run_process_with_archive(username, password, cancel_event=None, **kwargs):
+    """
+    Drop-in replacement for x_scraper.run_process for main-page scrapes.
+    For tracked user targets, the parts of the window recorded in target_coverage are read
+    from the tweets table and only the uncovered gaps are scraped live; fully covered
+    requests never open a browser. Anything the archive cannot answer is passed to run_process.
+    """
+    if not is_archive_eligible(kwargs):
+        return run_process(username=username, password=password, cancel_event=cancel_event, **kwargs)
+
+    start_datetime = parse_datetime(kwargs.get('start_date_str'), kwargs.get('start_time_str') or "00:00")
+    end_datetime = parse_datetime(kwargs.get('end_date_str'), kwargs.get('end_time_str') or "23:59")
+    handles = [t.strip() for t in (kwargs.get('target_username') or '').split(',') if t.strip()]
+    if not start_datetime or not end_datetime or not handles:
+        return run_process(username=username, password=password, cancel_event=cancel_event, **kwargs)
+
+    conn = get_db_connection()
+    if not conn:
+        return run_process(username=username, password=password, cancel_event=cancel_event, **kwargs)
+
+    start_time_perf = time.time()
+    try:
+        plan = plan_archive_request(conn, handles, start_datetime, end_datetime)
+    finally:
+        conn.close()
+    if plan is None:
+        return run_process(username=username, password=password, cancel_event=cancel_event, **kwargs)
+    archive_data, live_pieces = plan
+
+    log_debug(f"Arşivden {len(archive_data)} kayıt okundu, {len(live_pieces)} aralık canlı taranacak.")
+
+    live_data = []
+    cache_stats = {'hits': 0, 'misses': 0}
+    incomplete_targets = []
+    live_kwargs = {key: value for key, value in kwargs.items()
+                   if key not in ('target_username', 'start_datetime_obj', 'end_datetime_obj', 'skip_excel', 'output_file', 'excel_compact')}
+    for piece_targets, piece_start, piece_end in live_pieces:
+        if is_cancelled(cancel_event):
+            break
+        stats = run_process(
+            username=username, password=password, cancel_event=cancel_event,
+            target_username=piece_targets, start_datetime_obj=piece_start, end_datetime_obj=piece_end,
+            skip_excel=True, **live_kwargs
+        )
+        if stats is None:
+            return None
+        live_data.extend(stats.get('raw_data') or [])
+        incomplete_targets.extend(stats.get('incomplete_targets') or [])
+        for key in cache_stats:
+            cache_stats[key] += (stats.get('cache_stats') or {}).get(key, 0)
+
+    all_data = merge_rows(archive_data + live_data)
+    link_list = [item['Link'] for item in all_data]
+    result = {
+        "count": len(all_data),
+        "time": time.time() - start_time_perf,
+        "links": link_list,
+        "excel_file": None,
+        "raw_data": all_data,
+        "gs_status": None,
+        "cache_stats": cache_stats,
+        "incomplete_targets": incomplete_targets,
+        "archive_count": len(archive_data)
+    }
+    if kwargs.get('skip_excel'):
+        return result
+
+    result_count, filtered_data, excel_obj = save_to_excel(all_data, kwargs.get('output_file', OUTPUT_FILE), compact=kwargs.get('excel_compact'))
+    if result_count is False:
+        return None
+    result.update({"count": result_count, "excel_file": excel_obj, "raw_data": filtered_data, "time": time.time() - start_time_perf})
+    return result
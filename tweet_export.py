@@ -0,0 +1,140 @@
+import csv
+import io
+import json
+import pymysql
+from db import get_db_connection, tweet_link_sql
+
+# Sunucu tarafı imleçten her seferinde okunan satır sayısı (bellekte aynı anda en fazla bu kadar satır bulunur)
+EXPORT_CHUNK_SIZE = 5000
+
+# Sütun adları tweet_import ile uyumludur; dışa aktarılan dosya geri yüklenebilir
+EXPORT_COLUMNS = ('Target', 'Date', 'Link', 'Username')
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+def iter_tweet_chunks(target_id=None, start_datetime=None, end_datetime=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields lists of tweet rows (dicts keyed by EXPORT_COLUMNS) read through an unbuffered
+    server-side cursor, so the full result set is never held in memory.
+    The connection stays checked out until the generator finishes or is closed.
+    """
+    conditions = []
+    params = []
+    if target_id:
+        conditions.append("tw.target_id = %s")
+        params.append(target_id)
+    if start_datetime:
+        conditions.append("tw.tweet_date >= %s")
+        params.append(start_datetime)
+    if end_datetime:
+        conditions.append("tw.tweet_date <= %s")
+        params.append(end_datetime)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    conn = get_db_connection()
+    if not conn:
+        raise Exception("Veritabanı bağlantı hatası.")
+    try:
+        cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+        try:
+            cursor.execute(f"""
+                SELECT t.target_name AS Target, tw.tweet_date AS Date, {tweet_link_sql('tw')} AS Link, tw.username AS Username
+                FROM tweets tw
+                JOIN targets t ON t.id = tw.target_id
+                {where}
+                ORDER BY tw.target_id, tw.tweet_date
+            """, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            # Okunmamış satırlar tüketilir; bağlantı havuza temiz döner
+            cursor.close()
+    finally:
+        conn.close()
+
+def format_date(value):
+    return value.strftime(DATE_FORMAT) if value else None
+
+def stream_csv(chunks):
+    # BOM: Excel'in UTF-8 olarak açması için
+    yield '\ufeff' + ','.join(EXPORT_COLUMNS) + '\n'
+    for rows in chunks:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerows((row['Target'], format_date(row['Date']), row['Link'], row['Username']) for row in rows)
+        yield buffer.getvalue()
+
+def stream_jsonl(chunks):
+    for rows in chunks:
+        yield ''.join(
+            json.dumps({'Target': row['Target'], 'Date': format_date(row['Date']), 'Link': row['Link'], 'Username': row['Username']}, ensure_ascii=False) + '\n'
+            for row in rows
+        )
+
+class ChunkSink(io.RawIOBase):
+    """Write-only file object that hands out what was written since the last drain()."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer.extend(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+def stream_parquet(chunks):
+    """Writes one Parquet row group per chunk and yields the bytes as they are produced (requires pyarrow)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('Target', pa.string()),
+        ('Date', pa.timestamp('s')),
+        ('Link', pa.string()),
+        ('Username', pa.string()),
+    ])
+    sink = ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for rows in chunks:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def stream_export(export_format, chunks):
+    if export_format == 'csv':
+        return stream_csv(chunks)
+    if export_format == 'jsonl':
+        return stream_jsonl(chunks)
+    if export_format == 'parquet':
+        return stream_parquet(chunks)
+    raise ValueError(f"Desteklenmeyen format: {export_format}")
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
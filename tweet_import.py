@@ -0,0 +1,166 @@
+import os
+import pandas as pd
+from db import insert_tweets
+
+# Excel'den okunan satırlar bu büyüklükte parçalar halinde işlenir ve veritabanına yazılır
+IMPORT_CHUNK_SIZE = 5000
+
+REQUIRED_COLUMNS = ('Date', 'Link', 'Username')
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Arşiv içe aktarmada kabul edilen dosya türleri
+IMPORT_EXTENSIONS = ('.xlsx', '.xls', '.csv', '.jsonl')
+
+def iter_excel_chunks(source, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Streams the first sheet of an .xlsx file (path or file object) with openpyxl's
+    read-only reader and yields DataFrames of at most chunk_size rows.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(value).strip() if value is not None else '' for value in header]
+        check_columns(columns)
+
+        buffer = []
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) >= chunk_size:
+                yield rows_to_frame(buffer, columns)
+                buffer = []
+        if buffer:
+            yield rows_to_frame(buffer, columns)
+    finally:
+        wb.close()
+
+def iter_xls_chunks(path, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Reads a legacy .xls file with pd.read_excel (no streaming reader exists for the
+    format, so the whole sheet is loaded) and yields it in chunk_size slices.
+    """
+    try:
+        df = pd.read_excel(path, dtype=object)
+    except ImportError:
+        raise ValueError(".xls dosyalarını okumak için xlrd kütüphanesi gerekli; dosyayı .xlsx olarak kaydedip tekrar yükleyin.")
+    check_columns(df.columns)
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+def iter_csv_chunks(path, chunk_size=IMPORT_CHUNK_SIZE):
+    """Yields DataFrame chunks of a CSV file with Date, Link and Username columns."""
+    for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=object, encoding='utf-8-sig'):
+        check_columns(chunk.columns)
+        yield chunk
+
+def iter_jsonl_chunks(path, chunk_size=IMPORT_CHUNK_SIZE):
+    """Yields DataFrame chunks of a JSON Lines file whose objects have Date, Link and Username keys."""
+    with pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False, convert_dates=False) as reader:
+        for chunk in reader:
+            check_columns(chunk.columns)
+            yield chunk
+
+def iter_file_chunks(path, chunk_size=IMPORT_CHUNK_SIZE):
+    """Picks the chunk reader for a spooled archive by its extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.xlsx':
+        return iter_excel_chunks(path, chunk_size)
+    if extension == '.xls':
+        return iter_xls_chunks(path, chunk_size)
+    if extension == '.csv':
+        return iter_csv_chunks(path, chunk_size)
+    if extension == '.jsonl':
+        return iter_jsonl_chunks(path, chunk_size)
+    raise ValueError(f"Desteklenmeyen dosya türü: {extension} (desteklenenler: {', '.join(IMPORT_EXTENSIONS)})")
+
+def count_rows(path):
+    """Cheap estimate of the data rows in an archive, used as the progress total (None if unknown)."""
+    try:
+        if path.lower().endswith('.xlsx'):
+            from openpyxl import load_workbook
+            wb = load_workbook(path, read_only=True)
+            try:
+                ws = wb.worksheets[0]
+                max_row = ws.max_row
+                if not max_row:
+                    # Write-only kitaplar (save_to_excel) boyut kaydı yazmaz; satırlar tek tek sayılır
+                    max_row = sum(1 for _ in ws.iter_rows(max_col=1, values_only=True))
+            finally:
+                wb.close()
+            return max_row - 1 if max_row else None
+        if path.lower().endswith('.xls'):
+            return None
+        with open(path, 'rb') as f:
+            lines = sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b''))
+        return lines - 1 if path.lower().endswith('.csv') else lines
+    except Exception:
+        return None
+
+def check_columns(columns):
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f"Yüklenen dosyada {', '.join(missing)} sütunları eksik.")
+
+def rows_to_frame(rows, columns):
+    width = len(columns)
+    return pd.DataFrame([tuple(row[:width]) + (None,) * (width - len(row)) for row in rows], columns=columns)
+
+def parse_dates(values):
+    """Parses a column of datetimes / date strings at once; unparseable values become NaT."""
+    dates = pd.to_datetime(values, format=DATE_FORMAT, errors='coerce')
+    retry = dates.isna() & values.notna()
+    if retry.any():
+        dates[retry] = pd.to_datetime(values[retry].astype(str), format='mixed', errors='coerce')
+    return dates
+
+def clean_username(values):
+    return values.astype(str).str.replace('@', '', regex=False).str.lower().str.strip()
+
+def prepare_chunk(df):
+    """
+    Drops rows without a link or a valid date and returns a DataFrame with
+    Date (datetime), Link, Username and clean_username columns.
+    """
+    df = df.loc[df['Link'].notna() & df['Date'].notna(), list(REQUIRED_COLUMNS)].copy()
+    df['Date'] = parse_dates(df['Date'].astype(object))
+    df = df[df['Date'].notna()]
+    df['Link'] = df['Link'].astype(str).str.strip()
+    df['Username'] = df['Username'].fillna('').astype(str)
+    df['clean_username'] = clean_username(df['Username'])
+    return df
+
+def import_tweet_chunks(conn, target_id, target_name, chunks, progress=None, cancel_event=None):
+    """
+    Bulk-loads prepared chunks into tweets for a target and returns the number of new rows.
+    The file must contain the target's username at least once; otherwise everything is
+    rolled back and ValueError is raised. progress(rows_read, rows_inserted) is called after
+    every chunk. Setting cancel_event rolls back at the next chunk. Commits once at the end.
+    """
+    clean_target_name = target_name.replace('@', '').lower().strip()
+    target_seen = False
+    rows_read = 0
+    inserted = 0
+    try:
+        for chunk in chunks:
+            if cancel_event is not None and cancel_event.is_set():
+                raise Exception("İçe aktarma iptal edildi.")
+            rows_read += len(chunk)
+            df = prepare_chunk(chunk)
+            if not target_seen and (df['clean_username'] == clean_target_name).any():
+                target_seen = True
+            rows = zip(df['Date'].dt.to_pydatetime(), df['Link'], df['Username'])
+            inserted += insert_tweets(conn, target_id, list(rows))
+            if progress:
+                progress(rows_read, inserted)
+
+        if not target_seen:
+            raise ValueError(f'Yüklenen dosyada hedef kullanıcı "{target_name}" ile eşleşen bir Username bulunamadı.')
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+    return inserted
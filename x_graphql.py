@@ -0,0 +1,198 @@
+import base64
+import json
+from datetime import timedelta
+from dateutil import parser
+
+# X timeline'ını yükleyen GraphQL operasyonları
+TIMELINE_OPERATIONS = (
+    'UserTweets',
+    'UserTweetsAndReplies',
+    'ListLatestTweetsTimeline',
+    'SearchTimeline',
+)
+
+def is_timeline_url(url):
+    """Checks if a response URL belongs to one of the timeline GraphQL operations."""
+    if not url or '/graphql/' not in url:
+        return False
+    operation = url.split('/graphql/')[-1].split('?')[0].split('/')[-1]
+    return operation in TIMELINE_OPERATIONS
+
+def unwrap_tweet_result(result):
+    """Returns the actual Tweet object (TweetWithVisibilityResults wraps it in 'tweet')."""
+    if not result:
+        return None
+    if result.get('__typename') == 'TweetWithVisibilityResults' and result.get('tweet'):
+        return result['tweet']
+    if 'legacy' in result:
+        return result
+    return None
+
+def get_screen_name(tweet):
+    """Extracts the author's screen name from a Tweet object (old and new user layouts)."""
+    try:
+        user = tweet['core']['user_results']['result']
+    except (KeyError, TypeError):
+        return None
+    screen_name = (user.get('core') or {}).get('screen_name') or (user.get('legacy') or {}).get('screen_name')
+    return screen_name.lower() if screen_name else None
+
+def parse_created_at(created_at):
+    """Converts a GraphQL created_at string to Turkey time (UTC+3), as naive datetime."""
+    try:
+        dt = parser.parse(created_at) + timedelta(hours=3)
+        return dt.replace(tzinfo=None)
+    except Exception:
+        return None
+
+def tweet_result_to_record(result, pinned=False):
+    """
+    Converts a tweet_results.result object to the record format used by scrape_tweets
+    (same keys as x_scraper.BATCH_EXTRACT_SCRIPT).
+    """
+    tweet = unwrap_tweet_result(result)
+    if not tweet:
+        return None
+    legacy = tweet.get('legacy') or {}
+    timeline_id = legacy.get('id_str') or tweet.get('rest_id')
+    if not timeline_id:
+        return None
+
+    timeline_author = get_screen_name(tweet)
+    original = unwrap_tweet_result((legacy.get('retweeted_status_result') or {}).get('result'))
+    is_rt = original is not None
+    if not is_rt:
+        original = tweet
+    original_legacy = original.get('legacy') or {}
+    original_id = original_legacy.get('id_str') or original.get('rest_id')
+    author = get_screen_name(original)
+
+    is_reply = bool(legacy.get('in_reply_to_screen_name') or legacy.get('in_reply_to_status_id_str') or legacy.get('in_reply_to_user_id_str'))
+
+    return {
+        "id": original_id,
+        "timeline_id": timeline_id,
+        "created_at": legacy.get('created_at'),
+        "author": author,
+        "is_rt": is_rt,
+        "is_self_rt": bool(is_rt and author and timeline_author and author == timeline_author),
+        "is_reply": is_reply,
+        "reply_to": legacy.get('in_reply_to_screen_name'),
+        "pinned": pinned,
+        "link": f"https://x.com/{author}/status/{original_id}" if author and original_id else None,
+        "text": original_legacy.get('full_text') or ''
+    }
+
+def find_instructions(node):
+    """Finds the timeline 'instructions' list anywhere in a GraphQL payload."""
+    if isinstance(node, dict):
+        if isinstance(node.get('instructions'), list):
+            return node['instructions']
+        for value in node.values():
+            found = find_instructions(value)
+            if found is not None:
+                return found
+    elif isinstance(node, list):
+        for value in node:
+            found = find_instructions(value)
+            if found is not None:
+                return found
+    return None
+
+def entry_tweet_results(entry):
+    """Yields tweet_results.result objects of a timeline entry (single tweets and conversation modules)."""
+    content = entry.get('content') or {}
+    item_content = content.get('itemContent')
+    if item_content and item_content.get('tweet_results'):
+        yield item_content['tweet_results'].get('result')
+    for item in content.get('items') or []:
+        item_content = (item.get('item') or {}).get('itemContent')
+        if item_content and item_content.get('tweet_results'):
+            yield item_content['tweet_results'].get('result')
+
+def parse_timeline_response(payload):
+    """Parses a timeline GraphQL response into records, in timeline order."""
+    if isinstance(payload, (str, bytes)):
+        payload = json.loads(payload)
+    records = []
+    for instruction in find_instructions(payload) or []:
+        instruction_type = instruction.get('type')
+        if instruction_type == 'TimelinePinEntry':
+            entries = [instruction.get('entry') or {}]
+        elif instruction_type == 'TimelineAddEntries':
+            entries = instruction.get('entries') or []
+        else:
+            continue
+        pinned = instruction_type == 'TimelinePinEntry'
+        for entry in entries:
+            for result in entry_tweet_results(entry):
+                record = tweet_result_to_record(result, pinned=pinned)
+                if record:
+                    records.append(record)
+    return records
+
+def find_bottom_cursor(payload):
+    """Returns the 'Bottom' cursor value of a timeline response (next page), or None."""
+    if isinstance(payload, (str, bytes)):
+        payload = json.loads(payload)
+    for instruction in find_instructions(payload) or []:
+        entries = instruction.get('entries') or []
+        if instruction.get('entry'):
+            entries = entries + [instruction['entry']]
+        for entry in entries:
+            content = entry.get('content') or {}
+            if content.get('cursorType') == 'Bottom' and content.get('value'):
+                return content['value']
+    return None
+
+def drain_network_log(driver):
+    """Discards buffered performance log entries (network events from earlier pages)."""
+    try:
+        if driver:
+            driver.get_log('performance')
+    except Exception:
+        pass
+
+def drain_timeline_responses(driver, pending=None):
+    """
+    Reads Chrome DevTools network events from the performance log and returns
+    the parsed records of every timeline GraphQL response received so far.
+    Responses whose bodies are not ready yet stay in `pending` for the next call.
+    """
+    if pending is None:
+        pending = {}
+    try:
+        entries = driver.get_log('performance')
+    except Exception:
+        entries = []
+
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except Exception:
+            continue
+        if message.get('method') != 'Network.responseReceived':
+            continue
+        params = message.get('params') or {}
+        if is_timeline_url((params.get('response') or {}).get('url')):
+            pending[params.get('requestId')] = 0
+
+    records = []
+    for request_id in list(pending):
+        try:
+            body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception:
+            # Body henüz hazır değil; birkaç deneme sonra vazgeç
+            pending[request_id] += 1
+            if pending[request_id] > 10:
+                del pending[request_id]
+            continue
+        del pending[request_id]
+        try:
+            raw = body.get('body') or '{}'
+            if body.get('base64Encoded'):
+                raw = base64.b64decode(raw)
+            records.extend(parse_timeline_response(raw))
+        except Exception:
+            continue
+    return records
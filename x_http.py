@@ -0,0 +1,163 @@
+import json
+import os
+import requests
+import x_graphql
+
+DEFAULT_BASE_URL = 'https://x.com/i/api/graphql'
+
+# X web istemcisinin herkese açık bearer token'ı (config.json'da "http_bearer_token" ile değiştirilebilir)
+DEFAULT_BEARER_TOKEN = 'AAAAAAAAAAAAAAAAAAAAANRILgAAAAAAnNwIzUejRCOuH5E6I8xnZz4puTs%3D1Zv7ttfk8LF81IUq16cHjhLTvJu4FA33AGWWjCpTnA'
+
+# GraphQL query ID'leri X tarafında zaman zaman değişir; config.json'da "http_query_ids" ile güncellenebilir
+DEFAULT_QUERY_IDS = {
+    'UserByScreenName': 'xmU6X_CKVnQ5lSrCbAmJsg',
+    'UserTweets': 'E3opETHurmVJflFsUBVuUQ',
+    'UserTweetsAndReplies': 'bt4TKuFz4T7Ckk-VvQVSow',
+    'ListLatestTweetsTimeline': 'HjsWc-nwwHKYwHenbHm-tw',
+    'SearchTimeline': 'UN1i3zUiCWa-6r-Uaho4fw',
+}
+
+DEFAULT_FEATURES = {
+    'rweb_tipjar_consumption_enabled': True,
+    'responsive_web_graphql_exclude_directive_enabled': True,
+    'verified_phone_label_enabled': False,
+    'creator_subscriptions_tweet_preview_api_enabled': True,
+    'responsive_web_graphql_timeline_navigation_enabled': True,
+    'responsive_web_graphql_skip_user_profile_image_extensions_enabled': False,
+    'communities_web_enable_tweet_community_results_fetch': True,
+    'c9s_tweet_anatomy_moderator_badge_enabled': True,
+    'articles_preview_enabled': True,
+    'responsive_web_edit_tweet_api_enabled': True,
+    'graphql_is_translatable_rweb_tweet_is_translatable_enabled': True,
+    'view_counts_everywhere_api_enabled': True,
+    'longform_notetweets_consumption_enabled': True,
+    'responsive_web_twitter_article_tweet_consumption_enabled': True,
+    'tweet_awards_web_tipping_enabled': False,
+    'creator_subscriptions_quote_tweet_preview_enabled': False,
+    'freedom_of_speech_not_reach_fetch_enabled': True,
+    'standardized_nudges_misinfo': True,
+    'tweet_with_visibility_results_prefer_gql_limited_actions_policy_enabled': True,
+    'rweb_video_timestamps_enabled': True,
+    'longform_notetweets_rich_text_read_enabled': True,
+    'longform_notetweets_inline_media_enabled': True,
+    'responsive_web_enhance_cards_enabled': False,
+    'hidden_profile_likes_enabled': True,
+    'hidden_profile_subscriptions_enabled': True,
+    'subscriptions_verification_info_is_identity_verified_enabled': True,
+    'subscriptions_verification_info_verified_since_enabled': True,
+    'highlights_tweets_tab_ui_enabled': True,
+    'responsive_web_twitter_article_notes_tab_enabled': True,
+}
+
+class XHttpClient:
+    """
+    Browser-free client for X's timeline GraphQL endpoints.
+    Reuses the session cookies written by x_scraper.save_cookies_to_file.
+    base_url can point at a local stand-in server for testing.
+    """
+
+    def __init__(self, cookie_file, base_url=None, bearer_token=None, query_ids=None, features=None, timeout=30):
+        self.cookie_file = cookie_file
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+        self.bearer_token = bearer_token or DEFAULT_BEARER_TOKEN
+        self.query_ids = dict(DEFAULT_QUERY_IDS)
+        self.query_ids.update(query_ids or {})
+        self.features = features or DEFAULT_FEATURES
+        self.timeout = timeout
+        self.session = None
+
+    def open(self):
+        """Loads cookies into a requests session. Returns False if no usable session exists."""
+        if not os.path.exists(self.cookie_file):
+            return False
+        try:
+            with open(self.cookie_file, 'r', encoding='utf-8') as f:
+                cookies = json.load(f)
+        except Exception:
+            return False
+
+        session = requests.Session()
+        for cookie in cookies:
+            if cookie.get('name') and cookie.get('value') is not None:
+                session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain', '.x.com'), path=cookie.get('path', '/'))
+
+        csrf_token = session.cookies.get('ct0')
+        if not csrf_token or not session.cookies.get('auth_token'):
+            return False
+
+        session.headers.update({
+            'authorization': f'Bearer {self.bearer_token}',
+            'x-csrf-token': csrf_token,
+            'x-twitter-active-user': 'yes',
+            'x-twitter-auth-type': 'OAuth2Session',
+            'content-type': 'application/json',
+            'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+        })
+        self.session = session
+        return True
+
+    def close(self):
+        if self.session:
+            self.session.close()
+            self.session = None
+
+    def graphql(self, operation, variables):
+        """Calls a GraphQL operation and returns the decoded JSON payload."""
+        url = f"{self.base_url}/{self.query_ids[operation]}/{operation}"
+        params = {
+            'variables': json.dumps(variables, separators=(',', ':')),
+            'features': json.dumps(self.features, separators=(',', ':')),
+        }
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        if response.status_code != 200:
+            raise Exception(f"{operation} isteği başarısız: {response.status_code} - {response.text[:200]}")
+        return response.json()
+
+    def get_user_id(self, screen_name):
+        payload = self.graphql('UserByScreenName', {'screen_name': screen_name, 'withSafetyModeUserFields': True})
+        try:
+            return payload['data']['user']['result']['rest_id']
+        except (KeyError, TypeError):
+            return None
+
+    def iter_timeline(self, operation, variables, max_pages=500):
+        """Yields the records of each timeline page, following the Bottom cursor."""
+        cursor = None
+        for _ in range(max_pages):
+            page_variables = dict(variables)
+            if cursor:
+                page_variables['cursor'] = cursor
+            payload = self.graphql(operation, page_variables)
+            records = x_graphql.parse_timeline_response(payload)
+            next_cursor = x_graphql.find_bottom_cursor(payload)
+            yield records
+            if not records or not next_cursor or next_cursor == cursor:
+                break
+            cursor = next_cursor
+
+    def iter_user_tweets(self, user_id, with_replies=False, page_size=40):
+        operation = 'UserTweetsAndReplies' if with_replies else 'UserTweets'
+        variables = {
+            'userId': user_id,
+            'count': page_size,
+            'includePromotedContent': False,
+            'withVoice': True,
+            'withV2Timeline': True,
+        }
+        if with_replies:
+            variables['withCommunity'] = True
+        else:
+            variables['withQuickPromoteEligibilityTweetFields'] = False
+        return self.iter_timeline(operation, variables)
+
+    def iter_search_tweets(self, query, page_size=20):
+        variables = {
+            'rawQuery': query,
+            'count': page_size,
+            'querySource': 'typed_query',
+            'product': 'Latest',
+        }
+        return self.iter_timeline('SearchTimeline', variables)
+
+    def iter_list_tweets(self, list_id, page_size=40):
+        return self.iter_timeline('ListLatestTweetsTimeline', {'listId': list_id, 'count': page_size})
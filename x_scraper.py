@@ -5,13 +5,25 @@ import random
 import os
 import re
 import subprocess
+import threading
+import queue
 from datetime import datetime, timedelta
+from urllib.parse import quote
 from dateutil import parser
+import x_graphql
+import x_http
+import x_snowflake
 
-# Global stop flag
-stop_requested = False
-# Global persistent driver
+# Global persistent driver (slot 0 of the driver pool)
 DRIVER = None
+# Driver pool: slot -> persistent Chrome instance, each with its own profile directory
+DRIVER_POOL = {}
+# slot -> sürücü performans logu (GraphQL yakalama) açık başlatıldı mı
+DRIVER_PERFORMANCE_LOG = {}
+DRIVER_POOL_SIZE = None
+_free_slots = None
+_pool_lock = threading.Lock()
+_cookie_lock = threading.Lock()
 
 # Global debug flag
 DEBUG_MODE = False
@@ -23,9 +35,9 @@ def log_debug(message):
     if DEBUG_MODE:
         print(message, flush=True)
 
-def request_stop():
-    global stop_requested
-    stop_requested = True
+def is_cancelled(cancel_event):
+    """Checks a job's cancellation token (threading.Event, set by /cancel/<job_id>)."""
+    return cancel_event is not None and cancel_event.is_set()
 
 # Imports for Selenium are moved inside init_driver for lazy loading
 uc = None
@@ -37,6 +49,13 @@ ActionChains = None
 
 CONFIG_FILE = 'config.json'
 OUTPUT_FILE = 'links.xlsx'
+# Bu boyuttan büyük Excel çıktıları bellek yerine geçici dosyada tutulur
+EXCEL_SPOOL_MAX_SIZE = 1024 * 1024
+# Tarih araması modunda uzun aralıklar en fazla bu uzunlukta alt pencerelere bölünür
+SEARCH_WINDOW = timedelta(days=7)
+# Artımlı taramada durmak için arka arkaya görülmesi gereken kayıtlı (stop_at_id'den eski) içerik sayısı.
+# Profilde kendi-yanıt zincirleri eski kök tweeti yeni yanıtların üstünde gösterir; tek eski kayıt yetmez.
+STOP_AT_KNOWN_STREAK = 3
 COOKIE_FILE = 'twitter_cookies.json'  # YENİ: Çerez dosyası
 
 def load_config():
@@ -81,43 +100,95 @@ def save_cookies_to_file(driver):
     """Saves current cookies to a file for Node.js to use."""
     try:
         cookies = driver.get_cookies()
-        with open(COOKIE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(cookies, f, indent=2)
+        with _cookie_lock:
+            with open(COOKIE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(cookies, f, indent=2)
         log_debug(f"✔ Oturum çerezleri '{COOKIE_FILE}' dosyasına kaydedildi (Node.js ile paylaşılıyor).")
     except Exception as e:
         print(f"⚠ Çerez kaydetme hatası: {e}", flush=True)
 
-def get_or_create_driver(username, password):
+def get_driver_pool_size():
+    """Number of persistent Chrome instances (config.json "driver_pool_size", default 1)."""
+    global DRIVER_POOL_SIZE
+    if DRIVER_POOL_SIZE is None:
+        size = 1
+        if os.path.exists(CONFIG_FILE):
+            try:
+                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                    size = int(json.load(f).get("driver_pool_size", 1) or 1)
+            except Exception:
+                pass
+        DRIVER_POOL_SIZE = max(1, size)
+    return DRIVER_POOL_SIZE
+
+def acquire_driver_slot(block=True, timeout=None):
+    """Checks a driver slot out of the pool. Returns None if none is free (non-blocking / timeout)."""
+    global _free_slots
+    with _pool_lock:
+        if _free_slots is None:
+            _free_slots = queue.Queue()
+            for slot in range(get_driver_pool_size()):
+                _free_slots.put(slot)
+    try:
+        return _free_slots.get(block, timeout)
+    except queue.Empty:
+        return None
+
+def release_driver_slot(slot):
+    """Returns a driver slot to the pool. The driver itself stays open for the next job."""
+    if slot is not None and _free_slots is not None:
+        _free_slots.put(slot)
+
+def get_profile_dir(slot=0):
+    """Persistent profile directory of a slot: 'chrome_profile' for slot 0, 'chrome_profile_<n>' for the others."""
+    base_dir = os.path.join(os.getcwd(), 'chrome_profile')
+    return base_dir if slot == 0 else f"{base_dir}_{slot}"
+
+def get_or_create_driver(username, password, slot=0, performance_log=False):
     """
-    Returns the global DRIVER instance.
+    Returns the persistent driver of the given pool slot (slot 0 is the global DRIVER).
     If it doesn't exist or is dead, creates a new one and logs in.
     If it exists, checks login status and re-logs in if necessary.
+    performance_log: start Chrome with the DevTools performance log (needed by the graphql engine only).
     """
     global DRIVER
-    
+
     if not ensure_selenium_imports():
         return None
 
+    driver = DRIVER_POOL.get(slot)
+
     # Check if driver exists and is responsive
-    if DRIVER is not None:
+    if driver is not None:
         try:
             # Check liveness by getting title
-            _ = DRIVER.title
+            _ = driver.title
             log_debug("Mevcut tarayıcı aktif.")
         except Exception as e:
             print(f"Mevcut tarayıcı yanıt vermiyor ({e}). Yeniden başlatılıyor...", flush=True)
             try:
-                DRIVER.quit()
+                driver.quit()
             except:
                 pass
-            DRIVER = None
+            driver = None
+            DRIVER_POOL.pop(slot, None)
+
+    if driver is not None and performance_log and not DRIVER_PERFORMANCE_LOG.get(slot):
+        # Performans logu yalnızca başlangıçta açılabilir; GraphQL motoru için sürücü yeniden başlatılır
+        log_debug("GraphQL motoru için sürücü performans loguyla yeniden başlatılıyor...")
+        try:
+            driver.quit()
+        except:
+            pass
+        driver = None
+        DRIVER_POOL.pop(slot, None)
 
     # Create if needed
-    if DRIVER is None:
+    if driver is None:
         log_debug("Yeni Chrome sürücüsü başlatılıyor...")
         
         # Define the persistent user data directory
-        user_data_dir = os.path.join(os.getcwd(), 'chrome_profile')
+        user_data_dir = get_profile_dir(slot)
         if not os.path.exists(user_data_dir):
             os.makedirs(user_data_dir, exist_ok=True)
         log_debug(f"Kalıcı profil yolu: {user_data_dir}")
@@ -133,11 +204,15 @@ def get_or_create_driver(username, password):
         options.add_argument("--disable-renderer-backgrounding")
         options.add_argument("--disable-infobars")
         options.add_argument("--disable-dev-shm-usage")
+        if performance_log:
+            # GraphQL motoru için DevTools ağ olaylarını performans logunda topla
+            # (dom motorunda açık bırakılırsa ChromeDriver tüm ağ olaylarını biriktirir)
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
         try:
-            DRIVER = uc.Chrome(options=options, user_data_dir=user_data_dir, use_subprocess=True)
+            driver = uc.Chrome(options=options, user_data_dir=user_data_dir, use_subprocess=True)
              # Ensure consistent window size
             try:
-                DRIVER.set_window_size(1920, 1080) 
+                driver.set_window_size(1920, 1080) 
             except:
                 pass
         except Exception as e:
@@ -160,10 +235,12 @@ def get_or_create_driver(username, password):
                         new_options.add_argument("--disable-renderer-backgrounding")
                         new_options.add_argument("--disable-infobars")
                         new_options.add_argument("--disable-dev-shm-usage")
+                        if performance_log:
+                            new_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
 
-                        DRIVER = uc.Chrome(options=new_options, user_data_dir=user_data_dir, version_main=major_version, use_subprocess=True)
+                        driver = uc.Chrome(options=new_options, user_data_dir=user_data_dir, version_main=major_version, use_subprocess=True)
                         try:
-                            DRIVER.set_window_size(1920, 1080)
+                            driver.set_window_size(1920, 1080)
                         except:
                             pass
                     except Exception as retry_e:
@@ -176,11 +253,17 @@ def get_or_create_driver(username, password):
                 print(f"Sürücü oluşturulamadı: {e}", flush=True)
                 return None
 
+        DRIVER_PERFORMANCE_LOG[slot] = performance_log
+
+    DRIVER_POOL[slot] = driver
+    if slot == 0:
+        DRIVER = driver
+
     # Ensure logged in
-    if verify_login_and_refresh(DRIVER, username, password):
+    if verify_login_and_refresh(driver, username, password):
         # YENİ: Başarılı giriş sonrası çerezleri kaydet
-        save_cookies_to_file(DRIVER)
-        return DRIVER
+        save_cookies_to_file(driver)
+        return driver
     else:
         print("Giriş başarısız veya oturum kaybedildi.", flush=True)
         return None
@@ -349,16 +432,8 @@ def get_tweet_date(article):
         """
         tweet_id_str = driver.execute_script(js_script, article)
         if tweet_id_str and tweet_id_str.isdigit():
-            # Convert Snowflake ID to UTC timestamp
-            # Snowflake epoch: 1288834974657
-            timeline_id = int(tweet_id_str)
-            ts_ms = (timeline_id >> 22) + 1288834974657
-            dt = datetime.fromtimestamp(ts_ms / 1000.0)
-            # Adjust for Turkey Time (UTC+3)
-            # fromtimestamp usually gives local time if not tz aware, let's use utcfromtimestamp
-            dt_utc = datetime.utcfromtimestamp(ts_ms / 1000.0)
-            dt_turkey = dt_utc + timedelta(hours=3)
-            return dt_turkey
+            # Convert Snowflake ID to Turkey Time (UTC+3)
+            return x_snowflake.id_to_datetime(tweet_id_str)
 
     except Exception as e:
         pass
@@ -601,11 +676,423 @@ def get_reply_info(article):
     except Exception as e:
         return False, None
 
-def scrape_tweets(driver, target_username, start_datetime, end_datetime, search_keyword=None, scrape_mode='profile', only_replies=False, include_retweets=False, only_retweets=False):
+# Tek bir execute_script çağrısıyla görünür tüm tweetlerin özet kayıtlarını döndürür.
+# get_tweet_date, is_retweet, is_self_retweet, get_tweet_author_username, get_reply_info,
+# is_pinned_tweet, get_tweet_link ve article.text çağrılarının toplu karşılığıdır.
+BATCH_EXTRACT_SCRIPT = """
+function getReactProps(dom) {
+    const key = Object.keys(dom).find(key => key.startsWith("__reactProps$") || key.startsWith("__reactFiber$"));
+    return key ? dom[key] : null;
+}
+function findTweetData(fiber) {
+    if (!fiber) return null;
+    let curr = fiber;
+    while (curr) {
+        if (curr.memoizedProps && curr.memoizedProps.tweet) {
+            return curr.memoizedProps.tweet;
+        }
+        if (curr.props && curr.props.tweet) {
+            return curr.props.tweet;
+        }
+        curr = curr.return;
+        if (curr && curr.type && curr.type === 'body') break;
+    }
+    return null;
+}
+function statusIdFromHref(href) {
+    if (!href || href.indexOf('/status/') === -1) return null;
+    const id = href.split('/status/').pop().split('?')[0].split('/')[0];
+    return /^\\d+$/.test(id) ? id : null;
+}
+const RT_WORDS = ['retweet', 'retweetledin', 'retweetlendi', 'yeniden yayınladı', 'yeniden gönderdi', 'reposted'];
+const PIN_WORDS = ['sabitle', 'pinned', 'épinglé'];
+const records = [];
+document.querySelectorAll("article[data-testid='tweet']").forEach(function(article) {
+    const rec = {id: null, timeline_id: null, author: null, is_rt: false, is_self_rt: false,
+                 is_reply: false, reply_to: null, pinned: false, link: null, text: '', time: null};
+    let tweet = null;
+    try { tweet = findTweetData(getReactProps(article)); } catch (e) {}
+
+    const social = article.querySelector("[data-testid='socialContext']");
+    const socialText = social ? (social.innerText || '').toLowerCase() : '';
+
+    if (tweet) {
+        const original = tweet.retweeted_status || tweet;
+        rec.timeline_id = tweet.id_str || null;
+        rec.id = original.id_str || null;
+        rec.is_rt = !!tweet.retweeted_status;
+        if (rec.is_rt && tweet.user && tweet.retweeted_status.user) {
+            rec.is_self_rt = tweet.user.screen_name.toLowerCase() === tweet.retweeted_status.user.screen_name.toLowerCase();
+        }
+        if (original.user) rec.author = original.user.screen_name.toLowerCase();
+        if (tweet.in_reply_to_screen_name) {
+            rec.is_reply = true;
+            rec.reply_to = tweet.in_reply_to_screen_name;
+        } else if (tweet.in_reply_to_status_id_str || tweet.in_reply_to_user_id_str) {
+            rec.is_reply = true;
+        }
+    } else {
+        rec.is_rt = RT_WORDS.some(w => socialText.indexOf(w) !== -1);
+    }
+    rec.pinned = PIN_WORDS.some(w => socialText.indexOf(w) !== -1);
+
+    const timeEl = article.querySelector('time');
+    if (timeEl) {
+        rec.time = timeEl.getAttribute('datetime');
+        if (timeEl.parentElement && timeEl.parentElement.href) rec.link = timeEl.parentElement.href;
+    }
+    if (!rec.link) {
+        const candidates = Array.from(article.querySelectorAll('a'))
+            .map(a => a.href)
+            .filter(href => statusIdFromHref(href));
+        candidates.sort((a, b) => a.length - b.length);
+        if (candidates.length) rec.link = candidates[0];
+    }
+    if (!rec.id) rec.id = statusIdFromHref(rec.link);
+
+    if (!rec.author) {
+        const userEl = article.querySelector("[data-testid='User-Name']");
+        if (userEl) {
+            for (const a of userEl.querySelectorAll('a')) {
+                if (a.href && a.href.indexOf('x.com/') !== -1) {
+                    rec.author = a.href.split('x.com/').pop().split('?')[0].split('/')[0].toLowerCase();
+                    break;
+                }
+            }
+        }
+    }
+    rec.text = article.innerText || '';
+    records.push(rec);
+});
+return records;
+"""
+
+LAST_ARTICLE_TEXT_SCRIPT = """
+const articles = document.querySelectorAll("article[data-testid='tweet']");
+return articles.length ? (articles[articles.length - 1].innerText || '') : null;
+"""
+
+def record_datetime(record):
+    """Returns the timeline datetime of a batch record (Snowflake ID first, <time> tag as fallback)."""
+    timeline_id = record.get('timeline_id')
+    if timeline_id and str(timeline_id).isdigit():
+        return x_snowflake.id_to_datetime(timeline_id)
+    if record.get('time'):
+        try:
+            dt = parser.parse(record['time']) + timedelta(hours=3)
+            return dt.replace(tzinfo=None)
+        except Exception:
+            pass
+    if record.get('created_at'):
+        return x_graphql.parse_created_at(record['created_at'])
+    return None
+
+def status_id_from_link(link):
+    """Returns the numeric tweet id in a /status/<id> link as string (record format), or None."""
+    tweet_id = x_snowflake.id_from_link(link)
+    return str(tweet_id) if tweet_id is not None else None
+
+def record_cache_key(record):
+    """Key used by the seen-article cache: timeline id if known, otherwise tweet id + RT marker."""
+    if record.get('timeline_id'):
+        return str(record['timeline_id'])
+    if record.get('id'):
+        return f"{record['id']}:{'rt' if record.get('is_rt') else 'tw'}"
+    return None
+
+def build_article_record(article, seen_keys=None):
+    """
+    Slow path: builds the same record as BATCH_EXTRACT_SCRIPT using the per-article helpers.
+    If the article is already in seen_keys, returns a stub record without the expensive calls.
+    """
+    link = get_tweet_link(article)
+    is_rt = is_retweet(article)
+    tweet_id = status_id_from_link(link)
+    # Normal tweetlerde zaman akışı ID'si linkteki ID'dir; React yürüyüşüne gerek yok
+    timeline_id = tweet_id if tweet_id and not is_rt else None
+    if seen_keys and tweet_id:
+        # Taslak, tam kayıtla aynı önbellek anahtarını üretmeli (timeline_id dahil)
+        stub = {"id": tweet_id, "timeline_id": timeline_id, "is_rt": is_rt, "link": link, "text": None}
+        if record_cache_key(stub) in seen_keys:
+            return stub
+
+    is_reply, reply_to = get_reply_info(article)
+    try:
+        text = article.text
+    except Exception:
+        text = ''
+    return {
+        "id": tweet_id,
+        "timeline_id": timeline_id,
+        "date": x_snowflake.id_to_datetime(timeline_id) if timeline_id else get_tweet_date(article),
+        "author": get_tweet_author_username(article),
+        "is_rt": is_rt,
+        "is_self_rt": is_self_retweet(article) if is_rt else False,
+        "is_reply": is_reply,
+        "reply_to": reply_to,
+        "pinned": is_pinned_tweet(article),
+        "link": link,
+        "text": text
+    }
+
+def collect_article_records(driver, batch_extract=True, seen_keys=None):
+    """
+    Returns a record for every visible tweet article.
+    In batch mode a single execute_script call extracts everything;
+    if it fails, falls back to the per-article helpers.
+    """
+    if batch_extract:
+        try:
+            records = driver.execute_script(BATCH_EXTRACT_SCRIPT)
+            if records is not None:
+                for record in records:
+                    record['date'] = record_datetime(record)
+                return records
+        except Exception as e:
+            log_debug(f"Toplu çıkarım başarısız, tek tek çıkarıma dönülüyor: {e}")
+
+    records = []
+    for article in driver.find_elements(By.CSS_SELECTOR, "article[data-testid='tweet']"):
+        try:
+            records.append(build_article_record(article, seen_keys))
+        except Exception:
+            continue
+    return records
+
+def build_search_query(target_username, start_datetime, end_datetime, only_replies=False, include_retweets=False, only_retweets=False):
+    """Builds an X search query (from:<user> since_time/until_time) that lands directly in the requested window."""
+    clean_target_username = target_username.lower().replace("@", "")
+    parts = [
+        f"from:{clean_target_username}",
+        f"since_time:{x_snowflake.datetime_to_unix(start_datetime)}",
+        # until_time hariç tutulur; bitiş anını da kapsamak için 1 saniye ekle
+        f"until_time:{x_snowflake.datetime_to_unix(end_datetime) + 1}",
+    ]
+    if only_retweets:
+        parts.append("filter:nativeretweets include:nativeretweets")
+    elif include_retweets:
+        parts.append("include:nativeretweets")
+    elif only_replies:
+        parts.append("filter:replies")
+    else:
+        parts.append("-filter:replies")
+    return " ".join(parts)
+
+def build_search_url(query):
+    return f"https://x.com/search?q={quote(query)}&src=typed_query&f=live"
+
+def split_date_windows(start_datetime, end_datetime, max_window=SEARCH_WINDOW):
+    """Bisects [start, end] into independent sub-windows no longer than max_window, newest first."""
+    if end_datetime - start_datetime <= max_window:
+        return [(start_datetime, end_datetime)]
+    middle = start_datetime + (end_datetime - start_datetime) / 2
+    middle = middle.replace(microsecond=0)
+    return split_date_windows(middle, end_datetime, max_window) + split_date_windows(start_datetime, middle, max_window)
+
+def new_scrape_state():
+    """Per-scrape state shared by process_records calls (collected tweets, seen-article cache, early-stop counters)."""
+    return {
+        "collected_links": set(),
+        "collected_data": [],
+        "seen_keys": set(),
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "consecutive_old_tweets": 0,
+        "consecutive_old_retweets": 0,
+        "consecutive_known": 0,
+        # Tarama başlangıç sınırına veya kayıtlı içeriğe ulaşarak mı bitti (kaydırma sınırı / iptal değil)
+        "reached_bound": False
+    }
+
+def process_records(records, state, start_datetime, end_datetime, clean_target_username=None, search_keyword=None, scrape_mode='profile', only_replies=False, include_retweets=False, only_retweets=False, stop_at_id=None, cancel_event=None):
+    """
+    Applies the date range, retweet/reply/keyword filters and early-stop heuristic to a batch of records.
+    Matching tweets are appended to state['collected_data'].
+    Returns False when older-than-range content (or, with stop_at_id, already stored content) has been reached.
+    """
+    # Aralık kontrolleri mümkün olduğunca Snowflake ID'leri üzerinden tamsayı karşılaştırmasıyla yapılır
+    min_id, max_id = x_snowflake.id_bounds(start_datetime, end_datetime)
+    for record in records:
+        if is_cancelled(cancel_event):
+            break
+        try:
+            cache_key = record_cache_key(record)
+            if cache_key and cache_key in state['seen_keys']:
+                state['cache_hits'] += 1
+                continue
+
+            # record['date'] is the EXACT timeline date (retweet date for RTs)
+            t_datetime = record.get('date')
+            if not t_datetime:
+                continue
+
+            state['cache_misses'] += 1
+            # Link henüz render edilmediyse sonraki kaydırmada tekrar değerlendirilsin
+            if cache_key and record.get('link'):
+                state['seen_keys'].add(cache_key)
+
+            article_is_retweet = record.get('is_rt', False)
+            author_username = record.get('author')
+            article_is_pinned = record.get('pinned', False)
+
+            # Zaman akışındaki konum: RT'lerde RT'nin kendi ID'si, normal tweetlerde tweet ID'si
+            position_id = record.get('timeline_id') or (record.get('id') if not article_is_retweet else None)
+            position_id = int(position_id) if position_id and str(position_id).isdigit() else None
+
+            # Artımlı tarama: zaman akışındaki konumu zaten kayıtlı en yeni tweet kadar eski olan
+            # (sabitlenmemiş) içeriklere arka arkaya ulaşıldıysa geri kalan her şey de kayıtlıdır.
+            # Tek bir eski kayıt, altında yeni yanıtlar olan bir konuşma zincirinin kökü olabilir.
+            if stop_at_id and not article_is_pinned and position_id:
+                if position_id <= stop_at_id:
+                    state['consecutive_known'] += 1
+                    if state['consecutive_known'] >= STOP_AT_KNOWN_STREAK:
+                        log_debug(f"Zaten kayıtlı içeriğe ulaşıldı ({position_id}). Durduruluyor.")
+                        state['reached_bound'] = True
+                        return False
+                else:
+                    state['consecutive_known'] = 0
+
+            if position_id:
+                in_range = min_id <= position_id <= max_id
+                is_older = position_id < min_id
+            else:
+                in_range = start_datetime <= t_datetime <= end_datetime
+                is_older = t_datetime < start_datetime
+
+            # If the tweet date (or retweet date) is within our requested range
+            if in_range:
+                # Reset early stop counters unless it's a pinned tweet (pinned tweets are out of chronological order)
+                if not article_is_pinned:
+                    state['consecutive_old_tweets'] = 0
+                    state['consecutive_old_retweets'] = 0
+
+                # If it is a retweet but the author is the target user, it's a self-retweet
+                # User requested to ignore self-retweets when fetching retweets.
+                # Self-retweet filtering must be strictly enforced (works for both profile and list mode).
+                if article_is_retweet and (record.get('is_self_rt') or (clean_target_username and author_username == clean_target_username)):
+                    if only_retweets or include_retweets:
+                        # If it's a self-retweet and we are specifically targeting/including retweets, skip it entirely.
+                        # The original tweet will be caught anyway when it appears in the regular timeline
+                        # (if it's within the requested date range). We strictly do not want to record self-retweets
+                        # as "retweets".
+                        continue
+
+                if only_retweets:
+                    if not article_is_retweet:
+                        continue
+                else:
+                    if article_is_retweet and not include_retweets:
+                        continue
+
+                # If it's a retweet, we bypass reply filtering since retweets aren't considered replies
+                # in the context of what the user wants to fetch (unless it's a retweet of a reply,
+                # but usually users just want the retweets as they are).
+                if not article_is_retweet:
+                    is_rep, reply_to_handle = record.get('is_reply', False), record.get('reply_to')
+
+                    if not only_replies:
+                        if is_rep: continue
+                    else:
+                        final_is_reply = is_rep
+                        if not final_is_reply:
+                            txt = record.get('text') or ''
+                            if "Yanıtlanan" in txt or "Replying to" in txt or "En réponse à" in txt:
+                                final_is_reply = True
+
+                        if not final_is_reply:
+                            continue
+
+                        if reply_to_handle and clean_target_username:
+                            if reply_to_handle.lower() == clean_target_username:
+                                continue
+
+                if search_keyword:
+                    try:
+                        text_content = (record.get('text') or '').lower()
+                        or_groups = search_keyword.lower().split(';')
+                        is_match = False
+                        for group in or_groups:
+                            group = group.strip()
+                            if not group: continue
+                            and_parts = group.split(',')
+                            group_match = True
+                            for part in and_parts:
+                                part = part.strip()
+                                if part and part not in text_content:
+                                    group_match = False
+                                    break
+                            if group_match:
+                                is_match = True
+                                break
+                        if not is_match: continue
+                    except Exception:
+                        continue
+
+                link = record.get('link')
+                if link and link not in state['collected_links']:
+                    if scrape_mode in ('profile', 'search'):
+                        try:
+                            link_parts = link.split('/')
+                            if len(link_parts) > 3:
+                                link_username = link_parts[3].lower()
+                                # If it's a retweet, the link_username will be the original author's username,
+                                # which is different from the target username. We shouldn't skip it in that case.
+                                if not article_is_retweet and link_username != clean_target_username:
+                                    continue
+                        except Exception:
+                            continue
+
+                    state['collected_links'].add(link)
+                    # Extract username from link for list mode sorting
+                    # Link format usually: https://x.com/username/status/123...
+                    username_from_link = "Unknown"
+                    try:
+                        parts = link.split('/')
+                        if len(parts) > 3:
+                            username_from_link = parts[3]
+                    except:
+                        pass
+
+                    state['collected_data'].append({
+                        "Date": t_datetime,
+                        "Link": link,
+                        "Username": username_from_link
+                    })
+
+                    log_debug(f"Tweet bulundu: {t_datetime} - {link} (Kullanıcı: {username_from_link})")
+
+            elif is_older:
+                # If we are encountering tweets older than our start range
+                if article_is_retweet:
+                    state['consecutive_old_retweets'] += 1
+                else:
+                    state['consecutive_old_tweets'] += 1
+
+                # We need to be careful not to stop prematurely if an account posts many old retweets in a row
+                # But if we see 10 of their OWN tweets that are too old, or 40 retweets that are evaluated as too old, we stop.
+                if state['consecutive_old_tweets'] >= 10 or state['consecutive_old_retweets'] >= 40:
+                    log_debug(f"Başlangıç tarihinden eski içeriklere ulaşıldı (Kendi: {state['consecutive_old_tweets']}, RT: {state['consecutive_old_retweets']}). Durduruluyor.")
+                    state['reached_bound'] = True
+                    return False
+            else:
+                state['consecutive_old_tweets'] = 0
+                state['consecutive_old_retweets'] = 0
+
+        except Exception as e:
+            continue
+
+    return True
+
+def scrape_tweets(driver, target_username, start_datetime, end_datetime, search_keyword=None, scrape_mode='profile', only_replies=False, include_retweets=False, only_retweets=False, batch_extract=True, cache_stats=None, engine='dom', stop_at_id=None, cancel_event=None):
     if scrape_mode == 'list':
         profile_url = target_username
         clean_target_username = None
         log_debug(f"Liste Modu: {profile_url} adresine gidiliyor...")
+    elif scrape_mode == 'search':
+        search_query = build_search_query(target_username, start_datetime, end_datetime, only_replies, include_retweets, only_retweets)
+        profile_url = build_search_url(search_query)
+        clean_target_username = target_username.lower().replace("@", "")
+        log_debug(f"Tarih Araması Modu: '{search_query}' aranıyor...")
     else:
         if only_replies:
             profile_url = f"https://x.com/{target_username}/with_replies"
@@ -614,8 +1101,13 @@ def scrape_tweets(driver, target_username, start_datetime, end_datetime, search_
             profile_url = f"https://x.com/{target_username}"
             log_debug(f"Profil Modu: {profile_url} adresine gidiliyor...")
         clean_target_username = target_username.lower().replace("@", "")
-    
-    if driver.current_url != profile_url:
+
+    # GraphQL motoru: önceki sayfalardan kalan ağ olaylarını at, ilk sayfanın yanıtını yakalamak için sayfayı mutlaka yükle
+    graphql_pending = {}
+    if engine == 'graphql':
+        x_graphql.drain_network_log(driver)
+
+    if engine == 'graphql' or driver.current_url != profile_url:
         driver.get(profile_url)
         time.sleep(3)
     else:
@@ -631,185 +1123,54 @@ def scrape_tweets(driver, target_username, start_datetime, end_datetime, search_
     except Exception as e:
         pass
 
-    collected_links = set()
-    collected_data = []
+    # Seen-article cache ve erken durdurma sayaçları (bkz. new_scrape_state)
+    state = new_scrape_state()
 
     log_debug(f"{start_datetime} ile {end_datetime} arasındaki tweetler toplanıyor...")
 
     max_wait_time = 2.0
-    max_stuck_retries = 15
+    # Arama sonuçları pencereyle sınırlı; sonuç bitince uzun süre beklemeye gerek yok
+    max_stuck_retries = 3 if scrape_mode == 'search' else 15
     
     keep_scrolling = True
-    consecutive_old_tweets = 0
-    consecutive_old_retweets = 0
     consecutive_scrolls_without_new_tweets = 0
     
     while keep_scrolling:
-        if stop_requested:
+        if is_cancelled(cancel_event):
             log_debug("Durdurma istendi. Döngü kırılıyor.")
             break
 
-        articles = driver.find_elements(By.CSS_SELECTOR, "article[data-testid='tweet']")
-        
-        for article in articles:
-            if stop_requested:
-                break
-            try:
-                # get_tweet_date now returns the EXACT timeline date (retweet date for RTs)
-                t_datetime = get_tweet_date(article)
-                if not t_datetime:
-                    continue
-                
-                article_is_retweet = is_retweet(article)
-                author_username = get_tweet_author_username(article)
-                article_is_pinned = is_pinned_tweet(article)
-
-                # If the tweet date (or retweet date) is within our requested range
-                if start_datetime <= t_datetime <= end_datetime:
-                    # Reset early stop counters unless it's a pinned tweet (pinned tweets are out of chronological order)
-                    if not article_is_pinned:
-                        consecutive_old_tweets = 0
-                        consecutive_old_retweets = 0
-                    
-                    # If it is a retweet but the author is the target user, it's a self-retweet
-                    # User requested to ignore self-retweets when fetching retweets.
-                    # Self-retweet filtering must be strictly enforced (works for both profile and list mode).
-                    if article_is_retweet and (is_self_retweet(article) or (clean_target_username and author_username == clean_target_username)):
-                        if only_retweets or include_retweets:
-                            # If it's a self-retweet and we are specifically targeting/including retweets, skip it entirely.
-                            # The original tweet will be caught anyway when it appears in the regular timeline
-                            # (if it's within the requested date range). We strictly do not want to record self-retweets
-                            # as "retweets".
-                            continue
-                    
-                    if only_retweets:
-                        if not article_is_retweet:
-                            continue
-                    else:
-                        if article_is_retweet and not include_retweets:
-                            continue
-
-                    # If it's a retweet, we bypass reply filtering since retweets aren't considered replies
-                    # in the context of what the user wants to fetch (unless it's a retweet of a reply,
-                    # but usually users just want the retweets as they are).
-                    if not article_is_retweet:
-                        is_rep, reply_to_handle = get_reply_info(article)
-
-                        if not only_replies:
-                            if is_rep: continue
-                        else:
-                            final_is_reply = is_rep
-                            if not final_is_reply:
-                                try:
-                                    txt = article.text
-                                    if "Yanıtlanan" in txt or "Replying to" in txt or "En réponse à" in txt:
-                                        final_is_reply = True
-                                except:
-                                    pass
-
-                            if not final_is_reply:
-                                continue
-
-                            if reply_to_handle and clean_target_username:
-                                if reply_to_handle.lower() == clean_target_username:
-                                    continue
-
-                    if search_keyword:
-                        try:
-                            text_content = article.text.lower()
-                            or_groups = search_keyword.lower().split(';')
-                            is_match = False
-                            for group in or_groups:
-                                group = group.strip()
-                                if not group: continue
-                                and_parts = group.split(',')
-                                group_match = True
-                                for part in and_parts:
-                                    part = part.strip()
-                                    if part and part not in text_content:
-                                        group_match = False
-                                        break
-                                if group_match:
-                                    is_match = True
-                                    break
-                            if not is_match: continue
-                        except Exception:
-                            continue
-
-                    link = get_tweet_link(article)
-                    if link and link not in collected_links:
-                        if scrape_mode == 'profile':
-                            try:
-                                link_parts = link.split('/')
-                                if len(link_parts) > 3:
-                                    link_username = link_parts[3].lower()
-                                    # If it's a retweet, the link_username will be the original author's username,
-                                    # which is different from the target username. We shouldn't skip it in that case.
-                                    if not article_is_retweet and link_username != clean_target_username:
-                                        continue
-                            except Exception:
-                                continue
-
-                        collected_links.add(link)
-                        # Extract username from link for list mode sorting
-                        # Link format usually: https://x.com/username/status/123...
-                        username_from_link = "Unknown"
-                        try:
-                            parts = link.split('/')
-                            if len(parts) > 3:
-                                username_from_link = parts[3]
-                        except:
-                            pass
-
-                        collected_data.append({
-                            "Date": t_datetime,
-                            "Link": link,
-                            "Username": username_from_link
-                        })
-
-                        log_debug(f"Tweet bulundu: {t_datetime} - {link} (Kullanıcı: {username_from_link})")
-                
-                elif t_datetime < start_datetime:
-                    # If we are encountering tweets older than our start range
-                    if article_is_retweet:
-                        consecutive_old_retweets += 1
-                    else:
-                        consecutive_old_tweets += 1
-
-                    # We need to be careful not to stop prematurely if an account posts many old retweets in a row
-                    # But if we see 10 of their OWN tweets that are too old, or 40 retweets that are evaluated as too old, we stop.
-                    if consecutive_old_tweets >= 10 or consecutive_old_retweets >= 40:
-                        log_debug(f"Başlangıç tarihinden eski içeriklere ulaşıldı (Kendi: {consecutive_old_tweets}, RT: {consecutive_old_retweets}). Durduruluyor.")
-                        keep_scrolling = False
-                        break
-                else:
-                    consecutive_old_tweets = 0
-                    consecutive_old_retweets = 0
+        if engine == 'graphql':
+            # Kaydırma yalnızca tetikleyici; kayıtlar yakalanan GraphQL yanıtlarından gelir
+            records = x_graphql.drain_timeline_responses(driver, graphql_pending)
+            for record in records:
+                record['date'] = record_datetime(record)
+        else:
+            # Tek çağrıda görünür tüm tweetlerin kayıtları (bkz. BATCH_EXTRACT_SCRIPT)
+            records = collect_article_records(driver, batch_extract, state['seen_keys'])
 
-            except Exception as e:
-                continue
-        
-        if not keep_scrolling:
+        if not process_records(records, state, start_datetime, end_datetime, clean_target_username, search_keyword, scrape_mode, only_replies, include_retweets, only_retweets, stop_at_id, cancel_event):
             break
 
-        last_text_hash = None
-        if articles:
+        last_text = records[-1].get('text') if records and engine != 'graphql' else None
+        if last_text is None:
             try:
-                last_text_hash = hash(articles[-1].text)
+                last_text = driver.execute_script(LAST_ARTICLE_TEXT_SCRIPT)
             except:
                 pass
+        last_text_hash = hash(last_text or '')
 
         scroll_step = driver.execute_script("return window.innerHeight") * 0.85
         driver.execute_script(f"window.scrollBy(0, {scroll_step});")
-        
+
         start_wait = time.time()
         while time.time() - start_wait < max_wait_time:
             time.sleep(0.2)
             try:
-                current_articles = driver.find_elements(By.CSS_SELECTOR, "article[data-testid='tweet']")
-                if not current_articles:
+                current_last_text = driver.execute_script(LAST_ARTICLE_TEXT_SCRIPT)
+                if current_last_text is None:
                     continue
-                if hash(current_articles[-1].text) != last_text_hash:
+                if hash(current_last_text) != last_text_hash:
                     break
             except:
                 pass
@@ -828,27 +1189,57 @@ def scrape_tweets(driver, target_username, start_datetime, end_datetime, search_
         else:
             consecutive_scrolls_without_new_tweets = 0
 
-    return collected_data
+    return finish_scrape_state(state, cache_stats)
 
-def save_to_excel(data, output_file=OUTPUT_FILE):
+def finish_scrape_state(state, cache_stats=None):
+    """
+    Logs and merges the seen-article cache counters. Returns (collected tweets, complete), where
+    complete means the scrape stopped at the start of its window or at already stored content,
+    not at the scroll limit / end of pages (error page, rate limit) or a cancel.
+    """
+    log_debug(f"Önbellek: {state['cache_hits']} isabet, {state['cache_misses']} ıska ({len(state['seen_keys'])} benzersiz tweet).")
+    if cache_stats is not None:
+        cache_stats['hits'] = cache_stats.get('hits', 0) + state['cache_hits']
+        cache_stats['misses'] = cache_stats.get('misses', 0) + state['cache_misses']
+    return state['collected_data'], state['reached_bound']
+
+def get_excel_compact():
+    """Whether exports omit the blank spacer row after each tweet (config.json "excel_compact", default False)."""
+    if os.path.exists(CONFIG_FILE):
+        try:
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                return bool(json.load(f).get("excel_compact", False))
+        except Exception:
+            pass
+    return False
+
+def save_to_excel(data, output_file=OUTPUT_FILE, compact=None):
+    """
+    Writes the rows with a write-only workbook, which streams rows to disk instead of
+    building the whole sheet in memory. With output_file=None the workbook goes to a
+    spooled temp file (kept in memory only while small) that is returned for download.
+    compact=True drops the blank spacer row written after every tweet.
+    """
     if not data:
         log_debug("Belirtilen aralıkta tweet bulunamadı.")
         return 0, [], None
     
     try:
         from openpyxl import Workbook
-        from io import BytesIO
+        import tempfile
     except ImportError:
         print("Hata: openpyxl kütüphanesi eksik.", flush=True)
         return False, [], None
 
+    if compact is None:
+        compact = get_excel_compact()
+
     filtered_data = data
     log_debug(f"İşleniyor: {len(filtered_data)} tweet kaydedilecek.")
 
     try:
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Links"
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Links")
         ws.append(["Date", "Link", "Username"])
         
         for item in filtered_data:
@@ -857,7 +1248,8 @@ def save_to_excel(data, output_file=OUTPUT_FILE):
                 dt = dt.replace(tzinfo=None)
             username = item.get('Username', '')
             ws.append([dt, item['Link'], username])
-            ws.append([])
+            if not compact:
+                ws.append([])
             
         if output_file:
             wb.save(output_file)
@@ -865,20 +1257,179 @@ def save_to_excel(data, output_file=OUTPUT_FILE):
             log_debug(f"{count} tweet başarıyla {output_file} dosyasına kaydedildi.")
             return count, filtered_data, None
         else:
-            virtual_file = BytesIO()
+            virtual_file = tempfile.SpooledTemporaryFile(max_size=EXCEL_SPOOL_MAX_SIZE)
             wb.save(virtual_file)
             virtual_file.seek(0)
             count = len(filtered_data)
-            log_debug(f"Excel bellekte başarıyla oluşturuldu ({count} tweet).")
+            log_debug(f"Excel geçici dosyada başarıyla oluşturuldu ({count} tweet).")
             return count, filtered_data, virtual_file
             
     except Exception as e:
         print(f"Excel kaydetme hatası: {e}", flush=True)
         return False, [], None
 
-def run_process(username, password, target_username, start_date_str, end_date_str, start_time_str="00:00", end_time_str="23:59", output_file=OUTPUT_FILE, search_keyword=None, status_callback=None, interaction_callback=None, scrape_mode='profile', only_replies=False, include_retweets=False, only_retweets=False, start_datetime_obj=None, end_datetime_obj=None, skip_excel=False):
-    global stop_requested
-    stop_requested = False
+class ScrapeBackend:
+    """
+    Scrape backend interface used by run_process.
+    open() prepares the session, scrape() returns (collected rows, complete) for one target
+    (see finish_scrape_state), close() releases it.
+    spawn() returns an unopened sibling backend for parallel targets (None if not supported).
+    cancel_event is the job's cancellation token, set by run_process.
+    """
+    name = None
+    max_parallel = 1
+    cancel_event = None
+
+    def open(self, username, password, block=True):
+        raise NotImplementedError
+
+    def spawn(self):
+        return None
+
+    def scrape(self, target, start_datetime, end_datetime, search_keyword=None, scrape_mode='profile', only_replies=False, include_retweets=False, only_retweets=False, cache_stats=None, stop_at_id=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class BrowserBackend(ScrapeBackend):
+    """Selenium backend on the persistent Chrome DRIVER (engine: 'dom' or 'graphql')."""
+    name = 'browser'
+
+    def __init__(self, engine='dom'):
+        self.engine = engine
+        self.driver = None
+        self.slot = None
+        self.max_parallel = get_driver_pool_size()
+
+    def open(self, username, password, block=True):
+        # Havuzdan boş bir sürücü al (block=False ise boş sürücü yoksa hemen vazgeç)
+        self.slot = acquire_driver_slot(block)
+        if self.slot is None:
+            return False
+        log_debug(f"Sürücü #{self.slot} alındı.")
+        self.driver = get_or_create_driver(username, password, self.slot, performance_log=self.engine == 'graphql')
+        if not self.driver:
+            release_driver_slot(self.slot)
+            self.slot = None
+            return False
+
+        try:
+            # Switch to window to ensure it's active
+            self.driver.switch_to.window(self.driver.current_window_handle)
+
+            # Pencereyi her zaman tam ekran (maximize) yap
+            self.driver.maximize_window()
+
+            # Ubuntu'da pencereyi "Her Zaman Üstte" (Always on Top) yapmak için wmctrl kullanımı
+            # ":ACTIVE:" parametresi o an odaklanmış olan pencereyi (ki switch_to.window ile odakladık) hedefler.
+            try:
+                subprocess.run(["wmctrl", "-r", ":ACTIVE:", "-b", "add,above"], check=False)
+            except Exception as wm_e:
+                log_debug(f"wmctrl komutu çalıştırılamadı (kurulu olmayabilir): {wm_e}")
+
+        except Exception as e:
+            pass
+        return True
+
+    def scrape(self, target, start_datetime, end_datetime, search_keyword=None, scrape_mode='profile', only_replies=False, include_retweets=False, only_retweets=False, cache_stats=None, stop_at_id=None):
+        return scrape_tweets(self.driver, target, start_datetime, end_datetime, search_keyword, scrape_mode, only_replies, include_retweets, only_retweets, cache_stats=cache_stats, engine=self.engine, stop_at_id=stop_at_id, cancel_event=self.cancel_event)
+
+    def spawn(self):
+        return BrowserBackend(self.engine)
+
+    def close(self):
+        try:
+            if self.driver and not is_cancelled(self.cancel_event):
+                self.driver.get("https://x.com/explore")
+        except:
+            pass
+        # Performans logu okunmazsa ChromeDriver'da birikir
+        x_graphql.drain_network_log(self.driver)
+        release_driver_slot(self.slot)
+        self.slot = None
+        self.driver = None
+
+class HttpBackend(ScrapeBackend):
+    """
+    Browser-free backend: pages the timeline GraphQL endpoints with the session in COOKIE_FILE.
+    The cookies are written by the browser backend after each successful login.
+    """
+    name = 'http'
+
+    def __init__(self, base_url=None, bearer_token=None, query_ids=None, cookie_file=COOKIE_FILE, page_delay=(0.3, 0.8)):
+        self.client = x_http.XHttpClient(cookie_file, base_url=base_url, bearer_token=bearer_token, query_ids=query_ids)
+        self.page_delay = page_delay
+
+    def open(self, username, password, block=True):
+        if not self.client.open():
+            print(f"HTTP motoru: '{self.client.cookie_file}' içinde geçerli oturum çerezi yok. Önce tarayıcı motoruyla giriş yapılmalı.", flush=True)
+            return False
+        return True
+
+    def scrape(self, target, start_datetime, end_datetime, search_keyword=None, scrape_mode='profile', only_replies=False, include_retweets=False, only_retweets=False, cache_stats=None, stop_at_id=None):
+        state = new_scrape_state()
+        if scrape_mode == 'search':
+            clean_target_username = target.lower().replace("@", "")
+            search_query = build_search_query(target, start_datetime, end_datetime, only_replies, include_retweets, only_retweets)
+            log_debug(f"HTTP Tarih Araması Modu: {search_query}")
+            pages = self.client.iter_search_tweets(search_query)
+        elif scrape_mode == 'list':
+            clean_target_username = None
+            list_id = target.rstrip('/').split('/lists/')[-1].split('?')[0].split('/')[0]
+            log_debug(f"HTTP Liste Modu: {list_id}")
+            pages = self.client.iter_list_tweets(list_id)
+        else:
+            clean_target_username = target.lower().replace("@", "")
+            user_id = self.client.get_user_id(clean_target_username)
+            if not user_id:
+                raise Exception(f"Kullanıcı bulunamadı: {clean_target_username}")
+            log_debug(f"HTTP Profil Modu: {clean_target_username} ({user_id})")
+            pages = self.client.iter_user_tweets(user_id, with_replies=only_replies)
+
+        for records in pages:
+            if is_cancelled(self.cancel_event):
+                break
+            for record in records:
+                record['date'] = record_datetime(record)
+            if not process_records(records, state, start_datetime, end_datetime, clean_target_username, search_keyword, scrape_mode, only_replies, include_retweets, only_retweets, stop_at_id, self.cancel_event):
+                break
+            if self.page_delay:
+                time.sleep(random.uniform(*self.page_delay))
+
+        return finish_scrape_state(state, cache_stats)
+
+    def close(self):
+        self.client.close()
+
+def get_scrape_backend(backend=None, engine=None):
+    """
+    Returns a backend instance. `backend` may be a name ('browser', 'http') or a ready ScrapeBackend.
+    Unset values come from config.json (scrape_backend, scrape_engine, http_base_url, http_bearer_token, http_query_ids).
+    """
+    if isinstance(backend, ScrapeBackend):
+        return backend
+    config = {}
+    if os.path.exists(CONFIG_FILE):
+        try:
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except Exception:
+            pass
+    backend = backend or config.get('scrape_backend', 'browser')
+    engine = engine or config.get('scrape_engine', 'dom')
+    if backend == 'http':
+        return HttpBackend(
+            base_url=config.get('http_base_url'),
+            bearer_token=config.get('http_bearer_token'),
+            query_ids=config.get('http_query_ids')
+        )
+    return BrowserBackend(engine=engine)
+
+def run_process(username, password, target_username, start_date_str, end_date_str, start_time_str="00:00", end_time_str="23:59", output_file=OUTPUT_FILE, search_keyword=None, status_callback=None, interaction_callback=None, scrape_mode='profile', only_replies=False, include_retweets=False, only_retweets=False, start_datetime_obj=None, end_datetime_obj=None, skip_excel=False, engine=None, backend=None, stop_at_id=None, cancel_event=None, excel_compact=None):
+    # Her işin kendi iptal belirteci vardır; bir işi iptal etmek diğerlerini etkilemez
+    if cancel_event is None:
+        cancel_event = threading.Event()
     start_time_perf = time.time()
 
     def log(msg):
@@ -898,51 +1449,101 @@ def run_process(username, password, target_username, start_date_str, end_date_st
         log("Hata: Geçersiz tarih/saat formatı.")
         return None
 
-    log("Sürücü hazırlanıyor...")
-    driver = get_or_create_driver(username, password)
+    scrape_backend = get_scrape_backend(backend, engine)
+    scrape_backend.cancel_event = cancel_event
 
-    if not driver:
+    log("Sürücü hazırlanıyor...")
+    if not scrape_backend.open(username, password):
         log("Hata: Sürücü başlatılamadı veya giriş yapılamadı.")
         return None
 
     try:
-        # Switch to window to ensure it's active
-        driver.switch_to.window(driver.current_window_handle)
+        targets = [t.strip() for t in target_username.split(',') if t.strip()]
+        all_data = []
+        cache_stats = {'hits': 0, 'misses': 0}
+
+        # İş birimleri: (hedef, pencere başı, pencere sonu). Tarih araması modunda her hedefin aralığı
+        # birbirinden bağımsız taranabilen alt pencerelere bölünür.
+        work_items = []
+        for target in targets:
+            if scrape_mode == 'search':
+                for window_start, window_end in split_date_windows(start_datetime, end_datetime):
+                    work_items.append((target, window_start, window_end))
+            else:
+                work_items.append((target, start_datetime, end_datetime))
+
+        target_queue = queue.Queue()
+        for i, item in enumerate(work_items):
+            target_queue.put((i, item))
+        target_results = {}
+        # Hata, kaydırma sınırı veya iptal nedeniyle aralığın sonuna kadar taranamayan hedefler;
+        # sonuç eksik olabilir (arşiv kapsamı bu durumda kaydedilmez)
+        incomplete_targets = []
+
+        def target_worker(backend, worker_cache_stats):
+            while not is_cancelled(cancel_event):
+                try:
+                    i, (target, window_start, window_end) = target_queue.get_nowait()
+                except queue.Empty:
+                    return
+                if scrape_mode == 'search':
+                    log(f"{scrape_mode} hedefi taranıyor: {target} [{window_start} - {window_end}] ({i+1}/{len(work_items)})...")
+                else:
+                    log(f"{scrape_mode} hedefi taranıyor: {target} ({i+1}/{len(work_items)})...")
+                try:
+                    target_data, complete = backend.scrape(target, window_start, window_end, search_keyword, scrape_mode, only_replies, include_retweets, only_retweets, cache_stats=worker_cache_stats, stop_at_id=stop_at_id)
+                    if not complete:
+                        incomplete_targets.append(target)
+                    if target_data:
+                        # In profile mode, we want to keep the order per target, sorted by date
+                        # In list mode, we might get mixed results, but we'll sort everything at the end
+                        try:
+                            target_data.sort(key=lambda x: x['Date'])
+                        except:
+                            pass
+                        target_results[i] = target_data
+                except Exception as e:
+                    log(f"{target} taranırken hata: {e}")
+                    incomplete_targets.append(target)
+                    continue
 
-        # Pencereyi her zaman tam ekran (maximize) yap
-        driver.maximize_window()
+        # Birden fazla hedef varsa havuzda boşta olan ek sürücülerle hedefleri paralel tara.
+        # Boş sürücü yoksa tüm hedefler ana backend ile sırayla taranır.
+        helpers = []
+        for _ in range(min(len(work_items), scrape_backend.max_parallel) - 1):
+            helper = scrape_backend.spawn()
+            if not helper:
+                break
+            helper.cancel_event = cancel_event
+            if not helper.open(username, password, block=False):
+                break
+            helpers.append(helper)
 
-        # Ubuntu'da pencereyi "Her Zaman Üstte" (Always on Top) yapmak için wmctrl kullanımı
-        # ":ACTIVE:" parametresi o an odaklanmış olan pencereyi (ki switch_to.window ile odakladık) hedefler.
+        worker_stats = [{'hits': 0, 'misses': 0} for _ in range(len(helpers) + 1)]
+        threads = [threading.Thread(target=target_worker, args=(helper, worker_stats[n + 1]), daemon=True) for n, helper in enumerate(helpers)]
+        for thread in threads:
+            thread.start()
         try:
-            subprocess.run(["wmctrl", "-r", ":ACTIVE:", "-b", "add,above"], check=False)
-        except Exception as wm_e:
-            log_debug(f"wmctrl komutu çalıştırılamadı (kurulu olmayabilir): {wm_e}")
-
-    except Exception as e:
-        pass
+            target_worker(scrape_backend, worker_stats[0])
+            for thread in threads:
+                thread.join()
+        finally:
+            for helper in helpers:
+                helper.close()
+
+        for stats_part in worker_stats:
+            cache_stats['hits'] += stats_part['hits']
+            cache_stats['misses'] += stats_part['misses']
+        seen_links = set()
+        for i in sorted(target_results):
+            for item in target_results[i]:
+                # Bitişik arama pencerelerinin sınırındaki tweetler iki kez gelebilir
+                if scrape_mode == 'search':
+                    if item['Link'] in seen_links:
+                        continue
+                    seen_links.add(item['Link'])
+                all_data.append(item)
 
-    try:
-        targets = [t.strip() for t in target_username.split(',') if t.strip()]
-        all_data = []
-        
-        for i, target in enumerate(targets):
-            if stop_requested: break
-            log(f"{scrape_mode} hedefi taranıyor: {target} ({i+1}/{len(targets)})...")
-            try:
-                target_data = scrape_tweets(driver, target, start_datetime, end_datetime, search_keyword, scrape_mode, only_replies, include_retweets, only_retweets)
-                if target_data:
-                    # In profile mode, we want to keep the order per target, sorted by date
-                    # In list mode, we might get mixed results, but we'll sort everything at the end
-                    try:
-                        target_data.sort(key=lambda x: x['Date'])
-                    except:
-                        pass
-                    all_data.extend(target_data)
-            except Exception as e:
-                log(f"{target} taranırken hata: {e}")
-                continue
-        
         # Ensure all data is strictly sorted chronologically by Date
         if all_data:
             try:
@@ -961,11 +1562,13 @@ def run_process(username, password, target_username, start_date_str, end_date_st
                 "links": link_list,
                 "excel_file": None,
                 "raw_data": all_data,
-                "gs_status": None
+                "gs_status": None,
+                "cache_stats": cache_stats,
+                "incomplete_targets": incomplete_targets
             }
 
         log("Excel'e kaydediliyor...")
-        result_count, filtered_data, excel_obj = save_to_excel(all_data, output_file)
+        result_count, filtered_data, excel_obj = save_to_excel(all_data, output_file, compact=excel_compact)
         
         if result_count is not False:
             log("İşlem başarıyla tamamlandı!")
@@ -976,7 +1579,9 @@ def run_process(username, password, target_username, start_date_str, end_date_st
                 "links": link_list,
                 "excel_file": excel_obj,
                 "raw_data": filtered_data,
-                "gs_status": None
+                "gs_status": None,
+                "cache_stats": cache_stats,
+                "incomplete_targets": incomplete_targets
             }
         else:
             log("Excel dosyası kaydedilemedi.")
@@ -986,11 +1591,7 @@ def run_process(username, password, target_username, start_date_str, end_date_st
         log(f"Beklenmeyen bir hata oluştu: {e}")
         return None
     finally:
-        try:
-            if driver and not stop_requested:
-                driver.get("https://x.com/explore")
-        except:
-            pass
+        scrape_backend.close()
         log("Görev tamamlandı. Sürücü bir sonraki görev için açık kalıyor.")
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+
+# Snowflake epoch (ms): 2010-11-04T01:42:54.657Z
+TWITTER_EPOCH_MS = 1288834974657
+# Uygulama genelinde tarihler Türkiye saati (UTC+3) ve naive datetime olarak tutulur
+TURKEY_OFFSET = timedelta(hours=3)
+
+def id_to_timestamp_ms(tweet_id):
+    """Returns the Unix timestamp (ms) embedded in a Snowflake ID."""
+    return (int(tweet_id) >> 22) + TWITTER_EPOCH_MS
+
+def id_to_datetime(tweet_id):
+    """Converts a Snowflake ID to Turkey time (UTC+3), as naive datetime."""
+    return datetime.utcfromtimestamp(id_to_timestamp_ms(tweet_id) / 1000.0) + TURKEY_OFFSET
+
+def datetime_to_timestamp_ms(dt):
+    """Converts a naive Turkey time datetime to a Unix timestamp (ms)."""
+    return int(round((dt - TURKEY_OFFSET).replace(tzinfo=timezone.utc).timestamp() * 1000))
+
+def datetime_to_unix(dt):
+    """Converts a naive Turkey time datetime to a Unix timestamp (s)."""
+    return datetime_to_timestamp_ms(dt) // 1000
+
+def datetime_to_id(dt):
+    """Returns the smallest Snowflake ID that can have been created at `dt` (Turkey time)."""
+    return max(0, datetime_to_timestamp_ms(dt) - TWITTER_EPOCH_MS) << 22
+
+def id_bounds(start_datetime, end_datetime):
+    """
+    Returns (min_id, max_id) so that start <= id_to_datetime(id) <= end
+    is equivalent to min_id <= id <= max_id.
+    """
+    min_id = datetime_to_id(start_datetime)
+    max_id = ((datetime_to_timestamp_ms(end_datetime) + 1 - TWITTER_EPOCH_MS) << 22) - 1
+    return min_id, max_id
+
+def id_from_link(link):
+    """Returns the numeric tweet id in a /status/<id> link as int, or None."""
+    if link and "/status/" in link:
+        candidate = link.split("/status/")[-1].split("?")[0].split("/")[0]
+        if candidate.isdigit():
+            return int(candidate)
+    return None